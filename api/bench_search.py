@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+"""
+Search / API load benchmark.
+
+  1) generate a synthetic corpus in the pages.json shape
+     (configurable size, vocabulary size and Zipf skew)
+  2) build every available TF-IDF index variant (CPU, GPU if CuPy works)
+  3) replay a query workload against
+       - the bare index objects (index.search / suggester.suggest)
+       - /api/search and /api/suggest in-process through an ASGI client
+  4) report QPS, p50/p95/p99 latency, build time and peak RSS,
+     optionally saving / comparing against a named baseline
+
+Each variant runs in a forked child process, so its peak_rss_mb is the
+growth over the shared corpus, not the high-water mark of earlier rows.
+
+Usage (from the api/ directory):
+  python bench_search.py --docs 5000 --vocab 50000 --skew 1.1 --queries 2000
+  python bench_search.py --save-baseline laptop
+  python bench_search.py --compare laptop
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+API_DIR = Path(__file__).resolve().parent
+if str(API_DIR) not in sys.path:
+    sys.path.insert(0, str(API_DIR))
+
+from tfidf_index import TfidfSearchIndex, GPUTfidfSearchIndex, gpu_available  # noqa: E402
+
+BASELINE_DIR = API_DIR / "bench_baselines"
+
+# Metrics where a larger value is a regression (everything except QPS)
+LOWER_IS_BETTER = ("build_s", "peak_rss_mb", "p50_ms", "p95_ms", "p99_ms")
+
+
+#  Synthetic corpus
+
+def _word(rank: int) -> str:
+    """Map a vocabulary rank to a lowercase pseudo-word (bijective base 26)."""
+    letters = []
+    n = rank + 1
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        letters.append(chr(ord("a") + r))
+    return "".join(reversed(letters)) + "x"
+
+
+def make_corpus(n_docs: int, vocab_size: int, skew: float, doc_len: int, seed: int = 0):
+    """
+    Pages in the pages.json shape: [{"id", "url", "text"}, ...].
+    Term ranks are drawn from a Zipf-like distribution p(r) ~ 1 / (r + 1)^skew.
+    Also returns a synthetic PageRank list in the pagerank.json shape.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = [_word(r) for r in range(vocab_size)]
+    probs = 1.0 / np.arange(1, vocab_size + 1) ** skew
+    probs /= probs.sum()
+
+    lengths = rng.integers(doc_len // 2, doc_len * 3 // 2 + 1, size=n_docs)
+    ranks = rng.choice(vocab_size, size=int(lengths.sum()), p=probs)
+
+    pages = []
+    offset = 0
+    for i, length in enumerate(lengths):
+        words = ranks[offset:offset + length]
+        offset += length
+        pages.append({
+            "id": i,
+            "url": f"https://bench.example.org/page/{i}",
+            "text": " ".join(vocab[r] for r in words),
+        })
+
+    scores = rng.pareto(1.5, size=n_docs) + 1.0
+    scores /= scores.sum()
+    pagerank = [
+        {"id": i, "url": pages[i]["url"], "score": float(scores[i])}
+        for i in np.argsort(-scores).tolist()
+    ]
+    return pages, pagerank, vocab, probs
+
+
+def make_queries(vocab, probs, n_queries: int, seed: int = 1):
+    """1-3 term queries drawn from the corpus distribution, plus some misses."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n_queries):
+        n_terms = int(rng.integers(1, 4))
+        terms = [vocab[r] for r in rng.choice(len(vocab), size=n_terms, p=probs)]
+        if rng.random() < 0.05:
+            terms.append("zzzunknownzzz")
+        queries.append(" ".join(terms))
+    return queries
+
+
+def make_prefixes(queries, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    prefixes = []
+    for q in queries:
+        last = q.split()[-1]
+        prefixes.append(last[: int(rng.integers(1, len(last) + 1))])
+    return prefixes
+
+
+#  Measurement helpers
+
+# RSS this process started the row with (set in the forked child)
+_rss_base_mb = 0.0
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS above _rss_base_mb; ru_maxrss only ever grows, so rows need their own process."""
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return peak - _rss_base_mb
+
+
+def _isolated_worker(conn, fn, args):
+    global _rss_base_mb
+    # a forked child's high-water mark starts at the parent's current RSS
+    _rss_base_mb = peak_rss_mb()
+    try:
+        conn.send((True, fn(*args)))
+    except BaseException as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_isolated(fn, *args) -> dict:
+    """fn(*args) in a forked child (corpus shared copy-on-write); returns its result rows."""
+    ctx = multiprocessing.get_context("fork")
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_isolated_worker, args=(send, fn, args))
+    proc.start()
+    send.close()
+    try:
+        ok, result = recv.recv()
+    except EOFError:
+        ok, result = None, None
+    proc.join()
+    if ok is None:
+        ok, result = False, f"child exited with code {proc.exitcode}"
+    if not ok:
+        raise SystemExit(f"[bench] {fn.__name__} failed: {result}")
+    return result
+
+
+def _percentile(sorted_vals, p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def summarize(latencies, wall_s: float) -> dict:
+    lat = sorted(latencies)
+    return {
+        "qps": len(lat) / wall_s if wall_s > 0 else 0.0,
+        "p50_ms": _percentile(lat, 50) * 1000,
+        "p95_ms": _percentile(lat, 95) * 1000,
+        "p99_ms": _percentile(lat, 99) * 1000,
+    }
+
+
+def replay(fn, workload) -> dict:
+    latencies = []
+    t_start = time.perf_counter()
+    for item in workload:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+#  Benchmarks
+
+def index_variants():
+    variants = {"cpu": TfidfSearchIndex}
+    if gpu_available():
+        variants["gpu"] = GPUTfidfSearchIndex
+    return variants
+
+
+def bench_bare_index(name, cls, pages, pagerank, queries, prefixes, top_k: int):
+    doc_weights = {p["url"]: p["score"] for p in pagerank}
+
+    t0 = time.perf_counter()
+    index = cls()
+    for p in pages:
+        index.add_document(p["url"], p["text"])
+    index.finalize(doc_weights=doc_weights)
+    build_s = time.perf_counter() - t0
+    rss = peak_rss_mb()
+
+    # warm-up (GPU kernels, caches)
+    for q in queries[:20]:
+        index.search(q, top_k=top_k)
+
+    rows = {}
+    rows[f"index/{name}/search"] = {
+        "build_s": build_s,
+        "peak_rss_mb": rss,
+        **replay(lambda q: index.search(q, top_k=top_k), queries),
+    }
+    rows[f"index/{name}/suggest"] = replay(lambda p: index.suggester.suggest(p), prefixes)
+    return rows
+
+
+async def _replay_asgi(client, path, param_sets, concurrency: int) -> dict:
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(params):
+        async with sem:
+            t0 = time.perf_counter()
+            resp = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - t0)
+            resp.raise_for_status()
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in param_sets))
+    return summarize(latencies, time.perf_counter() - t_start)
+
+
+def bench_api(name, pages, pagerank, queries, prefixes, top_k: int, concurrency: int):
+    """Replay against the FastAPI app in-process (httpx ASGITransport)."""
+    import httpx
+    import main
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages_path = Path(tmp) / "pages.json"
+        pr_path = Path(tmp) / "pagerank.json"
+        pages_path.write_text(json.dumps(pages), encoding="utf-8")
+        pr_path.write_text(json.dumps(pagerank), encoding="utf-8")
+
+        corpus = main.corpora.add(main.DEFAULT_CORPUS, pages_path, pr_path, pinned=True)
+        os.environ["TFIDF_USE_GPU"] = "1" if name == "gpu" else "0"
+
+        t0 = time.perf_counter()
+        main._build_index_in_background()  # synchronous here
+        build_s = time.perf_counter() - t0
+        if corpus.status["state"] != "ready":
+            raise SystemExit(f"API index build failed: {corpus.status['error']}")
+        rss = peak_rss_mb()
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            search_params = [{"query": q, "top_k": top_k} for q in queries]
+            suggest_params = [{"query": p} for p in prefixes]
+            await _replay_asgi(client, "/api/search", search_params[:20], concurrency)  # warm-up
+            search = await _replay_asgi(client, "/api/search", search_params, concurrency)
+            suggest = await _replay_asgi(client, "/api/suggest", suggest_params, concurrency)
+            return search, suggest
+
+    search, suggest = asyncio.run(run())
+    return {
+        f"api/{name}/search": {"build_s": build_s, "peak_rss_mb": rss, **search},
+        f"api/{name}/suggest": suggest,
+    }
+
+
+#  Reporting & baselines
+
+def print_report(results: dict):
+    cols = ("build_s", "peak_rss_mb", "qps", "p50_ms", "p95_ms", "p99_ms")
+    print(f"\n{'benchmark':<24}" + "".join(f"{c:>13}" for c in cols))
+    for key, row in results.items():
+        cells = "".join(
+            f"{row[c]:>13.3f}" if c in row else f"{'-':>13}" for c in cols
+        )
+        print(f"{key:<24}{cells}")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """Print relative changes vs. baseline; return number of regressions."""
+    regressions = 0
+    print(f"\n=== vs. baseline (regression threshold {threshold:.0%}) ===")
+    for key, row in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, value in row.items():
+            old = base.get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            flag = "  REGRESSION" if worse else ""
+            regressions += worse
+            print(f"{key:<24}{metric:>12}: {old:10.3f} -> {value:10.3f} ({change:+.1%}){flag}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Search / API load benchmark")
+    parser.add_argument("--docs", type=int, default=2000, help="Number of synthetic pages (default: 2000)")
+    parser.add_argument("--vocab", type=int, default=20000, help="Vocabulary size (default: 20000)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of term frequencies (default: 1.1)")
+    parser.add_argument("--doc-len", type=int, default=300, help="Mean tokens per page (default: 300)")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per workload (default: 1000)")
+    parser.add_argument("--top-k", type=int, default=10, help="top_k per search (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight API requests (default: 16)")
+    parser.add_argument("--no-api", action="store_true", help="Only benchmark the bare index objects")
+    parser.add_argument("--write-corpus", type=str, default=None, help="Also write the corpus as pages.json here")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Save results as bench_baselines/<name>.json")
+    parser.add_argument("--compare", type=str, default=None, help="Compare against bench_baselines/<name>.json")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as regression (default: 0.10)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=== Search benchmark ===")
+    print(f"docs={args.docs} vocab={args.vocab} skew={args.skew} doc_len={args.doc_len} queries={args.queries}")
+
+    t0 = time.perf_counter()
+    pages, pagerank, vocab, probs = make_corpus(args.docs, args.vocab, args.skew, args.doc_len)
+    queries = make_queries(vocab, probs, args.queries)
+    prefixes = make_prefixes(queries)
+    print(f"[corpus] generated in {time.perf_counter() - t0:.2f}s")
+
+    if args.write_corpus:
+        with open(args.write_corpus, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        print(f"[corpus] wrote {args.write_corpus}")
+
+    results = {}
+    for name, cls in index_variants().items():
+        print(f"[bench] index/{name}")
+        results.update(run_isolated(bench_bare_index, name, cls, pages, pagerank, queries, prefixes, args.top_k))
+        if not args.no_api:
+            print(f"[bench] api/{name}")
+            results.update(run_isolated(
+                bench_api, name, pages, pagerank, queries, prefixes, args.top_k, args.concurrency
+            ))
+
+    print_report(results)
+
+    record = {"params": vars(args), "results": results}
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"\n[baseline] saved {path}")
+
+    if args.compare:
+        path = BASELINE_DIR / f"{args.compare}.json"
+        baseline = json.loads(path.read_text(encoding="utf-8"))
+        if baseline["params"].get("docs") != args.docs or baseline["params"].get("vocab") != args.vocab:
+            print("[warn] baseline was recorded with different corpus parameters")
+        if compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 #!/usr/bin/env python
 import argparse
+import shutil
 import subprocess
 import sys
 from pathlib import Path
-import json
 
 from config import CLUSTER_USER, CLUSTER_HOST, REMOTE_WORKDIR, REMOTE_BIN
+from corpora import CORPUS_NAME_RE, DEFAULT_CORPUS
+from stage_graph import Stage, StageGraph
 
 #  Paths & imports 
 
@@ -17,10 +19,17 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
 from crawler.core import crawl_graph  # noqa: E402
+from crawler.output import write_pages_json  # noqa: E402
 
 BACKEND_DATA_DIR = ROOT_DIR / "backend" / "data"
 CRAWLER_DATA_DIR = ROOT_DIR / "crawler" / "data"
 
+# parse_pagerank.py runs in-process (backend/data is not a package)
+if str(BACKEND_DATA_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DATA_DIR))
+
+from parse_pagerank import convert as convert_pagerank  # noqa: E402
+
 # Scripts
 PARSE_PAGERANK_PY = BACKEND_DATA_DIR / "parse_pagerank.py"
 CHECK_SUM_PY = BACKEND_DATA_DIR / "check_pagerank_sum.py"  # optional
@@ -28,10 +37,21 @@ CHECK_SUM_PY = BACKEND_DATA_DIR / "check_pagerank_sum.py"  # optional
 # Crawler outputs
 CRAWLER_EDGES_TXT = CRAWLER_DATA_DIR / "edges.txt"     # CUDA-ready: "src_id dst_id"
 CRAWLER_PAGES_JSON = CRAWLER_DATA_DIR / "pages.json"   # [{id, url, text}, ...]
+CRAWLER_PAGES_JSONL = CRAWLER_DATA_DIR / "pages.jsonl" # same, one per line, written while crawling
+CRAWLER_CHECKPOINT_DIR = CRAWLER_DATA_DIR / "checkpoint"  # append-only crawl log for --resume
+CRAWLER_HTTP_CACHE = CRAWLER_DATA_DIR / "http_cache.sqlite"  # bodies + validators for recrawls
+CRAWLER_URLS_TXT = CRAWLER_DATA_DIR / "urls.txt"       # line i = URL of id i
 
 # Backend data files
 OUTPUT_TXT_LOCAL = BACKEND_DATA_DIR / "output.txt"     # raw CUDA output
 PAGERANK_JSON = BACKEND_DATA_DIR / "pagerank.json"     # final PR used by API
+PAGERANK_NPZ = BACKEND_DATA_DIR / "pagerank.npz"       # same as arrays (parse_pagerank.write_export)
+
+# Named corpora served by the API (/api/search?corpus=NAME, see api/corpora.py)
+CORPORA_DIR = BACKEND_DATA_DIR / "corpora"
+
+# Stage keys and output digests of the last runs (see stage_graph.py)
+BUILD_MANIFEST = CRAWLER_DATA_DIR / "build_manifest.json"
 
 
 def run_cmd(cmd, cwd=None):
@@ -39,62 +59,81 @@ def run_cmd(cmd, cwd=None):
     subprocess.run(cmd, check=True, cwd=cwd)
 
 
-#  Step 0: crawl + write pages.json & edges.txt 
+#  Step 0: crawl + write edges.txt 
 
-def step_crawl(start_url: str, max_pages: int, lang: str | None, workers: int):
+def step_crawl(
+    start_url: str,
+    max_pages: int,
+    lang: str | None,
+    workers: int,
+    engine: str = "threads",
+    crawl_delay: float = 0.02,
+    parse_workers: int = 0,
+    resume: bool = False,
+    http_cache: bool = True,
+    near_dup_distance: int | None = 4,
+):
     """
     Use the shared crawler.core.crawl_graph to:
       - crawl from start_url
       - restrict to max_pages, optional language, and workers
-    Then write:
-      - crawler/data/pages.json
+    Near-duplicate pages (within near_dup_distance SimHash bits) are
+    collapsed onto the first one, as crawl.py does by default.
+    Pages and edges stream to crawler/data/{pages.jsonl,urls.txt,edges.bin}
+    during the crawl (see crawler.output). Then write:
       - crawler/data/edges.txt  (src_id dst_id for CUDA)
+    pages.json is written by its own stage (step_pages_json).
     """
     print("\n=== Step 0: crawling ===")
     print(f"[crawl] start_url  = {start_url}")
     print(f"[crawl] max_pages  = {max_pages}")
     print(f"[crawl] lang       = {lang}")
     print(f"[crawl] workers    = {workers}")
+    print(f"[crawl] engine     = {engine}")
+    print(f"[crawl] delay/host = {crawl_delay}s")
+    print(f"[crawl] parse procs= {parse_workers}")
+    print(f"[crawl] checkpoint = {CRAWLER_CHECKPOINT_DIR}{' (resume)' if resume else ''}")
+    print(f"[crawl] http cache = {CRAWLER_HTTP_CACHE if http_cache else 'off'}")
+    print(f"[crawl] near dups  = {near_dup_distance if near_dup_distance is not None else 'off'}")
 
     CRAWLER_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    pages, edges_url, url_to_id, visited = crawl_graph(
+    pages, edges, url_to_id, visited = crawl_graph(
         start_url=start_url,
         max_pages=max_pages,
         target_lang=lang,
         workers=workers,
         verbose=True,
+        engine=engine,
+        crawl_delay=crawl_delay,
+        parse_workers=parse_workers,
+        checkpoint_dir=CRAWLER_CHECKPOINT_DIR,
+        resume=resume,
+        http_cache=CRAWLER_HTTP_CACHE if http_cache else None,
+        near_dup_distance=near_dup_distance,
+        output_dir=CRAWLER_DATA_DIR,
+        keep_pages=False,
     )
 
     print(f"[crawl] Visited URLs: {len(visited)}")
     print(f"[crawl] Unique pages (url_to_id): {len(url_to_id)}")
-    print(f"[crawl] Raw edges (url,url): {len(edges_url)}")
-
-    #  write pages.json 
-    with CRAWLER_PAGES_JSON.open("w", encoding="utf-8") as jf:
-        json.dump(pages, jf, ensure_ascii=False, indent=2)
-    print(f"[crawl] Wrote pages.json -> {CRAWLER_PAGES_JSON}")
+    print(f"[crawl] Raw edges (id,id): {len(edges)}")
 
     #  write edges.txt (src_id dst_id) for CUDA 
-    # edges_url is (src_url, tgt_url); map via url_to_id
-    num_edges_written = 0
-    with CRAWLER_EDGES_TXT.open("w", encoding="utf-8") as f_txt:
-        seen = set()
-        for src_url, tgt_url in edges_url:
-            if src_url not in url_to_id or tgt_url not in url_to_id:
-                continue
-            src_id = url_to_id[src_url]
-            tgt_id = url_to_id[tgt_url]
-            edge = (src_id, tgt_id)
-            if edge in seen:
-                continue
-            seen.add(edge)
-            f_txt.write(f"{src_id} {tgt_id}\n")
-            num_edges_written += 1
+    # edges are interned (src_id, dst_id) already; drop duplicates, keep first-seen order
+    num_edges_written = edges.write_txt(CRAWLER_EDGES_TXT, unique=True)
 
     print(f"[crawl] Wrote {num_edges_written} unique edges -> {CRAWLER_EDGES_TXT}")
 
 
+#  Step 0b: pages.json (overlaps with the cluster run) 
+
+def step_pages_json():
+    """Convert the streamed crawler/data/pages.jsonl into the pages.json list the API reads."""
+    num_pages = write_pages_json(CRAWLER_PAGES_JSONL, CRAWLER_PAGES_JSON)
+    print(f"[pages] Wrote {num_pages} pages to pages.json -> {CRAWLER_PAGES_JSON}")
+
+
 #  Step 1: CUDA on cluster 
 
 def step_run_pagerank_on_cluster(
@@ -159,13 +198,11 @@ def step_run_pagerank_on_cluster(
 
 def step_parse_pagerank():
     """
-    Run parse_pagerank.py to convert CUDA output.txt + pages.json
-    into backend/data/pagerank.json.
+    Convert CUDA output.txt + pages.json into backend/data/pagerank.json
+    and pagerank.npz, in-process with parse_pagerank.convert().
     """
     print("\n=== Step 2: parse_pagerank.py ===")
 
-    if not PARSE_PAGERANK_PY.exists():
-        raise SystemExit(f"parse_pagerank.py not found at {PARSE_PAGERANK_PY}")
     if not OUTPUT_TXT_LOCAL.exists():
         raise SystemExit(
             f"output.txt not found at {OUTPUT_TXT_LOCAL}. "
@@ -177,22 +214,42 @@ def step_parse_pagerank():
             f"Did the crawl step run?"
         )
 
-    run_cmd([
-        sys.executable,
-        str(PARSE_PAGERANK_PY),
-        str(OUTPUT_TXT_LOCAL),
-        str(CRAWLER_PAGES_JSON),
-        str(PAGERANK_JSON),
-    ])
+    try:
+        info = convert_pagerank(OUTPUT_TXT_LOCAL, CRAWLER_PAGES_JSON, PAGERANK_JSON, PAGERANK_NPZ)
+    except ValueError as e:
+        raise SystemExit(f"[parse] {e}")
 
-    print(f"\n[ok] Wrote {PAGERANK_JSON}")
+    print(
+        f"[parse] {info['raw']} entries, kept {info['kept']}, dropped {info['dropped']} without URL "
+        f"(parse {info['parse_s']:.2f}s, join {info['join_s']:.2f}s, write {info['write_s']:.2f}s)"
+    )
+    print(f"\n[ok] Wrote {PAGERANK_JSON} and {PAGERANK_NPZ}")
+    # output.txt is kept: it is the cluster stage's output, so a later run
+    # with new pages but the same graph does not go back to the cluster
 
-    # Treat output.txt as temporary → can be safely removed
-    try:
-        OUTPUT_TXT_LOCAL.unlink()
-        print(f"[info] Removed temporary {OUTPUT_TXT_LOCAL}")
-    except FileNotFoundError:
-        pass
+
+#  Step 4 (with --corpus): publish 
+
+def corpus_files(name: str) -> list[Path]:
+    corpus_dir = CORPORA_DIR / name
+    return [corpus_dir / "pages.json", corpus_dir / "pagerank.json", corpus_dir / "pagerank.npz"]
+
+
+def step_publish(name: str):
+    """
+    Copy pages.json, pagerank.json and pagerank.npz to backend/data/corpora/<name>/,
+    where the API finds them as corpus <name> without a restart.
+    """
+    print(f"\n=== Step 4: publish corpus {name!r} ===")
+    targets = corpus_files(name)
+    targets[0].parent.mkdir(parents=True, exist_ok=True)
+    for src, dst in zip((CRAWLER_PAGES_JSON, PAGERANK_JSON, PAGERANK_NPZ), targets):
+        # copy next to the target, then rename, so the API never reads half a file;
+        # copy2 keeps mtimes (pagerank.npz must not look older than pagerank.json)
+        tmp = dst.with_name(dst.name + ".tmp")
+        shutil.copy2(src, tmp)
+        tmp.replace(dst)
+    print(f"[ok] Published {targets[0].parent}")
 
 
 #  Step 3: check_pagerank_sum.py (optional) 
@@ -238,6 +295,34 @@ def parse_args():
         default=5,
         help="Number of concurrent workers for crawling (default: 5)",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Crawl engine: requests + threads, or aiohttp + asyncio (default: threads)",
+    )
+    parser.add_argument(
+        "--crawl-delay",
+        type=float,
+        default=0.02,
+        help="Seconds between requests to the same host (default: 0.02, 0 = off)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Processes for HTML parsing during the crawl (default: 0 = inline)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted crawl from crawler/data/checkpoint instead of the start URL",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="Do not use crawler/data/http_cache.sqlite (conditional recrawl requests)",
+    )
     parser.add_argument(
         "--damping",
         type=float,
@@ -262,7 +347,104 @@ def parse_args():
         default=100000,
         help="Top-k nodes to print in CUDA output (default: 100000)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--corpus",
+        type=str,
+        default=None,
+        help="Also publish the result as API corpus NAME (backend/data/corpora/NAME, "
+             "searched with /api/search?corpus=NAME)",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        choices=list(STAGES) + ["all"],
+        help="Rerun this stage even if its inputs are unchanged (repeatable; 'all' = every stage). "
+             "Use --force crawl to refresh a corpus from the live site.",
+    )
+    args = parser.parse_args()
+    if args.corpus is not None and (args.corpus == DEFAULT_CORPUS or not CORPUS_NAME_RE.match(args.corpus)):
+        parser.error(f"--corpus must be letters, digits, '.', '_' or '-' and not {DEFAULT_CORPUS!r}")
+    return args
+
+
+def build_stages(args) -> StageGraph:
+    """
+    crawl      -> edges.txt, pages.jsonl, urls.txt
+    pagerank   edges.txt -> output.txt (cluster)
+    pages_json pages.jsonl -> pages.json
+    parse      output.txt + pages.json -> pagerank.json, pagerank.npz
+    check      pagerank.json
+    publish    pages.json + pagerank.json/.npz -> corpora/<name>/ (only with --corpus)
+
+    pagerank and pages_json both only need the crawl, so pages.json is
+    written while the cluster computes PageRank.
+    """
+    force = STAGES if "all" in args.force else args.force
+    graph = StageGraph(BUILD_MANIFEST, force=force)
+
+    graph.add(Stage(
+        "crawl",
+        lambda: step_crawl(
+            start_url=args.start_url,
+            max_pages=args.max_pages,
+            lang=args.lang,
+            workers=args.workers,
+            engine=args.engine,
+            crawl_delay=args.crawl_delay,
+            parse_workers=args.parse_workers,
+            resume=args.resume,
+            http_cache=not args.no_http_cache,
+        ),
+        outputs=[CRAWLER_EDGES_TXT, CRAWLER_PAGES_JSONL, CRAWLER_URLS_TXT],
+        # what the corpus is; workers, engine and delays only change how fast it is fetched
+        params={"start_url": args.start_url, "max_pages": args.max_pages, "lang": args.lang},
+        always=args.resume,
+    ))
+    graph.add(Stage(
+        "pages_json",
+        step_pages_json,
+        inputs=[CRAWLER_PAGES_JSONL],
+        outputs=[CRAWLER_PAGES_JSON],
+    ))
+    graph.add(Stage(
+        "pagerank",
+        lambda: step_run_pagerank_on_cluster(
+            damping=args.damping,
+            tol=args.tol,
+            max_iter=args.max_iter,
+            top_k=args.top_k,
+        ),
+        inputs=[CRAWLER_EDGES_TXT],
+        outputs=[OUTPUT_TXT_LOCAL],
+        params={
+            "damping": args.damping, "tol": args.tol, "max_iter": args.max_iter, "top_k": args.top_k,
+            "bin": REMOTE_BIN,
+        },
+    ))
+    graph.add(Stage(
+        "parse",
+        step_parse_pagerank,
+        inputs=[OUTPUT_TXT_LOCAL, CRAWLER_PAGES_JSON, PARSE_PAGERANK_PY],
+        outputs=[PAGERANK_JSON, PAGERANK_NPZ],
+    ))
+    graph.add(Stage(
+        "check",
+        step_check_sum,
+        inputs=[PAGERANK_JSON],
+    ))
+    if args.corpus:
+        graph.add(Stage(
+            "publish",
+            lambda: step_publish(args.corpus),
+            inputs=[CRAWLER_PAGES_JSON, PAGERANK_JSON, PAGERANK_NPZ],
+            outputs=corpus_files(args.corpus),
+            params={"corpus": args.corpus},
+        ))
+    return graph
+
+
+STAGES = ("crawl", "pages_json", "pagerank", "parse", "check", "publish")
 
 
 def main():
@@ -273,30 +455,18 @@ def main():
     print(f"BACKEND_DATA_DIR: {BACKEND_DATA_DIR}")
     print(f"CRAWLER_DATA_DIR: {CRAWLER_DATA_DIR}")
 
-    # Step 0: crawl
-    step_crawl(
-        start_url=args.start_url,
-        max_pages=args.max_pages,
-        lang=args.lang,
-        workers=args.workers,
-    )
-
-    # Step 1: run PageRank on cluster
-    step_run_pagerank_on_cluster(
-        damping=args.damping,
-        tol=args.tol,
-        max_iter=args.max_iter,
-        top_k=args.top_k,
-    )
-
-    # Step 2: parse PageRank output -> pagerank.json
-    step_parse_pagerank()
-
-    # Step 3: optional sanity-check of sum
-    step_check_sum()
+    graph = build_stages(args)
+    try:
+        graph.run()
+    finally:
+        print("\n=== Stage timings ===")
+        print(graph.summary())
 
     print("\nAll done ")
     print("Restart FastAPI to pick up the new backend/data/pagerank.json and crawler/data/pages.json.")
+    if args.corpus:
+        print(f"Corpus {args.corpus!r} is searchable as /api/search?corpus={args.corpus} "
+              f"(a running API that already loaded it needs a restart too).")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,278 @@
+# corpora.py
+"""
+Named search corpora for /api/search and /api/suggest.
+
+A corpus is a pages.json plus a pagerank.json (pagerank.npz is used
+instead when it is at least as new). "default" is the legacy pair
+crawler/data/pages.json + backend/data/pagerank.json; every other corpus is
+a directory CORPORA_DIR/<name>/ holding the same files (build_corpus.py
+--corpus NAME publishes one there).
+
+Corpora are loaded on first use: the TF-IDF index and the PageRank maps
+are built on a small loader pool and handed out as one immutable
+CorpusData, so a request that got it keeps working even if the corpus is
+evicted meanwhile. Once a new corpus has been measured, the least recently
+used corpora are dropped until the loaded ones fit the memory budget (the
+default corpus is loaded at startup and never evicted).
+
+Memory is measured by walking the loaded objects (sys.getsizeof of every
+dict, list, string and float reachable, shared objects counted once), so
+it is what the corpus keeps alive, not the peak while building it.
+"""
+import operator
+import re
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import compress
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+DEFAULT_CORPUS = "default"
+CORPUS_NAME_RE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}$")
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+# counted, but nothing to look inside
+_LEAVES = frozenset({str, bytes, int, float, bool, complex, type(None)})
+
+
+def deep_sizeof(*roots) -> int:
+    """
+    Bytes held by roots and everything reachable through containers and
+    instance dicts / slots. The per-child work (dedupe, sizes, picking the
+    containers to descend into) is done with set and map calls, so a
+    posting dict costs about as much to measure as to copy.
+    """
+    seen = {id(obj) for obj in roots}
+    total = sum(map(sys.getsizeof, roots))
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            children = [*obj.keys(), *obj.values()]
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            children = list(obj)
+        elif isinstance(obj, np.ndarray):
+            # getsizeof already counted the buffer if the array owns it
+            if obj.base is not None:
+                total += obj.nbytes
+            continue
+        elif isinstance(obj, _OPAQUE):
+            continue
+        elif hasattr(obj, "__dict__"):
+            children = [obj.__dict__]
+        else:
+            children = [getattr(obj, slot, None) for slot in getattr(type(obj), "__slots__", ())]
+
+        by_id = dict(zip(map(id, children), children))
+        # set.difference walks the small side (dict_keys - set would walk all of seen)
+        fresh = list(map(by_id.__getitem__, set(by_id).difference(seen)))
+        seen.update(map(id, fresh))
+        total += sum(map(sys.getsizeof, fresh))
+        is_leaf = map(_LEAVES.__contains__, map(type, fresh))
+        stack.extend(compress(fresh, map(operator.not_, is_leaf)))
+    return total
+
+
+class CorpusData:
+    """A loaded corpus: everything a search over it reads."""
+
+    __slots__ = ("index", "pages_by_url", "pagerank_by_url", "pagerank_norm_by_url")
+
+    def __init__(self, index, pages_by_url: dict, pagerank_by_url: dict, pagerank_norm_by_url: dict):
+        self.index = index
+        self.pages_by_url = pages_by_url              # url -> full page dict from crawler
+        self.pagerank_by_url = pagerank_by_url        # url -> raw pagerank score
+        self.pagerank_norm_by_url = pagerank_norm_by_url  # url -> score in [0, 1]
+
+
+class Corpus:
+    def __init__(self, name: str, pages_path, pagerank_path, pinned: bool = False):
+        self.name = name
+        self.pages_path = Path(pages_path)
+        self.pagerank_path = Path(pagerank_path)
+        self.pinned = pinned
+        self.data: CorpusData | None = None
+        self.future: Future | None = None
+        # state: "unloaded" -> "building" -> "ready" | "failed" (retried on the next load); evicted back to "unloaded"
+        # (the build fields are the ones /ready has always reported)
+        self.status: dict[str, Any] = {
+            "state": "unloaded",
+            "stage": None,
+            "docs_added": 0,
+            "docs_total": 0,
+            "error": None,
+            "build_seconds": None,
+        }
+        self.memory_bytes = 0
+        self.measure_seconds = None
+        self.loads = 0
+        self.evictions = 0
+        self.hits = 0
+        self.last_used = None
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "pages_path": str(self.pages_path),
+            "pagerank_path": str(self.pagerank_path),
+            "pinned": self.pinned,
+            **self.status,
+            "memory_mb": round(self.memory_bytes / 2**20, 2),
+            "measure_seconds": self.measure_seconds,
+            "pages": len(self.data.pages_by_url) if self.data else None,
+            "pagerank_scores": len(self.data.pagerank_by_url) if self.data else None,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "idle_seconds": None if self.last_used is None else round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class CorpusRegistry:
+    """
+    Known corpora, loaded lazily and evicted least-recently-used past
+    memory_budget bytes.
+
+    loader(corpus) builds and returns a CorpusData; it may update
+    corpus.status["stage"] / docs_added / docs_total as it goes.
+    """
+
+    def __init__(self, loader: Callable[[Corpus], CorpusData], corpora_dir, memory_budget: int, loaders: int = 2):
+        self.loader = loader
+        self.corpora_dir = Path(corpora_dir)
+        self.memory_budget = memory_budget
+        self.corpora: dict[str, Corpus] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()   # loaded corpora, least recent first
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=loaders, thread_name_prefix="corpus-load")
+
+    def add(self, name: str, pages_path, pagerank_path, pinned: bool = False) -> Corpus:
+        """Register (or replace) a corpus; nothing is loaded yet."""
+        corpus = Corpus(name, pages_path, pagerank_path, pinned=pinned)
+        with self._lock:
+            self.corpora[name] = corpus
+            self._lru.pop(name, None)
+        return corpus
+
+    def scan(self):
+        """Register every CORPORA_DIR/<name>/ with a pages.json that is not known yet."""
+        if not self.corpora_dir.is_dir():
+            return
+        for path in sorted(self.corpora_dir.iterdir()):
+            if path.name not in self.corpora and CORPUS_NAME_RE.match(path.name) and (path / "pages.json").exists():
+                self.add(path.name, path / "pages.json", path / "pagerank.json")
+
+    def get(self, name: str) -> Corpus | None:
+        corpus = self.corpora.get(name)
+        if corpus is None and CORPUS_NAME_RE.match(name) and (self.corpora_dir / name / "pages.json").exists():
+            # built after startup
+            self.scan()
+            corpus = self.corpora.get(name)
+        return corpus
+
+    #  loading
+
+    def load(self, corpus: Corpus) -> Future:
+        """Future resolving to the corpus' CorpusData; starts a load unless one is running or done."""
+        with self._lock:
+            if corpus.future is None:
+                corpus.status.update(state="building", stage=None, docs_added=0, docs_total=0, error=None)
+                corpus.future = self._pool.submit(self._load, corpus)
+            return corpus.future
+
+    def load_now(self, corpus: Corpus) -> CorpusData:
+        """Load and wait for it (startup / benchmarks); raises like the loader."""
+        return self.load(corpus).result()
+
+    def _load(self, corpus: Corpus) -> CorpusData:
+        t0 = time.perf_counter()
+        try:
+            data = self.loader(corpus)
+        except Exception as e:
+            # requests already waiting get the error; the next one starts a new load
+            with self._lock:
+                corpus.future = None
+                corpus.status.update(state="failed", error=str(e), build_seconds=round(time.perf_counter() - t0, 3))
+            print(f"[corpus] {corpus.name}: load failed after {corpus.status['build_seconds']}s: {e}")
+            raise
+        build_s = time.perf_counter() - t0
+
+        with self._lock:
+            corpus.data = data
+            corpus.loads += 1
+            corpus.last_used = time.monotonic()
+            corpus.status.update(state="ready", stage=None, build_seconds=round(build_s, 3))
+            self._lru[corpus.name] = None
+        print(
+            f"[corpus] {corpus.name}: {len(data.pages_by_url)} pages, "
+            f"{len(data.pagerank_by_url)} PageRank scores in {build_s:.2f}s"
+        )
+        # measuring walks every object, about as slow as the build; the
+        # waiting searches are answered first
+        self._pool.submit(self._account, corpus, data)
+        return data
+
+    def _account(self, corpus: Corpus, data: CorpusData):
+        t0 = time.perf_counter()
+        memory = deep_sizeof(data)
+        with self._lock:
+            if corpus.data is not data:
+                return  # evicted or replaced meanwhile
+            corpus.memory_bytes = memory
+            corpus.measure_seconds = round(time.perf_counter() - t0, 3)
+            evicted = self._evict(keep=corpus.name)
+        print(
+            f"[corpus] {corpus.name}: {memory / 2**20:.1f} MB "
+            f"(loaded {self.loaded_bytes() / 2**20:.1f} / {self.memory_budget / 2**20:.0f} MB)"
+        )
+        for name, freed in evicted:
+            print(f"[corpus] evicted {name} ({freed / 2**20:.1f} MB, least recently used)")
+
+    def _evict(self, keep: str) -> list[tuple[str, int]]:
+        """Drop LRU corpora until under budget (caller holds the lock)."""
+        evicted = []
+        total = sum(self.corpora[name].memory_bytes for name in self._lru)
+        for name in list(self._lru):
+            if total <= self.memory_budget:
+                break
+            corpus = self.corpora[name]
+            if name == keep or corpus.pinned:
+                continue
+            del self._lru[name]
+            total -= corpus.memory_bytes
+            evicted.append((name, corpus.memory_bytes))
+            corpus.data = None
+            corpus.future = None
+            corpus.memory_bytes = 0
+            corpus.evictions += 1
+            corpus.status.update(state="unloaded", stage=None)
+        return evicted
+
+    def touch(self, corpus: Corpus) -> CorpusData | None:
+        """The loaded data (marking the corpus most recently used), or None if it is not loaded."""
+        with self._lock:
+            data = corpus.data
+            if data is not None:
+                corpus.hits += 1
+                corpus.last_used = time.monotonic()
+                if corpus.name in self._lru:
+                    self._lru.move_to_end(corpus.name)
+            return data
+
+    def loaded_bytes(self) -> int:
+        return sum(self.corpora[name].memory_bytes for name in list(self._lru))
+
+    def stats(self) -> dict:
+        self.scan()
+        return {
+            "memory_budget_mb": round(self.memory_budget / 2**20, 2),
+            "loaded_mb": round(self.loaded_bytes() / 2**20, 2),
+            "lru": list(self._lru),
+            "corpora": [corpus.stats() for corpus in self.corpora.values()],
+        }
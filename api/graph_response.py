@@ -0,0 +1,171 @@
+# graph_response.py
+"""
+Response encodings for crawled graphs (/api/pagerank/url) and the fast
+JSON response class used for every API response.
+
+Formats, picked with ?format= or else the Accept header:
+
+  json     application/json (default). The original shape: nodes and
+           edges as lists of objects, {"id", "url"} / {"from", "to"}.
+  compact  application/vnd.pagerank.compact+json. Same fields, but
+           nodes are {"url": [...]} (id = position) and edges are
+           {"from": [...], "to": [...]}; parallel integer arrays serialize
+           several times faster and are about half the size.
+  binary   application/vnd.pagerank.graph. Little-endian:
+             8 bytes   GRAPH_MAGIC
+             uint32    header length h
+             h bytes   compact JSON without "edges", padded with spaces
+                       to a multiple of 4
+             int32     from[k], then to[k]   (k = header["edges_in_body"])
+           The arrays can be viewed directly as Int32Array / np.int32.
+
+Edges can be paged (edge_offset / edge_limit); the page's position is
+reported as edge_offset and next_offset (None after the last page).
+"""
+import json
+import struct
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output, slower
+    orjson = None
+
+GRAPH_MAGIC = b"PRGRAPH\x01"
+MEDIA_TYPES = {
+    "json": "application/json",
+    "compact": "application/vnd.pagerank.compact+json",
+    "binary": "application/vnd.pagerank.graph",
+}
+FORMATS = tuple(MEDIA_TYPES)
+
+
+def _numpy_default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """JSON bytes; orjson when installed (NumPy arrays are serialized natively)."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_numpy_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps() (orjson if available)."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def negotiate(accept: str | None, fmt: str | None = None) -> str:
+    """Response format from an explicit ?format= or the Accept header (first match wins)."""
+    if fmt:
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        return fmt
+    for part in (accept or "").split(","):
+        media = part.split(";", 1)[0].strip()
+        for name, media_type in MEDIA_TYPES.items():
+            if media == media_type:
+                return name
+    return "json"
+
+
+class GraphResult:
+    """A finished URL PageRank job: ranked pages, URL table and edge arrays."""
+
+    __slots__ = ("start_url", "pages", "urls", "src", "dst")
+
+    def __init__(self, start_url: str, pages: list[dict], urls: list[str], src, dst):
+        self.start_url = start_url
+        self.pages = pages
+        self.urls = urls
+        self.src = np.ascontiguousarray(src, dtype=np.int32)
+        self.dst = np.ascontiguousarray(dst, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.src)
+
+    def edge_page(self, offset: int = 0, limit: int | None = None):
+        end = len(self.src) if limit is None else min(len(self.src), offset + limit)
+        next_offset = end if end < len(self.src) else None
+        return self.src[offset:end], self.dst[offset:end], next_offset
+
+
+def _paging(offset: int, limit: int | None, next_offset: int | None, job_id: str | None) -> dict:
+    if limit is None and not offset:
+        return {}
+    return {"job_id": job_id, "edge_offset": offset, "next_offset": next_offset}
+
+
+def graph_body(
+    result: GraphResult,
+    fmt: str = "json",
+    offset: int = 0,
+    limit: int | None = None,
+    job_id: str | None = None,
+    nodes: bool = True,
+) -> dict:
+    """
+    The /api/pagerank/url body as a dict ("json" or "compact"). With
+    nodes=False only the edge page and its paging fields, for follow-up pages.
+    """
+    src, dst, next_offset = result.edge_page(offset, limit)
+    body: dict = {}
+    if nodes:
+        body = {
+            "start_url": result.start_url,
+            "page_count": len(result.urls),
+            "edge_count": len(result),
+            "pages": result.pages,
+        }
+    body.update(_paging(offset, limit, next_offset, job_id))
+
+    if fmt == "json":
+        if nodes:
+            body["nodes"] = [{"id": i, "url": url} for i, url in enumerate(result.urls)]
+        body["edges"] = [{"from": s, "to": d} for s, d in zip(src.tolist(), dst.tolist())]
+    else:
+        if nodes:
+            body["nodes"] = {"url": result.urls}
+        body["edges"] = {"from": src, "to": dst}
+    return body
+
+
+def render(result: GraphResult, fmt: str = "json", **page) -> Response:
+    """graph_body() as a response in format `fmt` (see module docstring); `page` as for graph_body."""
+    body = graph_body(result, "compact" if fmt == "binary" else fmt, **page)
+    if fmt == "json":
+        return FastJSONResponse(content=body)
+    if fmt == "compact":
+        return Response(dumps(body), media_type=MEDIA_TYPES["compact"])
+
+    edges = body.pop("edges")
+    body["edges_in_body"] = len(edges["from"])
+    header = dumps(body)
+    header += b" " * (-len(header) % 4)
+    return Response(
+        b"".join((
+            GRAPH_MAGIC, struct.pack("<I", len(header)), header,
+            edges["from"].astype("<i4").tobytes(), edges["to"].astype("<i4").tobytes(),
+        )),
+        media_type=MEDIA_TYPES["binary"],
+    )
+
+
+def read_binary(data: bytes) -> tuple[dict, np.ndarray, np.ndarray]:
+    """Decode a binary response: (header, from, to)."""
+    if data[:8] != GRAPH_MAGIC:
+        raise ValueError("not a graph response")
+    (h,) = struct.unpack_from("<I", data, 8)
+    header = json.loads(data[12:12 + h])
+    k = header["edges_in_body"]
+    arrays = np.frombuffer(data, dtype="<i4", count=2 * k, offset=12 + h)
+    return header, arrays[:k], arrays[k:]
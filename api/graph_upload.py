@@ -0,0 +1,410 @@
+# graph_upload.py
+"""
+Incremental parsing of uploaded graphs for /api/pagerank/file.
+
+The upload is fed in chunks as it arrives and written straight to the
+"src dst" edge list that pagerank_gpu reads, so the server never holds
+more than a chunk (plus one partial line) in memory. A multipart form is
+unwrapped on the fly too (MultipartSink).
+
+Accepted formats (detected from the first bytes):
+
+  text   "src dst" per line; blank lines and # comments are allowed
+  gzip   either of these, gzip-compressed (several members, as from
+         cat a.gz b.gz, are read one after the other)
+  csr    binary CSR by source node, little-endian:
+           8 bytes  CSR_MAGIC
+           uint64   n (nodes), uint64 m (edges)
+           int64    row_ptr[n + 1]   (row_ptr[0] = 0, row_ptr[n] = m)
+           int32    col[m]           (targets of node i: col[row_ptr[i]:row_ptr[i+1]])
+         write_csr() produces it. row_ptr is staged in a temp file and
+         memory-mapped, not held in RAM.
+
+Node ids must be in [0, 2^31) (pagerank_gpu reads them as int).
+"""
+import struct
+import tempfile
+import warnings
+import zlib
+
+import numpy as np
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+CSR_MAGIC = b"PRCSR\x00\x01\x00"
+_CSR_HEADER = struct.Struct("<8sQQ")
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_NODE_ID = 2**31 - 1
+
+# bytes.split() whitespace, minus the newline
+_BLANKS = np.zeros(256, dtype=bool)
+_BLANKS[list(b" \t\r\x0b\x0c")] = True
+
+# decompressed bytes produced per zlib call (bounds memory on gzip bombs)
+_INFLATE_CHUNK = 1 << 20
+# CSR edges formatted per write
+_CSR_EDGE_CHUNK = 1 << 16
+
+
+class GraphUploadError(ValueError):
+    """Malformed upload (the endpoint answers 400)."""
+
+
+class _EdgeWriter:
+    """Edge list output plus the counters every format reports."""
+
+    def __init__(self, out):
+        self.out = out
+        self.edges = 0
+        self.max_id = -1
+
+    def check(self, ids: np.ndarray, where: str):
+        if len(ids) == 0:
+            return
+        lo, hi = int(ids.min()), int(ids.max())
+        if lo < 0 or hi > MAX_NODE_ID:
+            bad = lo if lo < 0 else hi
+            raise GraphUploadError(f"{where}: node id {bad} out of range [0, {MAX_NODE_ID}]")
+        self.max_id = max(self.max_id, hi)
+
+    def write_pairs(self, src: np.ndarray, dst: np.ndarray):
+        pairs = np.column_stack((src, dst)).ravel().tolist()
+        self.out.write((("%d %d\n" * len(src)) % tuple(pairs)).encode("ascii"))
+        self.edges += len(src)
+
+
+def _two_tokens_per_line(block: bytes, lines: int) -> bool:
+    """True if each of the `lines` lines of block (ending in \n) has exactly two tokens."""
+    b = np.frombuffer(block, dtype=np.uint8)
+    newline = b == 10
+    gap = newline | _BLANKS[b]
+    start = ~gap
+    start[1:] &= gap[:-1]
+    starts, ends = np.flatnonzero(start), np.flatnonzero(newline)
+    if len(starts) != 2 * lines:
+        return False
+    # line i holds tokens 2i and 2i+1: both before its newline, after the previous one
+    return bool((starts[1::2] < ends).all() and (starts[2::2] > ends[:-1]).all())
+
+
+class _TextParser:
+    """
+    "src dst" lines. A chunk of whole lines is parsed in one NumPy call and
+    copied through unchanged; only chunks with comments, blank lines or
+    errors fall back to a line-by-line pass (which also finds the bad line).
+    """
+
+    def __init__(self, writer: _EdgeWriter):
+        self.writer = writer
+        self._partial = b""
+        self.line = 0           # lines consumed so far
+
+    def feed(self, data: bytes):
+        data = self._partial + data
+        cut = data.rfind(b"\n") + 1
+        self._partial = data[cut:]
+        if cut:
+            self._block(data[:cut])
+
+    def close(self):
+        if self._partial.strip():
+            self._block(self._partial + b"\n")
+        self._partial = b""
+
+    def _block(self, block: bytes):
+        lines = block.count(b"\n")
+        ids = None
+        if b"#" not in block:
+            try:
+                with warnings.catch_warnings():
+                    # fromstring only warns when it stops at a bad token
+                    warnings.simplefilter("error", DeprecationWarning)
+                    ids = np.fromstring(block, dtype=np.int64, sep=" ")
+            except (ValueError, DeprecationWarning):
+                ids = None
+        # the total alone would let "1 2 3" + "4" through
+        if ids is not None and len(ids) == 2 * lines and _two_tokens_per_line(block, lines):
+            self.writer.check(ids, f"lines {self.line + 1}-{self.line + lines}")
+            self.writer.out.write(block)
+            self.writer.edges += lines
+        else:
+            self._slow(block)
+        self.line += lines
+
+    def _slow(self, block: bytes):
+        src, dst = [], []
+        lines = block.split(b"\n")[:-1]
+        for offset, raw in enumerate(lines, 1):
+            line = raw.split(b"#", 1)[0].split()
+            if not line:
+                continue
+            try:
+                if len(line) != 2:
+                    raise ValueError
+                s, d = int(line[0]), int(line[1])
+            except ValueError:
+                text = raw.decode("utf-8", "replace").strip()[:80]
+                raise GraphUploadError(f"line {self.line + offset}: expected 'src dst', got {text!r}") from None
+            src.append(s)
+            dst.append(d)
+        if src:
+            src, dst = np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+            self.writer.check(np.concatenate((src, dst)), f"lines {self.line + 1}-{self.line + len(lines)}")
+            self.writer.write_pairs(src, dst)
+
+
+class _CSRParser:
+    """Binary CSR (see module docstring): header, row_ptr to a temp file, then col streamed."""
+
+    def __init__(self, writer: _EdgeWriter):
+        self.writer = writer
+        self._buf = b""
+        self.n = self.m = None
+        self._ptr_file = None
+        self._ptr_bytes = 0
+        self._last_ptr = 0
+        self.row_ptr = None
+        self._edge = 0          # col entries consumed
+
+    def feed(self, data: bytes):
+        self._buf += data
+        if self.n is None:
+            if len(self._buf) < _CSR_HEADER.size:
+                return
+            _, self.n, self.m = _CSR_HEADER.unpack_from(self._buf)
+            if self.n > MAX_NODE_ID + 1:
+                raise GraphUploadError(f"CSR: {self.n} nodes, at most {MAX_NODE_ID + 1} supported")
+            self._buf = self._buf[_CSR_HEADER.size:]
+            self._ptr_file = tempfile.TemporaryFile()
+
+        if self.row_ptr is None:
+            need = 8 * (self.n + 1) - self._ptr_bytes
+            take = len(self._buf) // 8 * 8 if len(self._buf) < need else need
+            if take:
+                ptr = np.frombuffer(self._buf[:take], dtype="<i8")
+                if (ptr[0] != 0 if self._ptr_bytes == 0 else ptr[0] < self._last_ptr) or np.any(np.diff(ptr) < 0):
+                    raise GraphUploadError("CSR: row_ptr must start at 0 and never decrease")
+                self._last_ptr = int(ptr[-1])
+                self._ptr_file.write(self._buf[:take])
+                self._ptr_bytes += take
+                self._buf = self._buf[take:]
+            if self._ptr_bytes < 8 * (self.n + 1):
+                return
+            if self._last_ptr != self.m:
+                raise GraphUploadError(f"CSR: row_ptr[n] = {self._last_ptr}, expected m = {self.m}")
+            self._ptr_file.flush()
+            self.row_ptr = np.memmap(self._ptr_file, dtype="<i8", mode="r", shape=(self.n + 1,))
+
+        take = min(len(self._buf) // 4, self.m - self._edge)
+        if take == 0:
+            if self._edge == self.m and self._buf:
+                raise GraphUploadError("CSR: trailing bytes after col")
+            return
+        col = np.frombuffer(self._buf[: 4 * take], dtype="<i4")
+        self._buf = self._buf[4 * take:]
+        for start in range(0, take, _CSR_EDGE_CHUNK):
+            dst = col[start:start + _CSR_EDGE_CHUNK]
+            if len(dst) and (int(dst.min()) < 0 or int(dst.max()) >= self.n):
+                raise GraphUploadError(f"CSR: col entry out of range [0, {self.n})")
+            first = self._edge + start
+            src = np.searchsorted(self.row_ptr, np.arange(first, first + len(dst)), side="right") - 1
+            self.writer.write_pairs(src, dst)
+        self._edge += take
+        if self.n:
+            self.writer.max_id = self.n - 1
+
+    def close(self):
+        if self.n is None or self._edge < (self.m or 0) or self.row_ptr is None:
+            raise GraphUploadError("CSR: upload ended early")
+        if self._buf:
+            raise GraphUploadError("CSR: trailing bytes after col")
+        self.row_ptr = None
+        self._ptr_file.close()
+
+
+class EdgeListSink:
+    """
+    Feed an upload chunk by chunk; it is validated and written to out_path
+    as a "src dst" edge list. close() returns a summary, or raises
+    GraphUploadError (as does feed() as soon as something is wrong).
+    """
+
+    def __init__(self, out_path):
+        self._out = open(out_path, "wb")
+        self.writer = _EdgeWriter(self._out)
+        self.format = None
+        self.bytes_in = 0
+        self._head = b""
+        self._inflate = None
+        self._parser = None
+
+    def feed(self, data: bytes):
+        self.bytes_in += len(data)
+        if self._parser is None and self._inflate is None:
+            self._head += data
+            if len(self._head) < len(CSR_MAGIC):
+                return
+            data, self._head = self._head, b""
+            if data.startswith(GZIP_MAGIC):
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                self._pick(data)
+
+        if self._inflate is None:
+            self._parser.feed(data)
+            return
+        try:
+            while data:
+                out = self._inflate.decompress(data, _INFLATE_CHUNK)
+                while True:
+                    self._decompressed(out)
+                    if not self._inflate.unconsumed_tail:
+                        break
+                    out = self._inflate.decompress(self._inflate.unconsumed_tail, _INFLATE_CHUNK)
+                # concatenated gzip (cat a.gz b.gz): the next member starts right after this one;
+                # anything that is not a gzip member fails its header check
+                data = self._inflate.unused_data if self._inflate.eof else b""
+                if data:
+                    self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        except zlib.error as e:
+            raise GraphUploadError(f"gzip: {e}") from None
+
+    def _decompressed(self, data: bytes):
+        if self._parser is None:
+            self._head += data
+            if len(self._head) < len(CSR_MAGIC):
+                return
+            data, self._head = self._head, b""
+            self._pick(data, compressed=True)
+        self._parser.feed(data)
+
+    def _pick(self, head: bytes, compressed: bool = False):
+        binary = head.startswith(CSR_MAGIC)
+        self.format = ("gzip+" if compressed else "") + ("csr" if binary else "text")
+        self._parser = (_CSRParser if binary else _TextParser)(self.writer)
+
+    def close(self) -> dict:
+        try:
+            if self._head:
+                # tiny upload: shorter than the magic
+                head, self._head = self._head, b""
+                if self._parser is None:
+                    self._pick(head, compressed=self._inflate is not None)
+                self._parser.feed(head)
+            if self._inflate is not None and not self._inflate.eof:
+                raise GraphUploadError("gzip: upload ended early")
+            if self._parser is not None:
+                self._parser.close()
+        finally:
+            self._out.close()
+        if self.writer.edges == 0:
+            raise GraphUploadError("no edges in upload")
+        return {
+            "format": self.format,
+            "nodes": self.writer.max_id + 1,
+            "edges": self.writer.edges,
+            "bytes": self.bytes_in,
+        }
+
+    def abort(self):
+        self._out.close()
+        parser = self._parser
+        if isinstance(parser, _CSRParser) and parser._ptr_file is not None:
+            parser.row_ptr = None
+            parser._ptr_file.close()
+
+
+class MultipartSink:
+    """
+    A multipart/form-data body around an EdgeListSink, parsed as it
+    arrives: the bytes of the `file` field go straight to the sink (nothing
+    is spooled to disk first), other fields are short text values collected
+    in .fields. Same feed() / close() / abort() as the sink.
+    """
+
+    MAX_FIELD_BYTES = 1024
+
+    def __init__(self, content_type: str, sink: EdgeListSink, file_field: str = "file"):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise GraphUploadError("multipart: no boundary in Content-Type")
+        self.sink = sink
+        self.file_field = file_field
+        self.fields: dict[str, str] = {}
+        self.has_file = False
+        self._name = None           # field name of the current part
+        self._value = b""
+        self._header = [b"", b""]   # current header (name, value)
+        self._ended = False
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._part_begin,
+            "on_header_field": lambda data, start, end: self._add_header(0, data[start:end]),
+            "on_header_value": lambda data, start, end: self._add_header(1, data[start:end]),
+            "on_header_end": self._header_end,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+            "on_end": self._end,
+        })
+
+    def _part_begin(self):
+        self._name, self._value = None, b""
+
+    def _add_header(self, i: int, data: bytes):
+        self._header[i] += data
+
+    def _header_end(self):
+        name, value = self._header
+        self._header = [b"", b""]
+        if name.strip().lower() == b"content-disposition":
+            self._name = parse_options_header(value)[1].get(b"name", b"").decode("utf-8", "replace")
+            if self._name == self.file_field:
+                if self.has_file:
+                    raise GraphUploadError(f"multipart: more than one {self.file_field!r} field")
+                self.has_file = True
+
+    def _part_data(self, data, start: int, end: int):
+        if self._name == self.file_field:
+            self.sink.feed(bytes(data[start:end]))
+            return
+        self._value += data[start:end]
+        if len(self._value) > self.MAX_FIELD_BYTES:
+            raise GraphUploadError(f"multipart: field {self._name!r} over {self.MAX_FIELD_BYTES} bytes")
+
+    def _part_end(self):
+        if self._name is not None and self._name != self.file_field:
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
+
+    def _end(self):
+        self._ended = True
+
+    def feed(self, data: bytes):
+        try:
+            self._parser.write(data)
+        except MultipartParseError as e:
+            raise GraphUploadError(f"multipart: {e}") from None
+
+    def close(self) -> dict:
+        if not self._ended:
+            raise GraphUploadError("multipart: upload ended early")
+        if not self.has_file:
+            raise GraphUploadError(f"form field {self.file_field!r} is required")
+        return self.sink.close()
+
+    def abort(self):
+        self.sink.abort()
+
+
+def write_csr(path, src, dst, n: int | None = None):
+    """Write an edge list as the binary CSR upload format (client-side helper)."""
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if n is None:
+        n = int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+    order = np.argsort(src, kind="stable")
+    row_ptr = np.zeros(n + 1, dtype="<i8")
+    np.cumsum(np.bincount(src, minlength=n), out=row_ptr[1:])
+    with open(path, "wb") as f:
+        f.write(_CSR_HEADER.pack(CSR_MAGIC, n, len(src)))
+        f.write(row_ptr.tobytes())
+        f.write(dst[order].astype("<i4").tobytes())
@@ -1,17 +1,29 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
+import asyncio
+import contextvars
 import tempfile
 import subprocess
 import os
 import re
 import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse, urlunparse
 from config import CLUSTER_USER, CLUSTER_HOST, REMOTE_WORKDIR, REMOTE_BIN
-from typing import Any
 from tfidf_index import create_tfidf_index
+from corpora import DEFAULT_CORPUS, Corpus, CorpusData, CorpusRegistry
+from metrics import METRICS_ENABLED, REGISTRY, span, start_request, finish_request
+from graph_response import FastJSONResponse, GraphResult, dumps, graph_body, negotiate, render
+from graph_upload import EdgeListSink, GraphUploadError, MultipartSink
 from pydantic import BaseModel
+import numpy as np
 import sys
 
 API_DIR = Path(__file__).resolve().parent
@@ -20,9 +32,21 @@ ROOT_DIR = API_DIR.parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
-from crawler.core import crawl_graph
+# parse_pagerank.read_export for pagerank.npz (backend/data is not a package)
+BACKEND_DATA_DIR = ROOT_DIR / "backend" / "data"
+if str(BACKEND_DATA_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DATA_DIR))
 
-app = FastAPI(title="PageRank Service")
+from parse_pagerank import read_export  # noqa: E402
+
+# crawler.core (requests + BeautifulSoup) is imported on first use in
+# pagerank_from_url so it does not slow down process startup.
+
+# Reference point for startup timing (see /health and measure_startup.py)
+PROCESS_T0 = time.perf_counter()
+
+# orjson-backed JSON for every response (see graph_response.py)
+app = FastAPI(title="PageRank Service", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,8 +54,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+
+# Stage timing: spans recorded during a request are returned as a
+# Server-Timing header and aggregated for /metrics. With API_METRICS=0 the
+# middleware is not installed and span() is a shared no-op.
+if METRICS_ENABLED:
+    @app.middleware("http")
+    async def stage_timing_middleware(request, call_next):
+        timer, token = start_request()
+        t0 = time.perf_counter()
+        response = await call_next(request)
+        total = time.perf_counter() - t0
+
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        finish_request(timer, token, path, total)
+
+        timing = timer.server_timing()
+        response.headers["Server-Timing"] = (
+            f"{timing}, total;dur={total * 1000:.3f}" if timing else f"total;dur={total * 1000:.3f}"
+        )
+        return response
+
 ROOT_DIR = API_DIR.parent
 CRAWLER_PAGES_PATH = ROOT_DIR / "crawler" / "data" / "pages.json"
 PAGERANK_PATH = ROOT_DIR / "backend" / "data" / "pagerank.json"
@@ -39,37 +86,44 @@ PAGERANK_PATH = ROOT_DIR / "backend" / "data" / "pagerank.json"
 # Regex for cluster output 
 TOP_LINE_RE = re.compile(r"^\s*node\s+(\d+)\s*:\s*([0-9\.Ee+-]+)\s*$")
 
-# Global search state 
-tfidf_index: Any | None = None
-pages_by_url = {}           # url -> full page dict from crawler
-pagerank_by_url = {}        # url -> raw pagerank score
-pagerank_norm_by_url = {}   # url -> normalized pagerank score in [0, 1]
+# Named corpora (see corpora.py): "default" is the pair above, others are
+# CORPORA_DIR/<name>/{pages.json,pagerank.json}. Loaded on first use; past
+# API_CORPUS_MEMORY_MB the least recently used ones are dropped again.
+CORPORA_DIR = Path(os.getenv("API_CORPORA_DIR", str(BACKEND_DATA_DIR / "corpora")))
+CORPUS_MEMORY_MB = float(os.getenv("API_CORPUS_MEMORY_MB", "2048"))
+# a search for a corpus that is still loading waits this long before a 503
+CORPUS_WAIT_S = float(os.getenv("API_CORPUS_WAIT_S", "10"))
+
+_first_health_logged = False
 
 
 # Offline data loading & index building (runs at startup)
 
 
-def _load_data_and_build_index():
-    global tfidf_index, pages_by_url, pagerank_by_url, pagerank_norm_by_url
+def _load_corpus(corpus: Corpus) -> CorpusData:
+    status = corpus.status
 
     #  Load crawler pages (text) 
-    if not CRAWLER_PAGES_PATH.exists():
-        raise RuntimeError(f"pages.json not found at {CRAWLER_PAGES_PATH}")
+    status["stage"] = "loading pages"
+    if not corpus.pages_path.exists():
+        raise RuntimeError(f"pages.json not found at {corpus.pages_path}")
 
-    with CRAWLER_PAGES_PATH.open("r", encoding="utf-8") as f:
+    with corpus.pages_path.open("r", encoding="utf-8") as f:
         pages = json.load(f)
 
     # pages is like: [{ "id": ..., "url": "...", "text": "..." }, ...]
-    pages_by_url = {}
+    # Everything is built into locals and published at the end, so requests
+    # served during the build never see a half-built index.
+    new_pages_by_url = {}
     index = create_tfidf_index()
-    print(f"[search] Using TF-IDF index implementation: {type(index).__name__}")
+    print(f"[search] {corpus.name}: using TF-IDF index implementation: {type(index).__name__}")
     
     for p in pages:
         raw_url = p["url"]
         url = normalize_url_backend(raw_url)
         text = p.get("text", "") or ""
 
-        existing = pages_by_url.get(url)
+        existing = new_pages_by_url.get(url)
         if existing:
             # simple heuristic: keep the one with longer text
             if len(text) <= len(existing.get("text", "") or ""):
@@ -80,32 +134,70 @@ def _load_data_and_build_index():
             "url": url,   # store normalized URL in memory
             "text": text,
         }
-        pages_by_url[url] = page_record
+        new_pages_by_url[url] = page_record
+    del pages
 
     # 2) build TF-IDF index on normalized, deduped URLs
-    for url, page in pages_by_url.items():
+    status["stage"] = "indexing"
+    status["docs_total"] = len(new_pages_by_url)
+    for i, (url, page) in enumerate(new_pages_by_url.items(), 1):
         index.add_document(url, page.get("text", "") or "")
+        if i % 256 == 0:
+            status["docs_added"] = i
+    status["docs_added"] = len(new_pages_by_url)
 
-    index.finalize()
-    tfidf_index = index
+    # PageRank is loaded before finalize() so autocomplete can weight terms by it
+    status["stage"] = "loading pagerank"
+    new_pagerank_by_url, new_pagerank_norm_by_url = _load_pagerank(corpus.pagerank_path)
 
+    status["stage"] = "finalizing"
+    index.finalize(doc_weights=new_pagerank_by_url)
+
+    return CorpusData(index, new_pages_by_url, new_pagerank_by_url, new_pagerank_norm_by_url)
+
+
+corpora = CorpusRegistry(_load_corpus, CORPORA_DIR, memory_budget=int(CORPUS_MEMORY_MB * 2**20))
+corpora.add(DEFAULT_CORPUS, CRAWLER_PAGES_PATH, PAGERANK_PATH, pinned=True)
+corpora.scan()
+
+
+def _build_index_in_background():
+    corpus = corpora.get(DEFAULT_CORPUS)
+    try:
+        corpora.load_now(corpus)
+    except Exception as e:
+        # If this fails you'll see it in the server logs and in /ready
+        print(f"[startup] ERROR while building search index: {e}")
+    print(f"[startup] Index build {corpus.status['state']} after {corpus.status['build_seconds']}s")
 
-    #  Load PageRank (CUDA output) 
-    pagerank_by_url = {}
-    pagerank_norm_by_url = {}
 
-    if not PAGERANK_PATH.exists():
-        print(f"[search] Warning: pagerank.json not found at {PAGERANK_PATH}. PageRank scores will be zero.")
-        return
+def _pagerank_entries(path: Path):
+    """(url, score) pairs from pagerank.json, or from the pagerank.npz next to it if that is not older."""
+    npz = path.with_suffix(".npz")
+    if npz.exists() and (not path.exists() or npz.stat().st_mtime >= path.stat().st_mtime):
+        _, urls, scores = read_export(npz)
+        return zip(urls, scores.tolist())
 
-    with PAGERANK_PATH.open("r", encoding="utf-8") as f:
+    with path.open("r", encoding="utf-8") as f:
         pr_data = json.load(f)
+    return ((entry["url"], float(entry.get("score", 0.0))) for entry in pr_data)
+
+
+def _load_pagerank(path: Path = PAGERANK_PATH):
+    """
+    Load PageRank (CUDA output) as url -> raw score and url -> score in [0, 1].
+    Returns two empty dicts if pagerank.json (and pagerank.npz) is missing.
+    """
+    pagerank_by_url = {}
+    pagerank_norm_by_url = {}
+
+    if not path.exists() and not path.with_suffix(".npz").exists():
+        print(f"[search] Warning: pagerank.json not found at {path}. PageRank scores will be zero.")
+        return pagerank_by_url, pagerank_norm_by_url
 
     # 3) normalize URLs and dedupe PageRank (keep max score if duplicates)
-    for entry in pr_data:
-        raw_url = entry["url"]
+    for raw_url, score in _pagerank_entries(path):
         url = normalize_url_backend(raw_url)
-        score = float(entry.get("score", 0.0))
 
         existing_score = pagerank_by_url.get(url)
         if existing_score is not None and score <= existing_score:
@@ -125,7 +217,7 @@ def _load_data_and_build_index():
             for url, score in pagerank_by_url.items()
         }
 
-    print(f"[search] Loaded {len(pages_by_url)} pages, {len(pagerank_by_url)} PageRank scores.")
+    return pagerank_by_url, pagerank_norm_by_url
 
 #removing duplicate urls 
 def normalize_url_backend(url: str) -> str:
@@ -154,12 +246,35 @@ def normalize_url_backend(url: str) -> str:
 
 @app.on_event("startup")
 async def startup_event():
-    # Build TF-IDF index and load PageRank when FastAPI starts
+    # Build the default corpus (TF-IDF index + PageRank) in the background so
+    # the server accepts traffic right away; /ready reports when search is
+    # usable. Other corpora are loaded by their first search.
+    threading.Thread(
+        target=_build_index_in_background, name="index-build", daemon=True
+    ).start()
+
+
+async def _corpus_data(name: str) -> CorpusData:
+    """The loaded corpus `name`, loading it first if needed (waits up to CORPUS_WAIT_S)."""
+    corpus = corpora.get(name)
+    if corpus is None:
+        raise HTTPException(status_code=404, detail=f"Unknown corpus {name!r}")
+    data = corpora.touch(corpus)
+    if data is not None:
+        return data
+
+    future = corpora.load(corpus)
     try:
-        _load_data_and_build_index()
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), CORPUS_WAIT_S)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=f"Search index for corpus {name!r} is still building")
     except Exception as e:
-        # If this fails you'll see it in the server logs
-        print(f"[startup] ERROR while building search index: {e}")
+        raise HTTPException(status_code=500, detail=f"Search index failed to build: {e}")
+    # just loaded; only None if something evicted it already
+    data = corpora.touch(corpus)
+    if data is None:
+        raise HTTPException(status_code=503, detail=f"Corpus {name!r} was evicted, retry")
+    return data
 
 
 # Helper: call CUDA PageRank on cluster
@@ -167,10 +282,11 @@ async def startup_event():
 def run_pagerank_on_cluster(local_input_path: str, top_k: int = 10):
     # 1) Upload file to cluster
     remote_input = f"{REMOTE_WORKDIR}/input.txt"
-    subprocess.run(
-        ["scp", local_input_path, f"{CLUSTER_USER}@{CLUSTER_HOST}:{remote_input}"],
-        check=True,
-    )
+    with span("scp_upload"):
+        subprocess.run(
+            ["scp", local_input_path, f"{CLUSTER_USER}@{CLUSTER_HOST}:{remote_input}"],
+            check=True,
+        )
 
     # 2) Run pagerank_gpu on the cluster
     remote_output = f"{REMOTE_WORKDIR}/output.txt"
@@ -178,11 +294,12 @@ def run_pagerank_on_cluster(local_input_path: str, top_k: int = 10):
         f"cd {REMOTE_WORKDIR} && "
         f"{REMOTE_BIN} input.txt output.txt 0.85 1e-8 100 {top_k}"
     )
-    result = subprocess.run(
-        ["ssh", f"{CLUSTER_USER}@{CLUSTER_HOST}", cmd],
-        capture_output=True,
-        text=True,
-    )
+    with span("gpu_run"):
+        result = subprocess.run(
+            ["ssh", f"{CLUSTER_USER}@{CLUSTER_HOST}", cmd],
+            capture_output=True,
+            text=True,
+        )
     if result.returncode != 0:
         raise RuntimeError(result.stderr)
 
@@ -190,14 +307,15 @@ def run_pagerank_on_cluster(local_input_path: str, top_k: int = 10):
     with tempfile.NamedTemporaryFile(delete=False) as tmp_out:
         local_output = tmp_out.name
 
-    subprocess.run(
-        ["scp", f"{CLUSTER_USER}@{CLUSTER_HOST}:{remote_output}", local_output],
-        check=True,
-    )
+    with span("scp_download"):
+        subprocess.run(
+            ["scp", f"{CLUSTER_USER}@{CLUSTER_HOST}:{remote_output}", local_output],
+            check=True,
+        )
 
     # 4) Parse "Top K PageRank" section
     ranks = []
-    with open(local_output, "r") as f:
+    with span("parse_output"), open(local_output, "r") as f:
         in_top = False
         for line in f:
             line = line.rstrip("\n")
@@ -224,9 +342,37 @@ class UrlPageRankRequest(BaseModel):
     top_k: int = 20      
     lang: str | None = None      # e.g. "en" or "de"
     workers: int = 5    
-    
-@app.post("/api/pagerank/url")
-async def pagerank_from_url(payload: UrlPageRankRequest):
+    edge_limit: int | None = None   # page edges: first page inline, rest via .../{job_id}/edges
+
+
+# Crawls and cluster runs block for seconds to minutes. They run on their
+# own small pool (not Starlette's, which also serves the sync endpoints)
+# so the event loop keeps answering search while they do.
+CRAWL_JOBS = int(os.getenv("API_CRAWL_JOBS", "2"))
+_crawl_executor = ThreadPoolExecutor(max_workers=CRAWL_JOBS, thread_name_prefix="pagerank-url")
+
+# SSE comment sent when nothing happened for this long (keeps proxies from
+# closing the stream during a long cluster run)
+SSE_KEEPALIVE_S = 15.0
+
+# Provisional ranks in progress events are recomputed only once the crawl
+# graph has this many times the edges of the last run; in between the last
+# ranks are resent. All runs together then cost a few runs on the final
+# graph, not one per progress tick on the crawl thread.
+PROVISIONAL_EDGE_GROWTH = 1.25
+
+# Finished jobs whose edges are paged (edge_limit), oldest evicted first
+URL_RESULTS_KEPT = 8
+_url_results: "OrderedDict[str, GraphResult]" = OrderedDict()
+
+
+async def _off_loop(fn, *args):
+    """Run a blocking call on the crawl pool; span()s inside still count for this request."""
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_crawl_executor, ctx.run, fn, *args)
+
+
+def _start_url_of(payload: UrlPageRankRequest) -> str:
     start_url = payload.url.strip()
     if not start_url:
         raise HTTPException(status_code=400, detail="URL is required")
@@ -234,41 +380,121 @@ async def pagerank_from_url(payload: UrlPageRankRequest):
     parsed = urlparse(start_url)
     if not parsed.scheme.startswith("http"):
         raise HTTPException(status_code=400, detail="URL must start with http:// or https://")
+    return start_url
+
+
+def _rank_rows(url_to_id, ranked) -> list[dict]:
+    """[(node_id, score)] in rank order -> response rows with URLs."""
+    rows = []
+    for i, (node_id, score) in enumerate(ranked):
+        url = url_to_id.url_of(node_id) if 0 <= node_id < len(url_to_id) else f"node-{node_id}"
+        rows.append({"node_id": node_id, "url": url, "rank": i + 1, "score": score})
+    return rows
+
+
+def _provisional_ranks(edges, n: int, top_k: int, damping: float = 0.85, iterations: int = 20):
+    """
+    Quick local PageRank of a partial crawl graph, top_k (node_id, score).
+    Only meant to show which pages are emerging; the final ranks still
+    come from the cluster.
+    """
+    src, dst = edges.to_numpy()
+    out_deg = np.bincount(src, minlength=n)
+    linked = out_deg > 0
+    inv_out = np.zeros(n)
+    inv_out[linked] = 1.0 / out_deg[linked]
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        contrib = np.bincount(dst, weights=(rank * inv_out)[src], minlength=n)
+        rank = (1 - damping) / n + damping * (contrib + rank[~linked].sum() / n)
+    top = np.argsort(-rank)[:top_k]
+    return [(int(i), float(rank[i])) for i in top]
+
+
+class _ProvisionalRanks:
+    """
+    Provisional top_k of one running crawl, recomputed only after the edge
+    count grew by PROVISIONAL_EDGE_GROWTH (progress callbacks run on the
+    crawl's bookkeeping thread and must stay cheap).
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.edge_count = 0
+        self.ranked: list[tuple[int, float]] = []
+
+    def get(self, state) -> list[tuple[int, float]]:
+        edge_count = len(state.edges)
+        if edge_count and edge_count >= self.edge_count * PROVISIONAL_EDGE_GROWTH:
+            self.ranked = _provisional_ranks(state.edges, len(state.url_to_id), self.top_k)
+            self.edge_count = edge_count
+        return self.ranked
+
+
+def _crawl_progress(state, ranks: _ProvisionalRanks) -> dict:
+    """Progress event for a running crawl (called on its bookkeeping thread)."""
+    n = len(state.url_to_id)
+    return {
+        "visited": len(state.visited),
+        "max_pages": state.max_pages,
+        "indexed": state.indexed,
+        "page_count": n,
+        "edge_count": len(state.edges),
+        "pages": _rank_rows(state.url_to_id, ranks.get(state)),
+    }
+
+
+def _pagerank_from_url(payload: UrlPageRankRequest, start_url: str, emit=None, cancelled=None) -> GraphResult | None:
+    """
+    Crawl, rank on the cluster, shape the response. Blocking: run it with
+    _off_loop. emit(event, data), if given, receives "progress" events
+    during the crawl and a "stage" event before the cluster run;
+    setting `cancelled` (threading.Event) stops the crawl and skips the
+    cluster run (returns None).
+    """
+    from crawler.core import crawl_graph
+
+    progress = None
+    if emit is not None:
+        ranks = _ProvisionalRanks(payload.top_k)
+
+        def progress(state):
+            if cancelled is not None and cancelled.is_set():
+                state.stop()
+                return
+            emit("progress", _crawl_progress(state, ranks))
 
     # 1) Crawl a small graph using the shared crawler core
     try:
-        pages, edges_url, url_to_id, visited = crawl_graph(
-            start_url,
-            max_pages=payload.max_pages,
-            target_lang=payload.lang,      
-            workers=payload.workers,       
-            verbose=False,                 
-        )
+        with span("crawl"):
+            _, edges, url_to_id, visited = crawl_graph(
+                start_url,
+                max_pages=payload.max_pages,
+                target_lang=payload.lang,      
+                workers=payload.workers,       
+                verbose=False,                 
+                keep_pages=False,
+                progress=progress,
+            )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Crawl failed: {e}")
+    if cancelled is not None and cancelled.is_set():
+        return None
 
-    if not edges_url:
+    # 2) Edges come back as interned (src_id, dst_id) already
+    if not edges:
         raise HTTPException(status_code=400, detail="No crawlable links found from this URL.")
 
-    # 2) Convert URL-edges -> ID-edges for CUDA
-    edges_id = [
-        (url_to_id[src], url_to_id[tgt])
-        for (src, tgt) in edges_url
-        if src in url_to_id and tgt in url_to_id
-    ]
-
-    if not edges_id:
-        raise HTTPException(status_code=400, detail="Crawled pages but found no internal links to rank.")
-
-    id_to_url = {node_id: url for url, node_id in url_to_id.items()}
-
     # 3) Write edges to a temporary file in "src dst" format
-    with tempfile.NamedTemporaryFile(delete=False, mode="w") as tmp:
-        for src_id, dst_id in edges_id:
-            tmp.write(f"{src_id} {dst_id}\n")
-        local_edges_path = tmp.name
+    with span("write_edges"):
+        fd, local_edges_path = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        edges.write_txt(local_edges_path)
 
     # 4) Run PageRank on the cluster using existing helper
+    if emit is not None:
+        emit("stage", {"stage": "ranking", "page_count": len(url_to_id), "edge_count": len(edges)})
     try:
         raw_ranks = run_pagerank_on_cluster(local_edges_path, top_k=payload.top_k)
     except Exception as e:
@@ -276,55 +502,197 @@ async def pagerank_from_url(payload: UrlPageRankRequest):
     finally:
         os.remove(local_edges_path)
 
-    # 5) Map node IDs back to URLs and shape response
-    pages_out = []
-    for i, entry in enumerate(raw_ranks):
-        node_id = entry["node"]
-        url = id_to_url.get(node_id, f"node-{node_id}")
-        pages_out.append(
-            {
-                "node_id": node_id,
-                "url": url,
-                "rank": i + 1,
-                "score": entry["score"],
-            }
-        )
+    # 5) Map node IDs back to URLs; the response (with the full node and
+    # edge lists, so the frontend can draw the graph) is shaped by graph_response
+    pages_out = _rank_rows(url_to_id, [(entry["node"], entry["score"]) for entry in raw_ranks])
+    src, dst = edges.to_numpy()
+    return GraphResult(start_url, pages_out, list(url_to_id.urls()), src, dst)
 
-    edges_out = [{"from": src, "to": dst} for (src, dst) in edges_id]
 
-    # Also return a simple edge list with IDs, so frontend can visualize a graph if it wants
-    nodes_out = [
-        {"id": node_id, "url": url}
-        for node_id, url in id_to_url.items()
-    ]
+def _format_of(request: Request, fmt: str | None) -> str:
+    try:
+        return negotiate(request.headers.get("accept"), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {
-        "start_url": start_url,
-        "page_count": len(url_to_id),
-        "edge_count": len(edges_id),
-        "pages": pages_out,
-        "nodes": nodes_out,
-        "edges": edges_out,
-    }
+
+def _keep_result(result: GraphResult) -> str:
+    job_id = uuid.uuid4().hex
+    _url_results[job_id] = result
+    while len(_url_results) > URL_RESULTS_KEPT:
+        _url_results.popitem(last=False)
+    return job_id
+
+
+@app.post("/api/pagerank/url")
+async def pagerank_from_url(payload: UrlPageRankRequest, request: Request, format: str | None = None):
+    """
+    Crawl from payload.url and rank the graph on the cluster. The response
+    format (json / compact / binary) comes from ?format= or the Accept
+    header, see graph_response.py. With edge_limit only the first page of
+    edges is inline; fetch the rest from /api/pagerank/url/{job_id}/edges.
+    """
+    fmt = _format_of(request, format)
+    start_url = _start_url_of(payload)
+    result = await _off_loop(_pagerank_from_url, payload, start_url)
+    job_id = _keep_result(result) if payload.edge_limit is not None else None
+
+    # Serialize here (not in FastAPI) so the time shows up as its own stage
+    with span("serialize"):
+        return render(result, fmt, limit=payload.edge_limit, job_id=job_id)
+
+
+@app.get("/api/pagerank/url/{job_id}/edges")
+async def pagerank_url_edges(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10000, ge=1),
+    format: str | None = None,
+):
+    """A page of a finished job's edges (jobs started with edge_limit; the last few are kept)."""
+    fmt = _format_of(request, format)
+    result = _url_results.get(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    with span("serialize"):
+        return render(result, fmt, offset=offset, limit=limit, job_id=job_id, nodes=False)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+@app.post("/api/pagerank/url/stream")
+async def pagerank_from_url_stream(payload: UrlPageRankRequest, request: Request, format: str | None = None):
+    """
+    Same as /api/pagerank/url, streamed as Server-Sent Events:
+
+      progress  crawl counters + provisional top pages (about twice a second)
+      stage     crawl finished, cluster PageRank running
+      result    the /api/pagerank/url response body (?format=compact for
+                the columnar one; binary is not available here)
+      error     {status, detail}; the stream ends after result or error
+
+    A client that disconnects stops the crawl.
+    """
+    fmt = format or "json"
+    if fmt not in ("json", "compact"):
+        raise HTTPException(status_code=400, detail="The event stream supports format=json or format=compact")
+    start_url = _start_url_of(payload)
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def emit(event: str, data):
+        # called on the crawl thread
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    async def run():
+        try:
+            result = await _off_loop(_pagerank_from_url, payload, start_url, emit, cancelled)
+            if result is not None:
+                job_id = _keep_result(result) if payload.edge_limit is not None else None
+                events.put_nowait(("result", graph_body(result, fmt, limit=payload.edge_limit, job_id=job_id)))
+        except HTTPException as e:
+            events.put_nowait(("error", {"status": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            events.put_nowait(("error", {"status": 500, "detail": str(e)}))
+        finally:
+            events.put_nowait(None)
+
+    async def stream():
+        job = asyncio.create_task(run())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield _sse(*item)
+            await job
+        finally:
+            cancelled.set()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # Existing endpoint: run PageRank on uploaded graph
 
+# Upload bytes handed to the edge-list parser at a time
+UPLOAD_CHUNK = 1 << 20
+
+
+async def _parse_upload(chunks, sink: EdgeListSink):
+    """Feed an async stream of upload chunks to `sink`, parsing off the event loop."""
+    pending, size = [], 0
+    async for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= UPLOAD_CHUNK:
+            await asyncio.to_thread(sink.feed, b"".join(pending))
+            pending, size = [], 0
+    if pending:
+        await asyncio.to_thread(sink.feed, b"".join(pending))
+    return await asyncio.to_thread(sink.close)
+
+
+def _form_top_k(value: str) -> int:
+    try:
+        top_k = int(value)
+    except ValueError:
+        top_k = 0
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="Form field 'top_k' must be a positive integer")
+    return top_k
+
+
 @app.post("/api/pagerank/file")
-async def pagerank_file(file: UploadFile = File(...), top_k: int = Form(10)):
-    # Save file locally on laptop
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmp.write(await file.read())
-        local_path = tmp.name
+async def pagerank_file(request: Request, top_k: int = Query(10, ge=1)):
+    """
+    Rank an uploaded graph on the cluster. The graph comes either as a
+    multipart form (field `file`, optional field `top_k`) or as the raw
+    request body (`?top_k=`); both are parsed while they are still
+    uploading. Plain "src dst" edge lists, gzip and binary CSR are accepted
+    (see graph_upload.py); memory use does not grow with the graph.
+    """
+    fd, local_path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    sink = EdgeListSink(local_path)
+    try:
+        with span("upload"):
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith("multipart/form-data"):
+                form = MultipartSink(content_type, sink)
+                graph = await _parse_upload(request.stream(), form)
+                if "top_k" in form.fields:
+                    top_k = _form_top_k(form.fields["top_k"])
+            else:
+                graph = await _parse_upload(request.stream(), sink)
+    except GraphUploadError as e:
+        sink.abort()
+        os.remove(local_path)
+        raise HTTPException(status_code=400, detail=f"Invalid graph upload: {e}")
+    except BaseException:
+        sink.abort()
+        os.remove(local_path)
+        raise
 
     try:
-        result = run_pagerank_on_cluster(local_path, top_k)
+        result = await _off_loop(run_pagerank_on_cluster, local_path, top_k)
     except Exception as e:
-        return {"error": str(e)}
+        return {"error": str(e), "graph": graph}
     finally:
         os.remove(local_path)
 
-    return {"top": result}
+    return {"top": result, "graph": graph}
 
 
 # Helper: snippet generator for search results
@@ -368,6 +736,7 @@ def _make_snippet(text: str, query: str, max_len: int = 220) -> str:
 async def search_tum(
     q: str = Query(..., alias="query", min_length=1, description="Search query string"),
     top_k: int = Query(10, ge=1, le=50),
+    corpus: str = Query(DEFAULT_CORPUS, description="Corpus name (see /api/corpora)"),
 ):
     """
     Search TUM pages using TF-IDF + PageRank.
@@ -378,26 +747,27 @@ async def search_tum(
       - pagerank_score
       - combined_score
     """
-    if tfidf_index is None:
-        raise HTTPException(status_code=500, detail="Search index not initialized")
+    data = await _corpus_data(corpus)
 
     # Get more candidates from pure TF-IDF, then re-rank with PageRank
-    base_results = tfidf_index.search(q, top_k=top_k * 3)
+    base_results = data.index.search(q, top_k=top_k * 3)
 
     alpha = 0.8  # TF-IDF weight
     beta = 0.2   # PageRank weight
 
     combined = []
     for url, tf_score in base_results:  # url is the doc_id
-        page = pages_by_url.get(url)
+        page = data.pages_by_url.get(url)
         if not page:
             continue
 
-        pr_raw = pagerank_by_url.get(url, 0.0)
-        pr_norm = pagerank_norm_by_url.get(url, 0.0)
-        final_score = alpha * tf_score + beta * pr_norm
+        with span("pagerank"):
+            pr_raw = data.pagerank_by_url.get(url, 0.0)
+            pr_norm = data.pagerank_norm_by_url.get(url, 0.0)
+            final_score = alpha * tf_score + beta * pr_norm
 
-        snippet = _make_snippet(page.get("text", "") or "", q)
+        with span("snippet"):
+            snippet = _make_snippet(page.get("text", "") or "", q)
 
         combined.append(
             {
@@ -412,23 +782,109 @@ async def search_tum(
     combined.sort(key=lambda r: r["combined_score"], reverse=True)
     combined = combined[:top_k]
 
+    with span("serialize"):
+        return FastJSONResponse(content={
+            "query": q,
+            "corpus": corpus,
+            "count": len(combined),
+            "results": combined,
+        })
+
+
+# Autocomplete: prefix suggestions over the index vocabulary
+
+@app.get("/api/suggest")
+async def suggest(
+    q: str = Query(..., alias="query", min_length=1, description="Partial query typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+    corpus: str = Query(DEFAULT_CORPUS, description="Corpus name (see /api/corpora)"),
+):
+    """
+    Complete the last word of the query from the index vocabulary.
+    Terms are ranked by document frequency and PageRank mass.
+    Cheap enough to call on every keystroke.
+    """
+    data = await _corpus_data(corpus)
+
+    words = q.lower().split()
+    if not words or q[-1].isspace():
+        return {"query": q, "suggestions": []}
+
+    head = " ".join(words[:-1])
+    completions = data.index.suggester.suggest(words[-1], limit=limit)
+
     return {
         "query": q,
-        "count": len(combined),
-        "results": combined,
+        "suggestions": [
+            {
+                "term": term,
+                "completion": f"{head} {term}" if head else term,
+                "df": df,
+                "score": weight,
+            }
+            for term, df, weight in completions
+        ],
     }
 
 
+# Prometheus metrics (stage histograms)
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 # Health check
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    """
+    Liveness: the process is up. Also says whether the index build failed,
+    so a broken deployment does not look healthy.
+    """
+    global _first_health_logged
+    if not _first_health_logged:
+        _first_health_logged = True
+        print(f"[startup] First /health response {time.perf_counter() - PROCESS_T0:.3f}s after import")
+
+    state = corpora.get(DEFAULT_CORPUS).status["state"]
+    return {
+        "status": "degraded" if state == "failed" else "ok",
+        "index": state,
+    }
+
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness: 200 once the default corpus' search index is built, 503 while
+    building or failed. Other corpora load on first use, see /api/corpora.
+    """
+    status = corpora.get(DEFAULT_CORPUS).status
+    body = {"ready": status["state"] == "ready", **status}
+    if not body["ready"]:
+        return FastJSONResponse(status_code=503, content=body)
+    return body
+
+# Corpora: load state, load time and memory of each
+
+@app.get("/api/corpora")
+def list_corpora():
+    """
+    Every known corpus with its state, build_seconds (load time), memory_mb
+    (what the loaded index and PageRank maps keep alive), hits, loads and
+    evictions, plus the memory budget and the LRU order.
+    """
+    return corpora.stats()
+
 
 @app.get("/debug/search-status")
-def debug_search_status():
+def debug_search_status(corpus: str = DEFAULT_CORPUS):
+    found = corpora.get(corpus)
+    data = found.data if found is not None else None
     return {
-        "has_index": tfidf_index is not None,
-        "num_pages": len(pages_by_url),
-        "num_pagerank": len(pagerank_by_url),
+        "corpus": corpus,
+        "has_index": data is not None,
+        "num_pages": len(data.pages_by_url) if data else 0,
+        "num_pagerank": len(data.pagerank_by_url) if data else 0,
     }
\ No newline at end of file
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Measure API startup latency from the outside:
+  - process spawn -> first successful /health response
+  - process spawn -> /ready reports the index as built (or failed)
+
+Usage (from the api/ directory):
+  python measure_startup.py [--port 8765] [--timeout 120]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent
+
+
+def _get(url: str):
+    """Return (status, parsed JSON) or (None, None) if the server is not up yet."""
+    try:
+        with urllib.request.urlopen(url, timeout=1.0) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first /health and to /ready.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port)],
+        cwd=API_DIR,
+    )
+
+    t_health = None
+    t_ready = None
+    ready_body = None
+    try:
+        while time.perf_counter() - t0 < args.timeout:
+            if proc.poll() is not None:
+                raise SystemExit(f"uvicorn exited early with code {proc.returncode}")
+
+            if t_health is None:
+                status, _ = _get(f"{base}/health")
+                if status == 200:
+                    t_health = time.perf_counter() - t0
+            else:
+                status, body = _get(f"{base}/ready")
+                if body and body.get("state") in ("ready", "failed"):
+                    t_ready = time.perf_counter() - t0
+                    ready_body = body
+                    break
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print("\n=== Startup timing ===")
+    print(f"first /health : {t_health:.3f}s" if t_health is not None else "first /health : timed out")
+    if t_ready is not None:
+        print(f"index {ready_body['state']:<6}: {t_ready:.3f}s (build {ready_body['build_seconds']}s)")
+    else:
+        print("index ready   : timed out")
+
+
+if __name__ == "__main__":
+    main()
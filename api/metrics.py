@@ -0,0 +1,159 @@
+# metrics.py
+import os
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+# Read once at import; treat "0", "false", "no" as disabled (like TFIDF_USE_GPU).
+METRICS_ENABLED = os.getenv("API_METRICS", "1").strip() not in {"0", "false", "False", "no", "No"}
+
+# Bucket upper bounds in seconds: sub-ms search stages up to multi-minute crawls.
+BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+#
+# Histograms (Prometheus text exposition)
+#
+class Histogram:
+    """Fixed-bucket histogram; observe() is O(log buckets) under a lock."""
+
+    __slots__ = ("counts", "sum", "count", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(BUCKETS, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        # (metric name, sorted label pairs) -> Histogram
+        self._hists: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        hist = self._hists.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._hists.setdefault(key, Histogram())
+                self._help.setdefault(name, help_text)
+        return hist
+
+    def render(self) -> str:
+        """Prometheus text format (version 0.0.4)."""
+        # requests on the event loop may add series while this runs in the threadpool
+        with self._lock:
+            items = list(self._hists.items())
+            help_by_name = dict(self._help)
+
+        lines: List[str] = []
+        by_name: Dict[str, list] = {}
+        for (name, labels), hist in sorted(items, key=lambda item: item[0]):
+            by_name.setdefault(name, []).append((labels, hist))
+
+        for name, series in by_name.items():
+            lines.append(f"# HELP {name} {help_by_name[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in series:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                prefix = label_str + "," if label_str else ""
+                suffix = f"{{{label_str}}}" if label_str else ""
+                cumulative = 0
+                for bound, n in zip(BUCKETS + (float("inf"),), hist.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{suffix} {hist.sum}")
+                lines.append(f"{name}_count{suffix} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+#
+# Per-request stage timing
+#
+class RequestTimer:
+    """Accumulates stage durations (seconds) for one request."""
+
+    __slots__ = ("stages",)
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        return ", ".join(f"{name};dur={sec * 1000:.3f}" for name, sec in self.stages.items())
+
+
+_current_timer: ContextVar[RequestTimer | None] = ContextVar("request_timer", default=None)
+_NOOP = nullcontext()
+
+
+class _Span:
+    __slots__ = ("timer", "name", "t0")
+
+    def __init__(self, timer: RequestTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, perf_counter() - self.t0)
+        return False
+
+
+def span(name: str):
+    """
+    Time a stage of the current request:
+
+        with span("score"):
+            ...
+
+    Outside an instrumented request (or with metrics disabled) this is a
+    shared no-op context manager.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        return _NOOP
+    return _Span(timer, name)
+
+
+def start_request() -> Tuple[RequestTimer, object]:
+    timer = RequestTimer()
+    return timer, _current_timer.set(timer)
+
+
+def finish_request(timer: RequestTimer, token, path: str, total_seconds: float):
+    """Reset the context and fold the request's stages into the histograms."""
+    _current_timer.reset(token)
+    REGISTRY.histogram(
+        "api_request_duration_seconds", "End-to-end request latency.", path=path
+    ).observe(total_seconds)
+    for stage, seconds in timer.stages.items():
+        REGISTRY.histogram(
+            "api_stage_duration_seconds", "Time spent per request stage.", path=path, stage=stage
+        ).observe(seconds)
@@ -0,0 +1,180 @@
+# stage_graph.py
+"""
+Minimal incremental build graph for build_corpus.py.
+
+A Stage reads input files, writes output files and has parameters. Its
+key is a hash of its name, parameters and the content digests of its
+inputs. After a stage runs, the key and the (size, mtime, digest) of each
+output are recorded in a JSON manifest. Next time the stage is skipped if
+its key is unchanged and its outputs are still the recorded files.
+
+Digests are only recomputed for files whose size or mtime changed since
+they were recorded, so unchanged multi-GB outputs are not re-read.
+
+Stages whose inputs are ready run concurrently on a thread pool: a stage
+starts as soon as the stages producing its inputs have finished.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+_DIGEST_CHUNK = 1 << 20
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    run: called with no arguments; must write every path in `outputs`
+    params: anything JSON-serializable that changes the stage's result
+    always: run even if the key is unchanged (e.g. a crawl with --resume)
+    """
+
+    def __init__(self, name: str, run, inputs=(), outputs=(), params=None, always: bool = False):
+        self.name = name
+        self.run = run
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.params = params or {}
+        self.always = always
+
+
+class StageGraph:
+    def __init__(self, manifest_path, force=(), max_parallel: int = 4):
+        self.manifest_path = Path(manifest_path)
+        self.force = set(force)
+        self.max_parallel = max_parallel
+        self.stages: dict[str, Stage] = {}
+        self.timings: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        try:
+            self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.manifest = {"stages": {}, "files": {}}
+
+    def add(self, stage: Stage):
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage {stage.name!r}")
+        self.stages[stage.name] = stage
+
+    #  fingerprints
+
+    def digest(self, path: Path) -> str | None:
+        """Content digest of path, reusing the manifest's if size and mtime are unchanged."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        with self._lock:
+            known = self.manifest["files"].get(key)
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["digest"]
+
+        h = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as f:
+            while chunk := f.read(_DIGEST_CHUNK):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self.manifest["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        return digest
+
+    def key(self, stage: Stage) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps({"stage": stage.name, "params": stage.params}, sort_keys=True).encode())
+        for path in stage.inputs:
+            h.update(f"{path}={self.digest(path)}\n".encode())
+        return h.hexdigest()
+
+    def up_to_date(self, stage: Stage, key: str) -> bool:
+        with self._lock:
+            recorded = self.manifest["stages"].get(stage.name)
+        if stage.always or stage.name in self.force or recorded is None or recorded["key"] != key:
+            return False
+        return all(self.digest(path) == recorded["outputs"].get(str(path)) for path in stage.outputs)
+
+    def _record(self, stage: Stage, key: str):
+        outputs = {str(path): self.digest(path) for path in stage.outputs}
+        with self._lock:
+            self.manifest["stages"][stage.name] = {"key": key, "outputs": outputs}
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.manifest_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.manifest, indent=1), encoding="utf-8")
+            os.replace(tmp, self.manifest_path)
+
+    #  execution
+
+    def _deps(self) -> dict[str, set[str]]:
+        producer = {path: stage.name for stage in self.stages.values() for path in stage.outputs}
+        return {
+            name: {producer[path] for path in stage.inputs if path in producer and producer[path] != name}
+            for name, stage in self.stages.items()
+        }
+
+    def _execute(self, stage: Stage) -> str:
+        t0 = time.perf_counter()
+        key = self.key(stage)
+        if self.up_to_date(stage, key):
+            status = "skipped"
+            print(f"[stages] {stage.name}: up to date, skipped")
+        else:
+            stage.run()
+            missing = [str(p) for p in stage.outputs if not p.exists()]
+            if missing:
+                raise RuntimeError(f"stage {stage.name} did not write {', '.join(missing)}")
+            self._record(stage, key)
+            status = "ran"
+        self.timings[stage.name]["seconds"] = time.perf_counter() - t0
+        return status
+
+    def run(self):
+        """Run every stage (skipping unchanged ones); raise on the first failure once running stages finish."""
+        deps = self._deps()
+        done: set[str] = set()
+        running = {}
+        failed: BaseException | None = None
+        t0 = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            while True:
+                if failed is None:
+                    for name in self.stages:
+                        if name in done or name in self.timings or not deps[name] <= done:
+                            continue
+                        self.timings[name] = {"start": time.perf_counter() - t0, "status": "running"}
+                        running[pool.submit(self._execute, self.stages[name])] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        self.timings[name]["status"] = future.result()
+                    except BaseException as e:
+                        self.timings[name]["status"] = "failed"
+                        self.timings[name].setdefault("seconds", time.perf_counter() - t0 - self.timings[name]["start"])
+                        failed = failed or e
+                    else:
+                        done.add(name)
+
+        self.wall_seconds = time.perf_counter() - t0
+        if failed is not None:
+            raise failed
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<12} {'status':<8} {'start':>8} {'seconds':>9}"]
+        for name in self.stages:
+            t = self.timings.get(name)
+            if t is None:
+                lines.append(f"{name:<12} {'not run':<8}")
+                continue
+            lines.append(f"{name:<12} {t['status']:<8} {t['start']:>7.1f}s {t.get('seconds', 0.0):>8.2f}s")
+        busy = sum(t.get("seconds", 0.0) for t in self.timings.values())
+        wall = getattr(self, "wall_seconds", busy)
+        lines.append(f"{'total':<12} {'':<8} {'':>8} {wall:>8.2f}s wall, {busy:.2f}s summed over stages")
+        return "\n".join(lines)
@@ -0,0 +1,127 @@
+# suggest_index.py
+import heapq
+from bisect import bisect_left
+from typing import Dict, Hashable, List, Mapping, Tuple
+
+
+# Upper bound used to close a prefix range in the sorted term array:
+# every term starting with `p` sorts in [p, p + PREFIX_END).
+PREFIX_END = "\U0010ffff"
+
+
+class PrefixSuggestIndex:
+    """
+    Prefix autocomplete over the index vocabulary.
+
+    Built once (at TF-IDF finalize() time) as a sorted term array:
+      - lookup: two bisects give the [lo, hi) range of terms with the prefix
+      - ranking: terms are weighted by document frequency and by the
+        PageRank mass of the documents that contain them
+      - short prefixes (the huge ranges) are answered from a precomputed
+        top-k table in O(k); longer prefixes, or a limit above cache_k,
+        take O(log V + r log k) for the r terms in the prefix range, which
+        is small once the prefix is longer than cache_depth
+    """
+
+    def __init__(
+        self,
+        terms: List[str],
+        df: List[int],
+        weights: List[float],
+        cache_depth: int = 3,
+        cache_k: int = 20,
+    ):
+        self.terms = terms
+        self.df = df
+        self.weights = weights
+        self.cache_depth = cache_depth
+        self.cache_k = cache_k
+
+        # prefix (len <= cache_depth) -> term positions, best first
+        self.top_by_prefix: Dict[str, List[int]] = {}
+        self._build_prefix_cache()
+
+    @classmethod
+    def build(
+        cls,
+        inverted_index: Mapping[str, Mapping[Hashable, float]],
+        df: Mapping[str, int],
+        doc_weights: Mapping[Hashable, float] | None = None,
+        pr_weight: float = 0.5,
+        **kwargs,
+    ) -> "PrefixSuggestIndex":
+        """
+        Build from an inverted index (term -> {doc_id: ...}) and df counts.
+
+        weight(term) = (1 - pr_weight) * df / max_df
+                       + pr_weight * pr_mass / max_pr_mass
+        where pr_mass is the sum of doc_weights over the term's postings.
+        """
+        terms = sorted(inverted_index.keys())
+        df_list = [int(df.get(t, 0)) for t in terms]
+
+        if doc_weights:
+            pr_mass = []
+            for t in terms:
+                mass = 0.0
+                for doc_id in inverted_index[t]:
+                    mass += doc_weights.get(doc_id, 0.0)
+                pr_mass.append(mass)
+        else:
+            pr_mass = [0.0] * len(terms)
+            pr_weight = 0.0
+
+        max_df = max(df_list, default=0) or 1
+        max_pr = max(pr_mass, default=0.0) or 1.0
+
+        weights = [
+            (1.0 - pr_weight) * (d / max_df) + pr_weight * (m / max_pr)
+            for d, m in zip(df_list, pr_mass)
+        ]
+        return cls(terms, df_list, weights, **kwargs)
+
+    def _build_prefix_cache(self):
+        terms = self.terms
+        weight_of = self.weights.__getitem__
+        k = self.cache_k
+
+        for depth in range(1, self.cache_depth + 1):
+            # terms are sorted, so every prefix group is one contiguous run
+            start = 0
+            n = len(terms)
+            while start < n:
+                term = terms[start]
+                if len(term) < depth:
+                    start += 1
+                    continue
+                prefix = term[:depth]
+                end = bisect_left(terms, prefix + PREFIX_END, start)
+                self.top_by_prefix[prefix] = heapq.nlargest(
+                    k, range(start, end), key=weight_of
+                )
+                start = end
+
+    def __len__(self):
+        return len(self.terms)
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Tuple[str, int, float]]:
+        """
+        Return up to `limit` (term, df, weight) completions of `prefix`,
+        best first. `prefix` is expected to be lowercase already.
+        """
+        if not prefix or limit <= 0:
+            return []
+
+        if len(prefix) <= self.cache_depth and limit <= self.cache_k:
+            positions = self.top_by_prefix.get(prefix, [])[:limit]
+        else:
+            lo = bisect_left(self.terms, prefix)
+            hi = bisect_left(self.terms, prefix + PREFIX_END, lo)
+            if lo == hi:
+                return []
+            positions = heapq.nlargest(
+                limit, range(lo, hi), key=self.weights.__getitem__
+            )
+
+        terms, df, weights = self.terms, self.df, self.weights
+        return [(terms[i], df[i], weights[i]) for i in positions]
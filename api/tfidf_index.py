@@ -8,16 +8,30 @@ from typing import Dict, List, Tuple, Hashable
 
 import numpy as np
 
-# GPU libs (required for GPUTfidfSearchIndex)
-try:
-    import cupy as cp
-    import cupyx.scipy.sparse as cpx_sparse
-    GPU_AVAILABLE = True
-except ImportError:
-    # You can still use the CPU index without CuPy
-    GPU_AVAILABLE = False
-    cp = None          # type: ignore
-    cpx_sparse = None  # type: ignore
+from metrics import span
+from suggest_index import PrefixSuggestIndex
+
+# GPU libs (required for GPUTfidfSearchIndex) are imported lazily:
+# importing CuPy costs seconds and is pointless on machines without a GPU.
+cp = None          # type: ignore
+cpx_sparse = None  # type: ignore
+GPU_AVAILABLE: bool | None = None  # None = not probed yet
+
+
+def gpu_available() -> bool:
+    """Import CuPy on first call; later calls return the cached answer."""
+    global cp, cpx_sparse, GPU_AVAILABLE
+    if GPU_AVAILABLE is None:
+        try:
+            import cupy
+            import cupyx.scipy.sparse
+            cp = cupy
+            cpx_sparse = cupyx.scipy.sparse
+            GPU_AVAILABLE = True
+        except ImportError:
+            # You can still use the CPU index without CuPy
+            GPU_AVAILABLE = False
+    return GPU_AVAILABLE
 
 
 TOKEN_RE = re.compile(r"\b\w+\b", re.UNICODE)
@@ -46,6 +60,7 @@ class TfidfSearchIndex:
         self.idf = {}
         self.doc_norms = {}
         self.N = 0
+        self.suggester: PrefixSuggestIndex | None = None
 
     def add_document(self, doc_id, text: str):
         tokens = tokenize(text)
@@ -62,10 +77,12 @@ class TfidfSearchIndex:
             self.inverted_index[term][doc_id] = float(freq)
             self.df[term] += 1
 
-    def finalize(self):
+    def finalize(self, doc_weights: Dict[Hashable, float] | None = None):
         """
         Compute IDF, convert postings to tf-idf, and doc norms.
         Complexity: O(total postings).
+
+        doc_weights (doc_id -> PageRank) only feeds the autocomplete weights.
         """
         # 1) IDF
         N = self.N
@@ -92,11 +109,19 @@ class TfidfSearchIndex:
         for doc_id, nsq in doc_norm_sq.items():
             self.doc_norms[doc_id] = math.sqrt(nsq) if nsq > 0 else 1.0
 
+        # 4) prefix autocomplete over the vocabulary
+        self.suggester = PrefixSuggestIndex.build(self.inverted_index, self.df, doc_weights)
+
     def search(self, query: str, top_k: int = 10):
-        tokens = tokenize(query)
+        with span("tokenize"):
+            tokens = tokenize(query)
         if not tokens:
             return []
 
+        with span("score"):
+            return self._score(tokens, top_k)
+
+    def _score(self, tokens: List[str], top_k: int):
         q_tf = Counter(tokens)
 
         q_weights = {}
@@ -146,7 +171,7 @@ class GPUTfidfSearchIndex:
     """
 
     def __init__(self):
-        if not GPU_AVAILABLE:
+        if not gpu_available():
             raise RuntimeError(
                 "CuPy not available. Install cupy (e.g. `pip install cupy-cuda11x`) "
                 "or use TfidfSearchIndex (CPU) instead."
@@ -191,6 +216,9 @@ class GPUTfidfSearchIndex:
         self.n_terms: int = 0
         self.N: int = 0  # number of docs added
 
+        # prefix autocomplete (built in finalize)
+        self.suggester: PrefixSuggestIndex | None = None
+
         self._finalized: bool = False
 
     # -- building the index (CPU) -- #
@@ -285,8 +313,11 @@ class GPUTfidfSearchIndex:
             norm_arr[i] = self.doc_norms.get(doc_id, 1.0)
         self.d_doc_norms = cp.asarray(norm_arr)
 
-    def finalize(self):
-        """Call once after all documents are added."""
+    def finalize(self, doc_weights: Dict[Hashable, float] | None = None):
+        """
+        Call once after all documents are added.
+        doc_weights (doc_id -> PageRank) only feeds the autocomplete weights.
+        """
         if self._finalized:
             return
         if self.N == 0:
@@ -296,6 +327,7 @@ class GPUTfidfSearchIndex:
         self._build_mappings()
         self._build_csr_cpu()
         self._upload_to_gpu()
+        self.suggester = PrefixSuggestIndex.build(self.inverted_index, self.df, doc_weights)
         self._finalized = True
 
     #  search (GPU) - #
@@ -309,10 +341,15 @@ class GPUTfidfSearchIndex:
         if not self._finalized:
             raise RuntimeError("Index must be finalized() before search().")
 
-        tokens = tokenize(query)
+        with span("tokenize"):
+            tokens = tokenize(query)
         if not tokens:
             return []
 
+        with span("score"):
+            return self._score(tokens, top_k)
+
+    def _score(self, tokens: List[str], top_k: int):
         q_tf = Counter(tokens)
         q = cp.zeros(self.n_terms, dtype=cp.float32)
 
@@ -373,7 +410,7 @@ def create_tfidf_index(prefer_gpu: bool | None = None):
         # treat "0", "false", "no" as false, everything else as true-ish
         prefer_gpu = env_val not in {"0", "false", "False", "no", "No"}
 
-    if prefer_gpu and GPU_AVAILABLE:
+    if prefer_gpu and gpu_available():
         return GPUTfidfSearchIndex()
     else:
         return TfidfSearchIndex()
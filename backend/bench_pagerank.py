@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+"""
+PageRank engine benchmark on synthetic graphs.
+
+Graphs come from backend/data/gen_graphs.py (uniform, rmat, powerlaw, web).
+Every available engine / mode is timed on every graph:
+
+  numpy:csr-f64      in-process power iteration, gather + segmented sum (CSR by target)
+  numpy:csr-f32      same, float32 ranks
+  numpy:scatter-f64  in-process, np.bincount scatter over the raw edge list
+  binary:auto        local backend/cuda/pagerank_gpu (GPU if present, else its CPU path)
+  cluster:auto       remote pagerank_gpu via scp + ssh (only with --cluster)
+
+Reported per run: iterations, setup / iteration / wall time, edges/s per
+iteration, peak memory and L1 distance to a reference solution
+(numpy:csr-f64 with tol 1e-12). The binary engines do not report their own
+phase timings, so their edges/s are computed from wall time (includes I/O).
+
+Usage:
+  python bench_pagerank.py --graphs rmat:100000:1000000,web:100000:1000000
+  python bench_pagerank.py --graphs powerlaw:1000000:10000000 --engines numpy --json out.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BACKEND_DIR.parent
+DATA_DIR = BACKEND_DIR / "data"
+LOCAL_BIN = BACKEND_DIR / "cuda" / "pagerank_gpu"
+
+if str(DATA_DIR) not in sys.path:
+    sys.path.insert(0, str(DATA_DIR))
+
+from gen_graphs import generate, write_edge_list  # noqa: E402
+
+NODE_LINE_RE = re.compile(r"node\s+(\d+)\s*:\s*([0-9.eE+-]+)")
+CONVERGED_RE = re.compile(r"Converged in (\d+) iterations")
+
+
+#  In-process NumPy engine (same update rule as pagerank_gpu.cu)
+
+def _prepare_csr(src, dst, n):
+    """CSR of P by target row: col[k] = source of the k-th edge into row i."""
+    order = np.argsort(dst, kind="stable")
+    col = src[order]
+    counts = np.bincount(dst, minlength=n)
+    row_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=row_ptr[1:])
+    nonempty = counts > 0
+    return col, row_ptr[:-1][nonempty], nonempty
+
+
+def pagerank_numpy(src, dst, n, alpha=0.85, tol=1e-8, max_iter=100, mode="csr-f64"):
+    """
+    Power iteration with uniform teleport and dangling mass spread uniformly.
+    Returns (ranks float64, iterations, setup_s, iter_s).
+    """
+    t0 = time.perf_counter()
+    dtype = np.float32 if mode.endswith("f32") else np.float64
+    outdeg = np.bincount(src, minlength=n)
+    dangling = outdeg == 0
+    inv_out = np.zeros(n, dtype=dtype)
+    inv_out[~dangling] = 1.0 / outdeg[~dangling]
+
+    if mode.startswith("csr"):
+        col, starts, nonempty = _prepare_csr(src, dst, n)
+    setup_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    r = np.full(n, 1.0 / n, dtype=dtype)
+    teleport = (1.0 - alpha) / n
+    iterations = 0
+    for _ in range(max_iter):
+        iterations += 1
+        weighted = r * inv_out
+        if mode.startswith("csr"):
+            y = np.zeros(n, dtype=dtype)
+            y[nonempty] = np.add.reduceat(weighted[col], starts)
+        else:
+            y = np.bincount(dst, weights=weighted[src], minlength=n)
+        dangling_mass = r[dangling].sum()
+        r_new = (alpha * (y + dangling_mass / n) + teleport).astype(dtype, copy=False)
+        delta = float(np.abs(r_new - r).sum())
+        r = r_new
+        if delta < tol:
+            break
+    iter_s = time.perf_counter() - t0
+
+    r = r.astype(np.float64)
+    r /= r.sum()
+    return r, iterations, setup_s, iter_s
+
+
+#  External engines (pagerank_gpu binary, locally or on the cluster)
+
+def _parse_ranks(output_path, n):
+    ranks = np.zeros(n, dtype=np.float64)
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            m = NODE_LINE_RE.search(line)
+            if m:
+                ranks[int(m.group(1))] = float(m.group(2))
+    return ranks
+
+
+def _mode_from_stdout(stdout: str) -> str:
+    if "Using GPU backend" in stdout:
+        return "gpu"
+    if "Using CPU backend" in stdout:
+        return "cpu"
+    return "auto"
+
+
+def local_binary_available() -> bool:
+    """The checked-in binary may not run here (missing CUDA runtime / glibc)."""
+    if not LOCAL_BIN.exists() or not os.access(LOCAL_BIN, os.X_OK):
+        return False
+    with tempfile.TemporaryDirectory() as tmp:
+        edges = Path(tmp) / "e.txt"
+        edges.write_text("0 1\n1 0\n", encoding="utf-8")
+        try:
+            proc = subprocess.run(
+                [str(LOCAL_BIN), str(edges), str(Path(tmp) / "o.txt")],
+                capture_output=True, timeout=60,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return proc.returncode == 0
+
+
+def run_local_binary(edges_path, n, alpha, tol, max_iter):
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / "output.txt"
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [str(LOCAL_BIN), str(edges_path), str(out_path),
+             str(alpha), str(tol), str(max_iter), str(n)],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        stdout = proc.stdout.read()
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        wall_s = time.perf_counter() - t0
+        if proc.returncode != 0:
+            raise RuntimeError(f"pagerank_gpu failed ({proc.returncode}): {stdout[-500:]}")
+        ranks = _parse_ranks(out_path, n)
+
+    m = CONVERGED_RE.search(stdout)
+    iterations = int(m.group(1)) + 1 if m else max_iter
+    # ru_maxrss is KiB on Linux
+    peak_mb = rusage.ru_maxrss / 1024
+    return ranks, iterations, wall_s, peak_mb, _mode_from_stdout(stdout)
+
+
+def run_cluster(edges_path, n, alpha, tol, max_iter):
+    api_dir = ROOT_DIR / "api"
+    if str(api_dir) not in sys.path:
+        sys.path.insert(0, str(api_dir))
+    from config import CLUSTER_USER, CLUSTER_HOST, REMOTE_WORKDIR, REMOTE_BIN
+
+    host = f"{CLUSTER_USER}@{CLUSTER_HOST}"
+    t0 = time.perf_counter()
+    subprocess.run(["scp", str(edges_path), f"{host}:{REMOTE_WORKDIR}/bench_edges.txt"], check=True)
+    cmd = (
+        f"cd {REMOTE_WORKDIR} && "
+        f"{REMOTE_BIN} bench_edges.txt bench_output.txt {alpha} {tol} {max_iter} {n}"
+    )
+    result = subprocess.run(["ssh", host, cmd], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / "output.txt"
+        subprocess.run(["scp", f"{host}:{REMOTE_WORKDIR}/bench_output.txt", str(out_path)], check=True)
+        ranks = _parse_ranks(out_path, n)
+    wall_s = time.perf_counter() - t0
+
+    m = CONVERGED_RE.search(result.stdout)
+    iterations = int(m.group(1)) + 1 if m else max_iter
+    return ranks, iterations, wall_s, None, _mode_from_stdout(result.stdout)
+
+
+#  Runner
+
+def bench_graph(kind, n, m, engines, args):
+    print(f"\n=== {kind}: n={n:,} m={m:,} ===")
+    t0 = time.perf_counter()
+    src, dst, n = generate(kind, n, m, seed=args.seed)
+    # pagerank_gpu sizes the graph as max_id + 1; do the same so vectors line up
+    n = int(max(src.max(), dst.max())) + 1
+    print(f"[gen] {time.perf_counter() - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    ref, ref_iters, _, _ = pagerank_numpy(src, dst, n, args.alpha, 1e-12, 1000, mode="csr-f64")
+    print(f"[reference] {ref_iters} iterations in {time.perf_counter() - t0:.2f}s")
+
+    rows = []
+
+    def record(engine, mode, ranks, iterations, setup_s, iter_s, wall_s, peak_mb):
+        per_iter_s = (iter_s if iter_s is not None else wall_s) / max(iterations, 1)
+        row = {
+            "graph": kind, "nodes": n, "edges": len(src),
+            "engine": engine, "mode": mode, "iterations": iterations,
+            "setup_s": setup_s, "iter_s": iter_s, "wall_s": wall_s,
+            "edges_per_s_iter": len(src) / per_iter_s if per_iter_s > 0 else None,
+            "peak_mem_mb": peak_mb,
+            "l1_vs_ref": float(np.abs(ranks - ref).sum()),
+        }
+        rows.append(row)
+        print(
+            f"[{engine}:{mode}] iters={iterations} wall={wall_s:.3f}s "
+            f"edges/s/iter={row['edges_per_s_iter']:.3e} L1={row['l1_vs_ref']:.2e}"
+        )
+
+    if "numpy" in engines:
+        for mode in ("csr-f64", "csr-f32", "scatter-f64"):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            ranks, iters, setup_s, iter_s = pagerank_numpy(
+                src, dst, n, args.alpha, args.tol, args.max_iter, mode=mode
+            )
+            wall_s = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            record("numpy", mode, ranks, iters, setup_s, iter_s, wall_s, peak / 2**20)
+
+    if "binary" in engines or "cluster" in engines:
+        with tempfile.TemporaryDirectory() as tmp:
+            edges_path = Path(tmp) / "edges.txt"
+            write_edge_list(edges_path, src, dst)
+
+            if "binary" in engines:
+                ranks, iters, wall_s, peak_mb, mode = run_local_binary(
+                    edges_path, n, args.alpha, args.tol, args.max_iter
+                )
+                record("binary", mode, ranks, iters, None, None, wall_s, peak_mb)
+
+            if "cluster" in engines:
+                ranks, iters, wall_s, peak_mb, mode = run_cluster(
+                    edges_path, n, args.alpha, args.tol, args.max_iter
+                )
+                record("cluster", mode, ranks, iters, None, None, wall_s, peak_mb)
+
+    return rows
+
+
+def print_report(rows):
+    print(
+        f"\n{'graph':<10}{'nodes':>12}{'edges':>13}  {'engine:mode':<20}{'iters':>6}"
+        f"{'wall_s':>10}{'edges/s/iter':>14}{'peak_MB':>10}{'L1_vs_ref':>11}"
+    )
+    for r in rows:
+        peak = f"{r['peak_mem_mb']:.1f}" if r["peak_mem_mb"] is not None else "-"
+        print(
+            f"{r['graph']:<10}{r['nodes']:>12,}{r['edges']:>13,}  "
+            f"{r['engine'] + ':' + r['mode']:<20}{r['iterations']:>6}{r['wall_s']:>10.3f}"
+            f"{r['edges_per_s_iter']:>14.3e}{peak:>10}{r['l1_vs_ref']:>11.2e}"
+        )
+
+
+def parse_graph_specs(spec: str):
+    graphs = []
+    for item in spec.split(","):
+        kind, n, m = item.strip().split(":")
+        graphs.append((kind, int(float(n)), int(float(m))))
+    return graphs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark PageRank engines on synthetic graphs")
+    parser.add_argument(
+        "--graphs",
+        type=str,
+        default="uniform:100000:1000000,rmat:100000:1000000,powerlaw:100000:1000000,web:100000:1000000",
+        help="Comma-separated kind:nodes:edges specs (kinds: uniform, rmat, powerlaw, web)",
+    )
+    parser.add_argument(
+        "--engines",
+        type=str,
+        default="numpy,binary",
+        help="Comma-separated engines: numpy, binary, cluster (default: numpy,binary)",
+    )
+    parser.add_argument("--cluster", action="store_true", help="Also run on the GPU cluster (scp + ssh)")
+    parser.add_argument("--alpha", type=float, default=0.85, help="Damping factor (default: 0.85)")
+    parser.add_argument("--tol", type=float, default=1e-8, help="L1 convergence tolerance (default: 1e-8)")
+    parser.add_argument("--max-iter", type=int, default=100, help="Maximum iterations (default: 100)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=str, default=None, help="Write all result rows to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    engines = {e.strip() for e in args.engines.split(",") if e.strip()}
+    if args.cluster:
+        engines.add("cluster")
+    if "binary" in engines and not local_binary_available():
+        print(f"[warn] {LOCAL_BIN} does not run on this machine, skipping the binary engine")
+        engines.discard("binary")
+
+    rows = []
+    for kind, n, m in parse_graph_specs(args.graphs):
+        rows.extend(bench_graph(kind, n, m, engines, args))
+
+    print_report(rows)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n[ok] Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Vectorized synthetic graph generators for PageRank benchmarks.
+
+All generators return (src, dst, n) with src/dst as NumPy integer arrays and
+work in fixed-size chunks, so 10^8 edges are feasible (~800 MB as int32 pairs).
+
+Kinds:
+  uniform   - G(n, m) style, like gen_random_graph.py but without the set loop
+  rmat      - R-MAT / Kronecker (Chakrabarti et al.), skewed degrees + communities
+  powerlaw  - Chung-Lu style: endpoints drawn from power-law weight distributions
+  web       - host-clustered: pages grouped into hosts of power-law size, most
+              links stay inside the host, the rest go to globally popular pages
+
+Usage:
+  python gen_graphs.py rmat NUM_NODES NUM_EDGES [--seed S] [--out edges.txt | --npy edges.npy]
+"""
+import argparse
+import sys
+
+import numpy as np
+
+CHUNK = 1 << 22  # edges generated per vectorized step
+# consecutive chunks without a single non-self-loop edge before giving up
+MAX_EMPTY_ROUNDS = 16
+
+
+def _id_dtype(n: int):
+    return np.int32 if n < 2**31 else np.int64
+
+
+def _drop_self_loops(src, dst):
+    keep = src != dst
+    return src[keep], dst[keep]
+
+
+def _chunked(m: int, make_chunk, dtype):
+    """Fill m edges by repeatedly calling make_chunk(size) -> (src, dst)."""
+    src = np.empty(m, dtype=dtype)
+    dst = np.empty(m, dtype=dtype)
+    filled = 0
+    empty_rounds = 0
+    while filled < m:
+        s, d = make_chunk(min(CHUNK, m - filled) + 64)  # slack for dropped self-loops
+        s, d = _drop_self_loops(s, d)
+        empty_rounds = empty_rounds + 1 if len(s) == 0 else 0
+        if empty_rounds >= MAX_EMPTY_ROUNDS:
+            raise ValueError(f"generator only produces self-loops ({filled} of {m} edges filled)")
+        take = min(len(s), m - filled)
+        src[filled:filled + take] = s[:take]
+        dst[filled:filled + take] = d[:take]
+        filled += take
+    return src, dst
+
+
+class _PowerLawSampler:
+    """
+    Draw node ids with P(rank) ~ rank^-exponent over a random permutation of
+    the nodes. Uses the closed-form inverse CDF of the continuous power law,
+    so sampling is O(1) per edge (no searchsorted over an n-sized CDF).
+    """
+
+    def __init__(self, n: int, exponent: float, rng, dtype):
+        self.n = n
+        self.e = exponent
+        self.rng = rng
+        self.perm = rng.permutation(n).astype(dtype)
+        # total mass of x^-e on [1, n + 1)
+        if abs(exponent - 1.0) < 1e-9:
+            self.total = np.log(n + 1.0)
+        else:
+            self.total = ((n + 1.0) ** (1.0 - exponent) - 1.0) / (1.0 - exponent)
+
+    def __call__(self, size: int):
+        u = self.rng.random(size) * self.total
+        if abs(self.e - 1.0) < 1e-9:
+            x = np.exp(u)
+        else:
+            x = (1.0 + (1.0 - self.e) * u) ** (1.0 / (1.0 - self.e))
+        ranks = np.minimum(x.astype(np.int64) - 1, self.n - 1)
+        return self.perm[ranks]
+
+
+#  generators
+
+def uniform_graph(n: int, m: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dtype = _id_dtype(n)
+    src, dst = _chunked(
+        m, lambda k: (rng.integers(0, n, k, dtype=dtype), rng.integers(0, n, k, dtype=dtype)), dtype
+    )
+    return src, dst, n
+
+
+def rmat_graph(n: int, m: int, a: float = 0.57, b: float = 0.19, c: float = 0.19, seed: int = 0):
+    """
+    R-MAT: each edge picks one quadrant of the adjacency matrix per bit level
+    with probabilities (a, b, c, d = 1-a-b-c). n is rounded up to a power of
+    two internally; ids >= n are folded back with a modulo, and ids are
+    randomly permuted so hubs are not all at small ids.
+    """
+    rng = np.random.default_rng(seed)
+    scale = max(1, int(np.ceil(np.log2(n))))
+    dtype = _id_dtype(n)
+    perm = rng.permutation(n).astype(dtype)
+    ab, abc = a + b, a + b + c
+
+    def chunk(k):
+        s = np.zeros(k, dtype=np.int64)
+        d = np.zeros(k, dtype=np.int64)
+        for _ in range(scale):
+            r = rng.random(k)
+            s_bit = r >= ab
+            d_bit = ((r >= a) & (r < ab)) | (r >= abc)
+            s = (s << 1) | s_bit
+            d = (d << 1) | d_bit
+        return perm[s % n], perm[d % n]
+
+    src, dst = _chunked(m, chunk, dtype)
+    return src, dst, n
+
+
+def powerlaw_graph(n: int, m: int, out_exp: float = 0.5, in_exp: float = 0.8, seed: int = 0):
+    """
+    Chung-Lu style: source ~ out-weight, target ~ in-weight, both power laws.
+    Exponent e gives weight(rank) ~ rank^-e (degree tail ~ k^-(1 + 1/e)).
+    """
+    rng = np.random.default_rng(seed)
+    dtype = _id_dtype(n)
+    sample_src = _PowerLawSampler(n, out_exp, rng, dtype)
+    sample_dst = _PowerLawSampler(n, in_exp, rng, dtype)
+    src, dst = _chunked(m, lambda k: (sample_src(k), sample_dst(k)), dtype)
+    return src, dst, n
+
+
+def web_graph(
+    n: int,
+    m: int,
+    mean_host_size: int = 200,
+    p_local: float = 0.85,
+    in_exp: float = 0.8,
+    seed: int = 0,
+):
+    """
+    Host-clustered web-like graph. Nodes are laid out host by host (ids of one
+    host are contiguous, like a crawl). A fraction p_local of links points to
+    a page of the same host (skewed towards the host's first pages, i.e. its
+    home/index pages); the rest go to globally popular pages.
+    """
+    rng = np.random.default_rng(seed)
+    dtype = _id_dtype(n)
+
+    # host sizes ~ Pareto, scaled so they cover exactly n pages
+    sizes = rng.pareto(1.2, size=max(1, n // mean_host_size)) + 1.0
+    sizes = np.maximum(1, np.floor(sizes / sizes.sum() * n)).astype(np.int64)
+    sizes[-1] += n - sizes.sum()
+    while sizes[-1] < 1:  # rounding overshoot: merge the tail host
+        sizes = np.concatenate([sizes[:-2], [sizes[-2] + sizes[-1]]])
+    host_start = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    host_of = np.repeat(np.arange(len(sizes)), sizes)
+
+    sample_src = _PowerLawSampler(n, 0.3, rng, np.int64)
+    sample_dst = _PowerLawSampler(n, in_exp, rng, np.int64)
+
+    def chunk(k):
+        s = sample_src(k)
+        d = sample_dst(k)
+        local = rng.random(k) < p_local
+        h = host_of[s[local]]
+        # u^2 skews local targets towards the start of the host
+        offset = np.floor(rng.random(local.sum()) ** 2 * sizes[h]).astype(np.int64)
+        d[local] = host_start[h] + offset
+        return s.astype(dtype), d.astype(dtype)
+
+    src, dst = _chunked(m, chunk, dtype)
+    return src, dst, n
+
+
+GENERATORS = {
+    "uniform": uniform_graph,
+    "rmat": rmat_graph,
+    "powerlaw": powerlaw_graph,
+    "web": web_graph,
+}
+
+
+def generate(kind: str, n: int, m: int, seed: int = 0):
+    if kind not in GENERATORS:
+        raise ValueError(f"unknown graph kind {kind!r}, expected one of {sorted(GENERATORS)}")
+    if m > 0 and n < 2:
+        # every edge would be a self-loop, and those are dropped
+        raise ValueError(f"{m} edges need at least 2 nodes, got {n}")
+    return GENERATORS[kind](n, m, seed=seed)
+
+
+#  output
+
+def write_edge_list(path, src, dst):
+    """Write 'src dst' lines (the CUDA binary's input format) chunk by chunk."""
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, len(src), CHUNK):
+            pairs = np.column_stack((src[start:start + CHUNK], dst[start:start + CHUNK]))
+            np.savetxt(f, pairs, fmt="%d %d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized synthetic graph generator")
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("num_nodes", type=int)
+    parser.add_argument("num_edges", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="Write 'src dst' text (default: stdout)")
+    parser.add_argument("--npy", type=str, default=None, help="Write an (m, 2) int array as .npy instead")
+    args = parser.parse_args()
+
+    src, dst, n = generate(args.kind, args.num_nodes, args.num_edges, seed=args.seed)
+
+    if args.npy:
+        np.save(args.npy, np.column_stack((src, dst)))
+    elif args.out:
+        write_edge_list(args.out, src, dst)
+    else:
+        np.savetxt(sys.stdout, np.column_stack((src, dst)), fmt="%d %d")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,196 @@
-import sys
+"""
+Turn PageRank scores + pages.json into pagerank.json (and pagerank.npz).
+
+Scores come from either
+  - the CUDA text output ("  node 157 : 0.0013602537" lines), parsed in one
+    NumPy call instead of a regex per line, or
+  - a binary score vector: a .npy file, or raw little-endian float64
+    (.f64 / .bin), where position i is the score of node i.
+
+The join to URLs is an array index (url_of[node_id]); only nodes that are
+indexed pages are kept, renormalized to sum to 1 and sorted by score.
+
+Outputs:
+  pagerank.json  [{id, url, score}, ...] as before (the API reads it)
+  pagerank.npz   the same as arrays: ids (int32), scores (float64) and the
+                 URLs as one newline-separated UTF-8 blob (url_bytes, like
+                 urls.txt); read_export() loads it without any JSON parsing
+
+Usable in-process (convert(), as build_corpus.py does) or as a script:
+  python parse_pagerank.py <pagerank_output_txt> <pages_json> <output_json> [--binary out.npz]
+"""
+import argparse
 import json
 import re
+import sys
+import time
+import warnings
+from pathlib import Path
 
-# Matches lines like: "  node 157 : 0.0013602537"
-PATTERN = re.compile(r"node\s+(\d+)\s*:\s*([0-9.eE+-]+)")
+import numpy as np
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output, slower
+    orjson = None
 
-def main():
-    if len(sys.argv) != 4:
-        print(
-            "Usage: python parse_pagerank.py <pagerank_output_txt> <pages_json> <output_json>",
-            file=sys.stderr,
+# Matches lines like: "  node 157 : 0.0013602537"
+PATTERN = re.compile(rb"node\s+(\d+)\s*:\s*([0-9.eE+-]+)")
+NPY_MAGIC = b"\x93NUMPY"
+RAW_VECTOR_SUFFIXES = (".f64", ".bin")
+
+
+#  reading scores
+
+def _parse_text(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    first = PATTERN.search(data)
+    if first is None:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    body = data[first.start():]
+    count = body.count(b"node")
+    values = None
+    try:
+        with warnings.catch_warnings():
+            # fromstring only warns when it stops at a token it can't read
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(body.replace(b"node", b" ").replace(b":", b" "), dtype=np.float64, sep=" ")
+    except (ValueError, DeprecationWarning):
+        values = None
+    if values is not None and len(values) == 2 * count:
+        return values[0::2].astype(np.int64), values[1::2].copy()
+
+    # anything else between the node lines: fall back to the regex
+    pairs = PATTERN.findall(data)
+    ids = np.array([int(i) for i, _ in pairs], dtype=np.int64)
+    scores = np.array([float(s) for _, s in pairs], dtype=np.float64)
+    return ids, scores
+
+
+def read_scores(path) -> tuple[np.ndarray, np.ndarray]:
+    """(node ids, scores) from a CUDA text output or a binary score vector."""
+    path = Path(path)
+    with path.open("rb") as f:
+        head = f.read(len(NPY_MAGIC))
+    if head == NPY_MAGIC:
+        scores = np.load(path).astype(np.float64, copy=False).ravel()
+        return np.arange(len(scores), dtype=np.int64), scores
+    if path.suffix in RAW_VECTOR_SUFFIXES:
+        scores = np.fromfile(path, dtype="<f8").astype(np.float64, copy=False)
+        return np.arange(len(scores), dtype=np.int64), scores
+    return _parse_text(path.read_bytes())
+
+
+def load_url_table(pages_json) -> np.ndarray:
+    """Object array url_of[id] for every page in pages.json (None where there is no page)."""
+    raw = Path(pages_json).read_bytes()
+    pages = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    ids = np.fromiter((int(p["id"]) for p in pages), dtype=np.int64, count=len(pages))
+    url_of = np.full(int(ids.max(initial=-1)) + 1, None, dtype=object)
+    url_of[ids] = [p["url"] for p in pages]
+    return url_of
+
+
+def join_urls(ids: np.ndarray, scores: np.ndarray, url_of: np.ndarray):
+    """
+    Keep nodes with a URL, renormalize to sum 1 and sort by score (descending,
+    ties in input order). Returns (ids, urls, scores, dropped).
+    """
+    has_url = np.zeros(len(url_of) + 1, dtype=bool)
+    has_url[:-1] = url_of != None  # noqa: E711 (elementwise)
+    # ids past the table (or negative) land on the trailing False
+    slot = np.where((ids >= 0) & (ids < len(url_of)), ids, len(url_of))
+    keep = has_url[slot]
+    ids, scores = ids[keep], scores[keep]
+
+    total = scores.sum()
+    if total > 0.0:
+        scores = scores / total
+    order = np.argsort(-scores, kind="stable")
+    ids, scores = ids[order], scores[order]
+    return ids, url_of[ids], scores, int((~keep).sum())
+
+
+#  writing
+
+def write_json(path, ids: np.ndarray, urls: np.ndarray, scores: np.ndarray):
+    records = [
+        {"id": i, "url": u, "score": s}
+        for i, u, s in zip(ids.tolist(), urls.tolist(), scores.tolist())
+    ]
+    with open(path, "wb") as f:
+        if orjson is not None:
+            f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(records, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def write_export(path, ids: np.ndarray, urls: np.ndarray, scores: np.ndarray):
+    blob = "\n".join(urls.tolist()).encode("utf-8")
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            ids=ids.astype(np.int32),
+            scores=scores.astype(np.float64),
+            url_bytes=np.frombuffer(blob, dtype=np.uint8),
         )
-        sys.exit(1)
 
-    output_txt_path = sys.argv[1]
-    pages_json_path = sys.argv[2]
 
-    output_json_path = sys.argv[3]
+def read_export(path) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """(ids, urls, scores) from a pagerank.npz written by write_export()."""
+    with np.load(path) as z:
+        ids = z["ids"]
+        urls = z["url_bytes"].tobytes().decode("utf-8").split("\n") if len(ids) else []
+        return ids, urls, z["scores"]
 
-    # 1) Load URL -> ID mapping and invert it to ID -> URL
-    with open(pages_json_path, "r", encoding="utf-8") as f:
-        pages = json.load(f)
-    id_to_url = {int(p["id"]): p["url"] for p in pages}
 
+def convert(scores_path, pages_json, output_json, binary_path=None) -> dict:
+    """Scores + pages.json -> output_json (+ binary_path if given). Returns counts and timings."""
+    t0 = time.perf_counter()
+    node_ids, scores = read_scores(scores_path)
+    if len(node_ids) == 0:
+        raise ValueError(f"No PageRank entries found in {scores_path}")
+    t_parse = time.perf_counter()
 
-    # 2) Parse pagerank output file
-    raw_entries = []
-    with open(output_txt_path, "r", encoding="utf-8") as f:
-        for line in f:
-            m = PATTERN.search(line)
-            if not m:
-                continue
-            node_id = int(m.group(1))
-            score = float(m.group(2))
-            raw_entries.append((node_id, score))
+    ids, urls, kept_scores, dropped = join_urls(node_ids, scores, load_url_table(pages_json))
+    if len(ids) == 0:
+        raise ValueError("All PageRank nodes were dropped (no URLs found). Check your mappings.")
+    t_join = time.perf_counter()
 
-    if not raw_entries:
-        print("No PageRank entries found in output file.")
-        sys.exit(1)
-
-    # 3) Keep only nodes we have a URL for (i.e., present in pages/url_to_id)
-    kept = []
-    dropped = 0
-    for node_id, score in raw_entries:
-        url = id_to_url.get(node_id)
-        if url is None:
-            dropped += 1
-            continue
-        kept.append({"id": node_id, "url": url, "score": score})
-
-    if not kept:
-        print("All PageRank nodes were dropped (no URLs found). Check your mappings.")
-        sys.exit(1)
+    write_json(output_json, ids, urls, kept_scores)
+    if binary_path is not None:
+        write_export(binary_path, ids, urls, kept_scores)
+    t_write = time.perf_counter()
 
-    # 4) Renormalize scores over the kept nodes so they sum to ~1
-    total_score = sum(item["score"] for item in kept)
-    if total_score > 0.0:
-        for item in kept:
-            item["score"] /= total_score
+    return {
+        "raw": len(node_ids),
+        "kept": len(ids),
+        "dropped": dropped,
+        "parse_s": t_parse - t0,
+        "join_s": t_join - t_parse,
+        "write_s": t_write - t_join,
+    }
 
-    # Sort by score descending
-    kept.sort(key=lambda x: x["score"], reverse=True)
 
-    # 5) Write JSON
-    with open(output_json_path, "w", encoding="utf-8") as f:
-        json.dump(kept, f, ensure_ascii=False, indent=2)
+def main():
+    parser = argparse.ArgumentParser(description="PageRank scores + pages.json -> pagerank.json")
+    parser.add_argument("pagerank_output", help="CUDA output.txt, or a .npy / raw float64 score vector")
+    parser.add_argument("pages_json")
+    parser.add_argument("output_json")
+    parser.add_argument("--binary", default=None, help="also write the arrays to this .npz")
+    args = parser.parse_args()
+
+    try:
+        info = convert(args.pagerank_output, args.pages_json, args.output_json, args.binary)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
 
-    print(f"Parsed {len(raw_entries)} raw entries from {output_txt_path}")
-    print(f"Kept   {len(kept)} nodes with URLs")
-    print(f"Dropped {dropped} nodes without URLs")
+    print(f"Parsed {info['raw']} raw entries from {args.pagerank_output} in {info['parse_s']:.3f}s")
+    print(f"Kept   {info['kept']} nodes with URLs")
+    print(f"Dropped {info['dropped']} nodes without URLs")
     print(f"Renormalized total score over kept nodes to 1.0")
+    print(f"Wrote {args.output_json}" + (f" and {args.binary}" if args.binary else "")
+          + f" in {info['write_s']:.3f}s")
 
 
 if __name__ == "__main__":
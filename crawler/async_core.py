@@ -0,0 +1,230 @@
+# async_core.py
+import asyncio
+import codecs
+import time
+
+from crawler.checkpoint import CrawlCheckpoint
+from crawler.core import (
+    CHUNK_BYTES,
+    DRAIN_BYTES,
+    MAX_PAGE_BYTES,
+    USER_AGENT,
+    CrawlState,
+    FetchResult,
+    html_skip_reason,
+)
+from crawler.frontier import Frontier
+from crawler.http_cache import HTTPCache, charset_of
+from crawler.output import CrawlOutput
+from crawler.parsing import ParsePool, parse_page
+from crawler.politeness import HostPoliteness
+from crawler.stats import CrawlStats
+
+
+#Fetch helper (for asyncio tasks)
+
+async def fetch_url_async(session, url: str, cache: HTTPCache | None = None) -> FetchResult:
+    """
+    Fetch a URL with a shared aiohttp session; same contract as
+    crawler.core.fetch_url (headers checked first, body streamed and
+    decoded in chunks, download aborted past MAX_PAGE_BYTES).
+    """
+    import aiohttp
+
+    headers = cache.conditional_headers(url) if cache is not None else None
+    t0 = time.perf_counter()
+    try:
+        async with session.get(url, headers=headers) as resp:
+            t1 = time.perf_counter()
+            ttfb = t1 - t0
+            content_type = resp.headers.get("Content-Type", "")
+            if resp.status == 304 and cache is not None:
+                entry = cache.not_modified(url)
+                if entry is None:
+                    return FetchResult(304, content_type, None, "status", ttfb=ttfb)
+                return FetchResult(200, entry.content_type, entry.text, cached=entry, ttfb=ttfb)
+
+            skip = html_skip_reason(resp.status, content_type, resp.content_length)
+            if skip is not None:
+                if resp.content_length is not None and resp.content_length <= DRAIN_BYTES:
+                    await resp.read()   # keeps the connection reusable
+                return FetchResult(resp.status, content_type, None, skip, ttfb=ttfb)
+
+            decoder = codecs.getincrementaldecoder(charset_of(content_type))(errors="replace")
+            text, raw, nbytes = [], [], 0
+            async for chunk in resp.content.iter_chunked(CHUNK_BYTES):
+                nbytes += len(chunk)
+                if nbytes > MAX_PAGE_BYTES:
+                    return FetchResult(
+                        resp.status, content_type, None, "too_large", nbytes,
+                        ttfb=ttfb, transfer=time.perf_counter() - t1,
+                    )
+                text.append(decoder.decode(chunk))
+                if cache is not None:
+                    raw.append(chunk)
+            text.append(decoder.decode(b"", final=True))
+            transfer = time.perf_counter() - t1
+            if cache is not None:
+                cache.store(url, resp.headers, content_type, b"".join(raw))
+            return FetchResult(
+                resp.status, content_type, "".join(text), nbytes=nbytes, ttfb=ttfb, transfer=transfer,
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return FetchResult(0, "", None, "error", ttfb=time.perf_counter() - t0)
+
+
+#Main asyncio crawler
+
+async def crawl_graph_async(
+    start_url: str,
+    max_pages: int = 100,
+    target_lang: str | None = None,
+    workers: int = 100,
+    verbose: bool = True,
+    max_connections: int = 1000,
+    max_per_host: int = 100,
+    timeout: float = 2.0,
+    politeness: HostPoliteness | None = None,
+    parse_pool: ParsePool | None = None,
+    frontier: Frontier | None = None,
+    checkpoint: CrawlCheckpoint | None = None,
+    resume: bool = False,
+    cache: HTTPCache | None = None,
+    near_dup_distance: int | None = None,
+    output: CrawlOutput | None = None,
+    keep_pages: bool = True,
+    stats: CrawlStats | None = None,
+    progress=None,
+):
+    """
+    asyncio crawl engine with the same contract as crawler.core.crawl_graph.
+
+    One pooled aiohttp session is shared by `workers` tasks. The connector
+    caps open connections globally (max_connections) and per host
+    (max_per_host); keep-alive connections are reused across requests.
+    `politeness` spaces out request starts per host (token buckets); a task
+    waiting for its host's slot does not hold a connection.
+    With a process-backed `parse_pool`, HTML parsing runs in worker
+    processes and the event loop keeps fetching meanwhile.
+
+    Returns:
+      pages, edges, url_to_id, visited  (see crawl_graph)
+    """
+    import aiohttp
+
+    state = CrawlState(
+        start_url, max_pages, target_lang, verbose,
+        frontier=frontier, checkpoint=checkpoint, resume=resume,
+        near_dup_distance=near_dup_distance,
+        output=output, keep_pages=keep_pages, stats=stats,
+        progress=progress,
+    )
+    if politeness is None:
+        politeness = HostPoliteness()
+    if parse_pool is None:
+        parse_pool = ParsePool(target_lang=target_lang)
+    loop = asyncio.get_running_loop()
+
+    async def parse(url: str, html: str):
+        if parse_pool.executor is None:
+            return parse_page(url, html, parse_pool.target_lang, parse_pool.parser)
+        return await loop.run_in_executor(
+            parse_pool.executor, parse_page, url, html, parse_pool.target_lang, parse_pool.parser
+        )
+
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=max_per_host,
+        ttl_dns_cache=300,
+    )
+    # connect/read timeouts like requests' `timeout`; waiting for a free
+    # pooled connection does not count against them
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+    in_flight = 0
+    # set whenever a fetch finishes, so idle workers re-check the frontier
+    wake = asyncio.Event()
+
+    async def worker(session):
+        nonlocal in_flight
+        while True:
+            url = state.next_url()
+            if url is None:
+                if in_flight == 0:
+                    # frontier empty and nothing pending: crawl is done
+                    wake.set()
+                    return
+                wake.clear()
+                await wake.wait()
+                continue
+
+            in_flight += 1
+            try:
+                wait_s = politeness.reserve(url)
+                if wait_s > 0.0:
+                    await asyncio.sleep(wait_s)
+                fetched = await fetch_url_async(session, url, cache)
+                if stats is not None:
+                    stats.record_fetch(url, fetched)
+                if fetched.html is not None:
+                    # unchanged since the last crawl: reuse its parse if we have one
+                    entry = fetched.cached
+                    parsed = cache.reuse_parse(entry, state.target_lang) if entry is not None else None
+                    if parsed is None:
+                        try:
+                            parsed = await parse(url, fetched.html)
+                        except Exception:
+                            # unparsable page: visited, not indexed
+                            parsed = None
+                            if stats is not None:
+                                stats.count("parse_error")
+                        if parsed is not None and cache is not None:
+                            cache.store_parsed(url, parsed)
+                    elif stats is not None:
+                        stats.count("parse_reused")
+                    if parsed is not None:
+                        state.add_parsed(url, parsed)
+                        state.print_progress()
+                state.mark_done(url)
+            finally:
+                in_flight -= 1
+                wake.set()
+
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=client_timeout,
+        headers={"User-Agent": USER_AGENT},
+        trace_configs=[_stats_trace(stats)] if stats is not None else None,
+    ) as session:
+        await asyncio.gather(*(worker(session) for _ in range(max(1, workers))))
+
+    return state.result()
+
+
+def _stats_trace(stats: CrawlStats):
+    """aiohttp tracing hooks timing DNS lookups and new connections (both are part of ttfb)."""
+    import aiohttp
+
+    async def dns_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def dns_end(session, ctx, params):
+        stats.add("dns", time.perf_counter() - ctx.dns_start)
+
+    async def connect_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def connect_end(session, ctx, params):
+        stats.add("connect", time.perf_counter() - ctx.connect_start)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_dns_resolvehost_start.append(dns_start)
+    trace.on_dns_resolvehost_end.append(dns_end)
+    trace.on_connection_create_start.append(connect_start)
+    trace.on_connection_create_end.append(connect_end)
+    return trace
+
+
+def crawl_graph_asyncio(start_url: str, **kwargs):
+    """Synchronous wrapper: run crawl_graph_async in a fresh event loop."""
+    return asyncio.run(crawl_graph_async(start_url, **kwargs))
@@ -0,0 +1,101 @@
+# bench_crawl.py
+"""
+Compare crawl engines against the local stub site (crawler/stub_site.py).
+
+Usage (from the repo root or crawler/):
+  python bench_crawl.py --pages 2000 --latency 0.02 --threads 5,32 --async-workers 200,1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from crawler.core import crawl_graph  # noqa: E402
+from crawler.stub_site import StubSite  # noqa: E402
+
+
+def run_one(site: StubSite, label: str, max_pages: int, **kwargs) -> dict:
+    t0 = time.perf_counter()
+    pages, edges, url_to_id, visited = crawl_graph(
+        site.url, max_pages=max_pages, target_lang="en", verbose=False, **kwargs
+    )
+    elapsed = time.perf_counter() - t0
+    row = {
+        "engine": label,
+        "seconds": elapsed,
+        "visited": len(visited),
+        "indexed": len(pages),
+        "edges": len(edges),
+        "pages_per_s": len(visited) / elapsed if elapsed > 0 else 0.0,
+    }
+    print(
+        f"{label:<34} visited={row['visited']:>6} indexed={row['indexed']:>6} "
+        f"edges={row['edges']:>7} {elapsed:7.2f}s {row['pages_per_s']:9.1f} pages/s"
+    )
+    return row
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl engine benchmark on a local stub site")
+    parser.add_argument("--pages", type=int, default=1000, help="Pages on the stub site (default: 1000)")
+    parser.add_argument("--max-pages", type=int, default=None, help="Crawl budget (default: all pages)")
+    parser.add_argument("--links", type=int, default=10, help="Links per page (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per response (default: 0.02)")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Fraction of slow pages (default: 0)")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="Seconds for slow pages (default: 0.5)")
+    parser.add_argument("--threads", type=_int_list, default=[5, 32], help="Thread counts to try (default: 5,32)")
+    parser.add_argument(
+        "--async-workers", type=_int_list, default=[100, 500], help="asyncio task counts to try (default: 100,500)"
+    )
+    parser.add_argument(
+        "--crawl-delay", type=float, default=0.0, help="Per-host crawl delay in seconds (default: 0, unthrottled)"
+    )
+    parser.add_argument(
+        "--parse-workers", type=_int_list, default=[0], help="Parse process counts to try (default: 0 = inline)"
+    )
+    parser.add_argument("--parser", default="html.parser", help="BeautifulSoup backend (default: html.parser; auto = lxml if installed)")
+    parser.add_argument(
+        "--recrawl", action="store_true",
+        help="Serve ETags and crawl each config twice through an HTTP cache (cold, then warm)",
+    )
+    args = parser.parse_args()
+
+    # every page also links one PDF, which costs a visit like in a real crawl
+    max_pages = args.max_pages or 2 * args.pages + 1
+
+    with StubSite(
+        pages=args.pages,
+        links_per_page=args.links,
+        latency=args.latency,
+        slow_fraction=args.slow_fraction,
+        slow_latency=args.slow_latency,
+        etags=args.recrawl,
+    ) as site, tempfile.TemporaryDirectory() as tmp:
+        print(f"Stub site: {args.pages} pages at {site.url}, latency={args.latency}s\n")
+        common = {"crawl_delay": args.crawl_delay, "parser": args.parser}
+        runs = [("", None)]
+        if args.recrawl:
+            runs = [(", cold", "cache"), (", warm", "cache")]
+        for p in args.parse_workers:
+            suffix = f", parse={p}" if p else ""
+            for engine, counts in (("threads", args.threads), ("asyncio", args.async_workers)):
+                for n in counts:
+                    cache_path = os.path.join(tmp, f"{engine}-{n}-{p}.sqlite")
+                    for tag, use_cache in runs:
+                        run_one(site, f"{engine} (workers={n}{suffix}{tag})", max_pages,
+                                workers=n, engine=engine, parse_workers=p,
+                                http_cache=cache_path if use_cache else None, **common)
+
+
+if __name__ == "__main__":
+    main()
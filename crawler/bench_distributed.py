@@ -0,0 +1,75 @@
+# bench_distributed.py
+"""
+Single-process crawl vs partitioned multi-process crawl on a stub site.
+
+Crawls the whole site once with crawl_graph and once per partition count
+with crawl_distributed (partitioned by URL: the stub site is one host),
+prints pages/s, and checks that the merged graph has the same pages and
+edges as the single-process one.
+
+Usage:
+  python bench_distributed.py --pages 3000 --latency 0.01 --partitions 2,4
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from crawler.core import crawl_graph  # noqa: E402
+from crawler.distributed import crawl_distributed  # noqa: E402
+from crawler.stub_site import StubSite  # noqa: E402
+
+
+def url_edges(edges, url_to_id) -> set[tuple[str, str]]:
+    urls = list(url_to_id.urls())
+    return {(urls[s], urls[d]) for s, d in edges}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the partitioned crawl against one process")
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=16, help="Fetch threads per process")
+    parser.add_argument("--partitions", type=str, default="2,4")
+    args = parser.parse_args()
+
+    max_pages = 2 * args.pages + 1   # whole site: pages + their PDFs
+    with StubSite(pages=args.pages, latency=args.latency) as site:
+        print(f"Stub site: {args.pages} pages at {site.url}, latency={args.latency}s\n")
+
+        t0 = time.perf_counter()
+        _, edges, url_to_id, visited = crawl_graph(
+            site.url, max_pages=max_pages, workers=args.workers, verbose=False,
+            crawl_delay=0, near_dup_distance=None,
+        )
+        elapsed = time.perf_counter() - t0
+        reference = url_edges(edges, url_to_id)
+        print(f"{'1 process':<14} visited={len(visited):>6}  {len(visited) / elapsed:>7.0f} pages/s  edges={len(reference)}")
+
+        for n in (int(x) for x in args.partitions.split(",")):
+            out = tempfile.mkdtemp(prefix="partitions-")
+            try:
+                t0 = time.perf_counter()
+                edges, url_to_id, stats = crawl_distributed(
+                    site.url, max_pages=max_pages, partitions=n, by="url", output_dir=out,
+                    workers=args.workers, verbose=False, crawl_delay=0, near_dup_distance=None,
+                )
+                elapsed = time.perf_counter() - t0
+            finally:
+                shutil.rmtree(out, ignore_errors=True)
+            merged = url_edges(edges, url_to_id)
+            same = "same graph" if merged == reference else f"DIFFERENT graph ({len(merged ^ reference)} edges differ)"
+            print(
+                f"{f'{n} partitions':<14} visited={stats['visited']:>6}  {stats['visited'] / elapsed:>7.0f} pages/s  "
+                f"edges={len(merged)}  {stats['urls_exchanged']} URLs in {stats['batches']} batches, {same}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench_frontier.py
+"""
+Memory per URL of the crawl frontier vs the old set[str] + deque[str].
+
+Pushes N synthetic URLs (each pushed twice, like repeated links), visits
+half of them, and measures allocated memory with tracemalloc.
+
+Usage:
+  python bench_frontier.py --urls 1000000 --memory-mb 16
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from crawler.frontier import Frontier  # noqa: E402
+
+
+def iter_urls(n: int):
+    # fresh str objects on every call, like URLs coming out of the parser
+    for i in range(n):
+        yield f"https://www.example.org/section{i % 97}/article-{i}?page={i % 7}"
+
+
+def run_baseline(n: int):
+    """The pre-frontier CrawlState: visited set + deque with duplicates."""
+    visited: set[str] = set()
+    queue: deque[str] = deque()
+    for u in iter_urls(n):
+        queue.append(u)
+    for u in iter_urls(n):
+        if u not in visited:
+            queue.append(u)
+    for _ in range(n // 2):
+        u = queue.popleft()
+        if u not in visited:
+            visited.add(u)
+    return visited, queue
+
+
+def run_frontier(n: int, **kwargs):
+    frontier = Frontier(**kwargs)
+    for u in iter_urls(n):
+        frontier.push(u)
+    for u in iter_urls(n):
+        frontier.push(u)
+    for _ in range(n // 2):
+        frontier.pop()
+    return frontier
+
+
+def measure(label: str, fn, n: int):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    kept = fn()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<28} {current / n:7.1f} B/url retained  {peak / n:7.1f} B/url peak  {elapsed:6.2f}s"
+    )
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frontier memory benchmark")
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--memory-mb", type=int, default=16, help="Frontier queue memory budget (default: 16)")
+    args = parser.parse_args()
+
+    n = args.urls
+    print(f"{n} URLs pushed twice, {n // 2} visited\n")
+
+    measure("set + deque (baseline)", lambda: run_baseline(n), n)
+    f = measure("Frontier exact", lambda: run_frontier(n, memory_budget=args.memory_mb << 20), n)
+    print(f"    report: {_fmt(f.memory_report())}")
+    f.close()
+    f = measure(
+        "Frontier lossy bloom",
+        lambda: run_frontier(n, memory_budget=args.memory_mb << 20, lossy_bloom_capacity=n),
+        n,
+    )
+    rep = f.memory_report()
+    print(f"    report: {_fmt(rep)}")
+    print(f"    bloom false positives: {n - rep['seen_urls']} of {n}")
+    f.close()
+
+
+def _fmt(rep: dict) -> str:
+    return (
+        f"seen={rep['seen_urls']} queued={rep['queued_urls']} spilled={rep['spilled_urls']} "
+        f"{rep['total_bytes'] / 2**20:.1f} MiB ({rep['bytes_per_url']:.1f} B/url)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# checkpoint.py
+"""
+Append-only crawl checkpoints, so a crawl that dies can resume where it
+stopped instead of starting over from the seed.
+
+Layout of a checkpoint directory:
+
+  meta.json       crawl config (start_url, target_lang), checked on resume
+  urls.jsonl      URL table, one URL per line in id order
+  pushed.jsonl    every URL ever enqueued, in frontier order
+  done.bin        uint64 fingerprints of URLs whose fetch finished
+  edges.bin       int32 (src_id, dst_id) pairs
+  pages.jsonl     indexed pages {id, url, text}
+  aliases.bin     int32 (near-duplicate id, canonical id) pairs
+  commits.jsonl   one line per checkpoint: byte sizes of all files above
+
+Each checkpoint only appends what changed since the previous one, then
+appends a commit line. On resume every file is truncated back to the last
+commit, so a crash in the middle of a write loses at most one interval.
+URLs that were in flight at the crash are not in done.bin and are fetched
+again; finished ones never are.
+"""
+import json
+import os
+import shutil
+import time
+from array import array
+from dataclasses import dataclass, field
+
+LOG_FILES = ("urls.jsonl", "pushed.jsonl", "done.bin", "edges.bin", "pages.jsonl", "aliases.bin")
+
+
+@dataclass
+class RestoredCrawl:
+    urls: list[str] = field(default_factory=list)
+    pushed: list[str] = field(default_factory=list)
+    done: array = field(default_factory=lambda: array("Q"))
+    edges_src: array = field(default_factory=lambda: array("i"))
+    edges_dst: array = field(default_factory=lambda: array("i"))
+    pages: list[dict] = field(default_factory=list)
+    aliases: list[tuple[int, int]] = field(default_factory=list)
+
+
+class CrawlCheckpoint:
+    """
+    Incremental checkpoint writer/loader for one CrawlState.
+
+    CrawlState calls record_push() / record_done() / record_page() as the
+    crawl runs and write() when due(); both are cheap, the writes are
+    append-only.
+    """
+
+    def __init__(self, directory, every: int = 500, interval: float = 30.0):
+        self.directory = os.fspath(directory)
+        self.every = every            # checkpoint after this many finished fetches
+        self.interval = interval      # ... or after this many seconds
+
+        self._pushed: list[str] = []
+        self._done = array("Q")
+        self._pages: list[str] = []
+        # how much of the URL table / edges / aliases is already on disk
+        self._urls_written = 0
+        self._edges_written = 0
+        self._aliases_written = 0
+        self._last_write = time.monotonic()
+        self._files = {}
+        self.commits = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def exists(directory) -> bool:
+        return os.path.exists(os.path.join(os.fspath(directory), "commits.jsonl"))
+
+    #  setup
+
+    def start(self, config: dict):
+        """Fresh crawl: clear the directory and write meta.json."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory)
+        with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        self._open()
+
+    def load(self, config: dict) -> RestoredCrawl:
+        """Read everything up to the last commit; later appends are truncated away."""
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        for key in ("start_url", "target_lang"):
+            if meta.get(key) != config.get(key):
+                raise ValueError(
+                    f"checkpoint in {self.directory} is for {key}={meta.get(key)!r}, "
+                    f"not {config.get(key)!r}"
+                )
+
+        commit = None
+        with open(self._path("commits.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    commit = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line
+        if commit is None:
+            raise ValueError(f"no complete checkpoint in {self.directory}")
+
+        for name in LOG_FILES:
+            with open(self._path(name), "ab") as f:
+                # .get: files added after a checkpoint was written start empty
+                f.truncate(commit["sizes"].get(name, 0))
+
+        restored = RestoredCrawl()
+        with open(self._path("urls.jsonl"), encoding="utf-8") as f:
+            restored.urls = [json.loads(line) for line in f]
+        with open(self._path("pushed.jsonl"), encoding="utf-8") as f:
+            restored.pushed = [json.loads(line) for line in f]
+        with open(self._path("done.bin"), "rb") as f:
+            restored.done.frombytes(f.read())
+        with open(self._path("edges.bin"), "rb") as f:
+            pairs = array("i")
+            pairs.frombytes(f.read())
+            restored.edges_src = pairs[0::2]
+            restored.edges_dst = pairs[1::2]
+        with open(self._path("pages.jsonl"), encoding="utf-8") as f:
+            restored.pages = [json.loads(line) for line in f]
+        with open(self._path("aliases.bin"), "rb") as f:
+            pairs = array("i")
+            pairs.frombytes(f.read())
+            restored.aliases = list(zip(pairs[0::2], pairs[1::2]))
+
+        self._urls_written = len(restored.urls)
+        self._edges_written = len(restored.edges_src)
+        self._aliases_written = len(restored.aliases)
+        self.commits = commit["n"]
+        self._open()
+        return restored
+
+    def _open(self):
+        self._files = {name: open(self._path(name), "ab") for name in LOG_FILES}
+        self._files["commits.jsonl"] = open(self._path("commits.jsonl"), "ab")
+
+    #  recording
+
+    def record_push(self, url: str):
+        self._pushed.append(url)
+
+    def record_done(self, fp: int):
+        self._done.append(fp)
+
+    def record_page(self, page: dict):
+        self._pages.append(json.dumps(page, ensure_ascii=False) + "\n")
+
+    def due(self) -> bool:
+        return (
+            len(self._done) >= self.every
+            or (self._done and time.monotonic() - self._last_write >= self.interval)
+        )
+
+    def write(self, state):
+        """Append everything new in state since the last checkpoint, then commit."""
+        files = self._files
+
+        urls = state.url_to_id
+        if len(urls) > self._urls_written:
+            files["urls.jsonl"].write(
+                "".join(json.dumps(u) + "\n" for u in urls.urls(self._urls_written)).encode("utf-8")
+            )
+            self._urls_written = len(urls)
+
+        if self._pushed:
+            files["pushed.jsonl"].write(
+                "".join(json.dumps(u) + "\n" for u in self._pushed).encode("utf-8")
+            )
+            self._pushed = []
+
+        if self._done:
+            files["done.bin"].write(self._done.tobytes())
+            self._done = array("Q")
+
+        edges = state.edges
+        if len(edges) > self._edges_written:
+            start = self._edges_written
+            pairs = array("i", bytes(8 * (len(edges) - start)))
+            pairs[0::2] = edges.src[start:]
+            pairs[1::2] = edges.dst[start:]
+            files["edges.bin"].write(pairs.tobytes())
+            self._edges_written = len(edges)
+
+        if self._pages:
+            files["pages.jsonl"].write("".join(self._pages).encode("utf-8"))
+            self._pages = []
+
+        # aliases only ever grow, and dicts keep insertion order
+        if len(state.aliases) > self._aliases_written:
+            new = list(state.aliases.items())[self._aliases_written:]
+            pairs = array("i", [i for pair in new for i in pair])
+            files["aliases.bin"].write(pairs.tobytes())
+            self._aliases_written = len(state.aliases)
+
+        for f in files.values():
+            f.flush()
+        for name in LOG_FILES:
+            os.fsync(files[name].fileno())
+
+        self.commits += 1
+        sizes = {name: files[name].tell() for name in LOG_FILES}
+        files["commits.jsonl"].write(
+            (json.dumps({"n": self.commits, "time": time.time(), "sizes": sizes}) + "\n").encode("utf-8")
+        )
+        files["commits.jsonl"].flush()
+        os.fsync(files["commits.jsonl"].fileno())
+        self._last_write = time.monotonic()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
@@ -1,11 +1,31 @@
 # core.py
-import re
+import codecs
+import heapq
+import itertools
 import time
+from typing import NamedTuple
+import numpy as np
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, urlunparse
-from collections import deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib.parse import urlparse, urlunparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from crawler.checkpoint import CrawlCheckpoint
+from crawler.dedup import NearDuplicateIndex, simhash
+from crawler.frontier import Frontier, fingerprint
+from crawler.http_cache import CacheEntry, HTTPCache, charset_of
+from crawler.output import CrawlOutput
+from crawler.parsing import (  # noqa: F401  (re-exported for existing imports)
+    ParsedPage,
+    ParsePool,
+    detect_page_language,
+    extract_text_from_soup,
+    parse_page,
+)
+from crawler.politeness import HostPoliteness
+from crawler.stats import CrawlStats
+from crawler.urltable import EdgeBuffer, URLTable
 
 
 #Domain + URL helpers
@@ -60,126 +80,483 @@ def normalize_url(url: str) -> str:
     return urlunparse(parsed)
 
 
-#Language detection
+#Fetch helper (for threads)
 
-def detect_page_language(soup: BeautifulSoup) -> str | None:
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+# skip giant pages (> 2 MB); enforced while downloading, not after
+MAX_PAGE_BYTES = 2_000_000
+# bodies are read and decoded in chunks of this size
+CHUNK_BYTES = 64 * 1024
+# skipped responses up to this size are read to the end anyway, so their
+# keep-alive connection goes back to the pool instead of being dropped
+DRAIN_BYTES = 64 * 1024
+
+
+class FetchResult(NamedTuple):
+    """A finished fetch, as the engines see it (fetch_url / fetch_url_async)."""
+    status: int                     # HTTP status, 0 if the request failed
+    content_type: str
+    html: str | None                # decoded body; None if skipped
+    skip: str | None = None         # why html is None (SKIP_REASONS)
+    nbytes: int = 0                 # body bytes downloaded (after transport decompression)
+    cached: CacheEntry | None = None   # 304 answered from the HTTP cache
+    ttfb: float = 0.0               # seconds to response headers (DNS + connect + server)
+    transfer: float = 0.0           # seconds reading the body
+
+
+# error: network / protocol failure, status: not 200, not_html: other
+# Content-Type, too_large: over MAX_PAGE_BYTES
+SKIP_REASONS = ("error", "status", "not_html", "too_large")
+
+# seconds between calls of a crawl's progress callback
+PROGRESS_INTERVAL = 0.5
+
+
+def html_skip_reason(status: int, content_type: str, content_length: int | None) -> str | None:
+    """Why a response is not worth downloading, judged from its headers alone."""
+    if status != 200:
+        return "status"
+    if "text/html" not in content_type:
+        return "not_html"
+    if content_length is not None and content_length > MAX_PAGE_BYTES:
+        return "too_large"
+    return None
+
+
+def make_session(workers: int) -> requests.Session:
     """
-    Try to detect page language from <html lang="..."> or meta tags.
-    Returns a short language code like 'en', 'de', or None if unknown.
+    requests session for the threaded engine: one keep-alive connection
+    per worker thread and host (the default pool keeps only 10, so extra
+    connections were closed after every request) and every transport
+    compression urllib3 can decode (gzip/deflate, plus br / zstd if the
+    optional packages are installed).
     """
-    lang = None
-
-    # <html lang="en-US">, <html lang="de">
-    if soup.html and soup.html.has_attr("lang"):
-        lang = soup.html["lang"]
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(10, workers), pool_maxsize=max(10, workers))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING})
+    return session
 
-    # <meta http-equiv="content-language" content="en">
-    if not lang:
-        meta = soup.find("meta", attrs={"http-equiv": re.compile("content-language", re.I)})
-        if meta and meta.get("content"):
-            lang = meta["content"]
 
-    # <meta name="language" content="en">
-    if not lang:
-        meta = soup.find("meta", attrs={"name": re.compile("language", re.I)})
-        if meta and meta.get("content"):
-            lang = meta["content"]
+def fetch_url(session: requests.Session, url: str, timeout: float = 2.0, cache: HTTPCache | None = None):
+    """
+    Fetch a URL with given session and timeout.
+    Returns (url, FetchResult).
 
-    if not lang:
-        return None
+    The body is streamed: status and headers are checked before anything
+    is downloaded (non-HTML and declared-oversize responses are never
+    read), and the download stops as soon as it passes MAX_PAGE_BYTES.
+    Chunks are decoded as they arrive.
 
-    # normalize 'en-US', 'DE-de' -> 'en', 'de'
-    lang = lang.strip().lower()
-    lang = lang.split(",")[0]  # in case of "en, fr"
-    lang = lang.split("-")[0]
-    return lang or None
+    With a cache, the request is conditional; a 304 comes back with the
+    stored body (FetchResult.cached), and new HTML bodies are stored.
+    """
+    t0 = time.perf_counter()
+    try:
+        headers = cache.conditional_headers(url) if cache is not None else None
+        resp = session.get(url, timeout=timeout, headers=headers, stream=True)
+    except Exception:
+        return url, FetchResult(0, "", None, "error", ttfb=time.perf_counter() - t0)
+    t1 = time.perf_counter()
+    ttfb = t1 - t0
+
+    with resp:
+        content_type = resp.headers.get("Content-Type", "")
+        if resp.status_code == 304 and cache is not None:
+            entry = cache.not_modified(url)
+            if entry is None:
+                return url, FetchResult(304, content_type, None, "status", ttfb=ttfb)
+            return url, FetchResult(200, entry.content_type, entry.text, cached=entry, ttfb=ttfb)
+
+        declared = resp.headers.get("Content-Length", "")
+        declared = int(declared) if declared.isdigit() else None
+        skip = html_skip_reason(resp.status_code, content_type, declared)
+        if skip is not None:
+            if declared is not None and declared <= DRAIN_BYTES:
+                try:
+                    for _ in resp.iter_content(CHUNK_BYTES):
+                        pass
+                except Exception:
+                    pass
+            return url, FetchResult(resp.status_code, content_type, None, skip, ttfb=ttfb)
+
+        decoder = codecs.getincrementaldecoder(charset_of(content_type))(errors="replace")
+        text, raw, nbytes = [], [], 0
+        try:
+            for chunk in resp.iter_content(CHUNK_BYTES):
+                nbytes += len(chunk)
+                if nbytes > MAX_PAGE_BYTES:
+                    # undeclared or wrong Content-Length: stop here, drop the connection
+                    return url, FetchResult(
+                        resp.status_code, content_type, None, "too_large", nbytes,
+                        ttfb=ttfb, transfer=time.perf_counter() - t1,
+                    )
+                text.append(decoder.decode(chunk))
+                if cache is not None:
+                    raw.append(chunk)
+            text.append(decoder.decode(b"", final=True))
+        except Exception:
+            return url, FetchResult(
+                resp.status_code, content_type, None, "error", nbytes,
+                ttfb=ttfb, transfer=time.perf_counter() - t1,
+            )
+
+    transfer = time.perf_counter() - t1
+    if cache is not None:
+        cache.store(url, resp.headers, content_type, b"".join(raw))
+    return url, FetchResult(
+        resp.status_code, content_type, "".join(text), nbytes=nbytes, ttfb=ttfb, transfer=transfer,
+    )
+
+
+#Shared crawl bookkeeping (used by every crawl engine)
+
+class CrawlResult(tuple):
+    """
+    What crawl_graph returns: unpacks as (pages, edges, url_to_id, visited)
+    like before, plus .stats (CrawlStats, or None unless stats were enabled).
+    """
 
+    def __new__(cls, pages, edges, url_to_id, visited, stats: CrawlStats | None = None):
+        result = super().__new__(cls, (pages, edges, url_to_id, visited))
+        result.stats = stats
+        return result
 
-#Text extraction (reuse soup)
 
-def extract_text_from_soup(soup: BeautifulSoup) -> str:
-    """
-    Extract main visible text from HTML, trying to skip header/nav/footer.
-    Uses an existing BeautifulSoup object (no double parsing).
+class CrawlState:
     """
-    # 1) Remove obviously non-content tags
-    for tag in soup(["script", "style", "noscript", "svg", "img",
-                     "picture", "video", "audio", "canvas",
-                     "form", "button"]):
-        tag.decompose()
-
-    # 2) Remove typical boilerplate containers
-    boilerplate_selectors = [
-        "header",
-        "footer",
-        "nav",
-        "aside",
-        ".navbar",
-        ".nav",
-        ".navigation",
-        ".site-header",
-        ".site-footer",
-        ".footer",
-        "#header",
-        "#footer",
-        "#nav",
-        "#navbar",
-        ".cookie",
-        ".cookie-banner",
-        "#cookie-banner",
-        ".banner",
-    ]
-    for selector in boilerplate_selectors:
-        for el in soup.select(selector):
-            el.decompose()
-
-    # 3) Find main-like content region
-    main = soup.find("main")
-    if not main:
-        for cand in [
-            "article",
-            "#main",
-            ".main",
-            ".main-content",
-            "#content",
-            ".content",
-            ".page-content",
-            ".layout__content",
-        ]:
-            main = soup.select_one(cand)
-            if main:
-                break
+    Frontier, visited set, ID assignment, pages and edges of one crawl.
 
-    root = main or soup.body or soup
-    text = root.get_text(" ", strip=True)
+    Engines (threads in crawl_graph, asyncio in crawler.async_core) only
+    fetch: they pull URLs with next_url(), hand HTML back via add_page() /
+    add_parsed() and call mark_done() once a URL is finished either way.
 
-    # Normalize whitespace
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    With a `checkpoint`, progress is appended to disk as the crawl runs;
+    resume=True continues from an existing checkpoint in that directory.
 
+    Pages whose text is within `near_dup_distance` SimHash bits of an
+    earlier page (crawler.dedup) are not indexed; their links are added to
+    the earlier page instead and `aliases` maps their id to its id. None
+    turns this off.
 
-#Fetch helper (for threads)
+    With an `output`, pages and edges are streamed to disk as they come
+    in (see crawler.output); keep_pages=False then leaves `pages` empty so
+    page texts are not held in memory.
 
-def fetch_url(session: requests.Session, url: str, timeout: float = 2.0):
-    """
-    Fetch a URL with given session and timeout.
-    Returns (url, response or None).
+    `stats` (crawler.stats) collects per-stage timers and counters; None
+    (the default) skips all of it.
+
+    `progress(state)` is called from mark_done() at most every
+    PROGRESS_INTERVAL seconds; it may call state.stop(), after which no
+    new URLs are handed out and the crawl ends once in-flight fetches do.
+
+    With a `router` (crawler.distributed), this state crawls one partition
+    of URL space: links the router does not own are recorded as edges but
+    handed to router.send() instead of the local frontier.
     """
-    try:
-        resp = session.get(url, timeout=timeout)
-        return url, resp
-    except Exception:
-        return url, None
+
+    def __init__(
+        self,
+        start_url: str,
+        max_pages: int,
+        target_lang: str | None = None,
+        verbose: bool = True,
+        frontier: Frontier | None = None,
+        checkpoint: CrawlCheckpoint | None = None,
+        resume: bool = False,
+        near_dup_distance: int | None = None,
+        output: CrawlOutput | None = None,
+        keep_pages: bool = True,
+        router=None,
+        stats: CrawlStats | None = None,
+        progress=None,
+    ):
+        self.start_url = normalize_url(start_url)
+        self.base_domain = get_base_domain(urlparse(self.start_url).netloc.lower())
+        self.max_pages = max_pages
+        self.target_lang = target_lang.lower() if target_lang else None
+        self.verbose = verbose
+        self.stopped = False
+
+        self.pages: list[dict] = []      # {"id", "url", "text"}; empty unless keep_pages
+        self.keep_pages = keep_pages
+        self.indexed = 0
+        self.edges = EdgeBuffer()        # (source_id, target_id)
+
+        # dedup queue + fingerprint visited set (see crawler.frontier)
+        self.frontier = frontier if frontier is not None else Frontier()
+        self.visited = self.frontier.visited
+
+        # URLs are interned to ids when first discovered
+        self.url_to_id = URLTable()
+
+        # near-duplicate page id -> canonical page id
+        self.near_dups = NearDuplicateIndex(near_dup_distance) if near_dup_distance is not None else None
+        self.aliases: dict[int, int] = {}
+
+        if verbose:
+            print(f"Crawling base domain: {self.base_domain}")
+            if target_lang:
+                print(f"Restricting to language: {target_lang}")
+
+        self.checkpoint = checkpoint
+        self.output = output
+        self.router = router
+        self.stats = stats
+        self.progress = progress
+        self._progress_due = 0.0
+        config = {"start_url": self.start_url, "target_lang": self.target_lang}
+        if checkpoint is not None and resume and CrawlCheckpoint.exists(checkpoint.directory):
+            self._restore(checkpoint.load(config))
+        else:
+            if checkpoint is not None:
+                checkpoint.start(config)
+            # the seed holds all OPIC cash at the start
+            if router is None or router.owns(self.start_url, fingerprint(self.start_url)):
+                self._push(self.start_url, score=1.0)
+
+    def _restore(self, restored):
+        for url in restored.urls:
+            self.url_to_id.intern(url)
+        self.edges.src, self.edges.dst = restored.edges_src, restored.edges_dst
+        self.aliases = dict(restored.aliases)
+        for page in restored.pages:
+            if self.near_dups is not None:
+                h = simhash(page["text"])
+                if h is not None:
+                    self.near_dups.add(h, page["id"])
+            if self.keep_pages:
+                self.pages.append(page)
+            if self.output is not None:
+                self.output.write_page(page)
+        self.indexed = len(restored.pages)
+        self.frontier.restore(restored.pushed, restored.done)
+        if self.verbose:
+            print(
+                f"[checkpoint] resumed from {self.checkpoint.directory}: "
+                f"visited={len(self.visited)} indexed={self.indexed} "
+                f"queued={len(self.frontier)} edges={len(self.edges)}"
+            )
+
+    def _push(self, url: str, fp: int | None = None, score: float = 0.0):
+        if self.frontier.push(url, fp, score) and self.checkpoint is not None:
+            self.checkpoint.record_push(url)
+
+    def mark_done(self, url: str):
+        """url's fetch finished (indexed, skipped or failed); never fetch it again."""
+        if self.output is not None and self.output.due():
+            self.output.flush(self)
+        if self.stats is not None:
+            self.stats.maybe_emit()
+        if self.progress is not None:
+            now = time.monotonic()
+            if now >= self._progress_due:
+                self._progress_due = now + PROGRESS_INTERVAL
+                self.progress(self)
+        if self.checkpoint is None and not self.frontier.prioritized:
+            return
+        fp = fingerprint(url)
+        self.frontier.discard(fp)
+        if self.checkpoint is None:
+            return
+        self.checkpoint.record_done(fp)
+        if self.checkpoint.due():
+            self.checkpoint.write(self)
+
+    def _record_page(self, page: dict):
+        self.indexed += 1
+        if self.stats is not None:
+            self.stats.count("indexed")
+        if self.keep_pages:
+            self.pages.append(page)
+        if self.checkpoint is not None:
+            self.checkpoint.record_page(page)
+        if self.output is not None:
+            self.output.write_page(page)
+
+    def budget_left(self) -> bool:
+        return not self.stopped and len(self.visited) < self.max_pages
+
+    def stop(self):
+        """End the crawl early: hand out no more URLs (in-flight fetches still finish)."""
+        self.stopped = True
+
+    def next_url(self) -> str | None:
+        """Pop the next unvisited URL and mark it visited; None if none left."""
+        if not self.budget_left():
+            return None
+        return self.frontier.pop()
+
+    def add_page(self, url: str, html: str):
+        """Parse a fetched HTML page inline and record it (see add_parsed)."""
+        self.add_parsed(url, parse_page(url, html, self.target_lang))
+
+    def add_parsed(self, url: str, parsed: ParsedPage):
+        """Record a parsed page: assign its ID, store text, expand its links."""
+        stats = self.stats
+        if stats is not None:
+            stats.record_parse(parsed)
+        if parsed.text is None:
+            # rejected by the language filter: visited but not indexed or expanded
+            if stats is not None:
+                stats.count("rejected_lang")
+            return
+        t0 = time.perf_counter() if stats is not None else 0.0
+
+        #  assign ID 
+        page_id = self.url_to_id.intern(url)
+
+        #  near-duplicates: links go to the canonical page, text is dropped
+        canonical = None
+        if self.near_dups is not None:
+            h = parsed.simhash if parsed.simhash is not None else simhash(parsed.text)
+            if h is not None:
+                canonical = self.near_dups.check_and_add(h, page_id)
+        if canonical is not None:
+            self.aliases[page_id] = canonical
+            source_id = canonical
+            if stats is not None:
+                stats.count("near_duplicate")
+        else:
+            source_id = page_id
+            #  store page text 
+            self._record_page({"id": page_id, "url": url, "text": parsed.text})
+
+        #  links 
+        target_fps = []
+        for target in parsed.links:
+            target = normalize_url(target)
+
+            if not is_same_domain(target, self.base_domain):
+                continue
+            if target.startswith("mailto:") or target.startswith("javascript:"):
+                continue
+
+            fp = fingerprint(target)
+            self.edges.append(source_id, self.url_to_id.intern(target, fp))
+
+            if self.router is not None and not self.router.owns(target, fp):
+                # another partition crawls it
+                self.router.send(target, fp)
+                continue
+
+            # no-op if target was queued or visited before
+            self._push(target, fp)
+            target_fps.append(fp)
+
+        # priority orders: pass this page's importance on to its links
+        if self.frontier.prioritized:
+            self.frontier.credit(fingerprint(url), target_fps)
+
+        if stats is not None:
+            stats.add("links", time.perf_counter() - t0)
+
+    def print_progress(self):
+        if not self.verbose:
+            return
+        # Overwrite the same line
+        print(
+            f"\rProgress: visited={len(self.visited)}/{self.max_pages} | "
+            f"indexed(lang-ok)={self.indexed}",
+            end="",
+            flush=True,
+        )
+
+    def result(self):
+        if self.verbose:
+            print()  # move to next line after \r output
+            mem = self.frontier.memory_report()
+            print(
+                f"[frontier] seen={mem['seen_urls']} visited={mem['visited_urls']} "
+                f"spilled={mem['spilled_urls']} | {mem['total_bytes'] / 1024:.0f} KiB, "
+                f"{mem['bytes_per_url']:.1f} B/url"
+            )
+        self.frontier.close()
+        if self.checkpoint is not None:
+            self.checkpoint.write(self)
+            self.checkpoint.close()
+        if self.output is not None:
+            # before the alias collapse: edges.bin holds edges as discovered
+            self.output.close(self)
+        if self.aliases:
+            self._collapse_aliases()
+        if self.stats is not None:
+            self.stats.close()
+            if self.verbose:
+                print(self.stats.report())
+        return CrawlResult(self.pages, self.edges, self.url_to_id, self.visited, self.stats)
+
+    def _collapse_aliases(self):
+        """
+        Point edges into near-duplicates at their canonical page (edges out
+        of them already start there). Self-loops that only exist because of
+        the merge are dropped.
+        """
+        remap = np.arange(len(self.url_to_id), dtype=np.int32)
+        dup = np.fromiter(self.aliases.keys(), dtype=np.int32, count=len(self.aliases))
+        remap[dup] = np.fromiter(self.aliases.values(), dtype=np.int32, count=len(self.aliases))
+
+        src, dst = self.edges.to_numpy()
+        new_src, new_dst = remap[src], remap[dst]
+        keep = (new_src != new_dst) | (src == dst)
+        self.edges = EdgeBuffer.from_arrays(new_src[keep], new_dst[keep])
+        if self.verbose:
+            print(
+                f"[dedup] {len(self.aliases)} near-duplicate pages collapsed onto "
+                f"{len(set(self.aliases.values()))} canonical pages"
+            )
 
 
 #Main concurrent crawler
 
+def _record_parsed(state: CrawlState, url: str, future, cache: HTTPCache | None = None):
+    try:
+        parsed = future.result()
+    except Exception:
+        # unparsable page: visited, not indexed
+        parsed = None
+        if state.stats is not None:
+            state.stats.count("parse_error")
+    if parsed is not None:
+        state.add_parsed(url, parsed)
+        if cache is not None:
+            cache.store_parsed(url, parsed)
+    state.mark_done(url)
+
+
 def crawl_graph(
     start_url: str,
     max_pages: int = 100,
     target_lang: str | None = None,
     workers: int = 5,
     verbose: bool = True,
+    engine: str = "threads",
+    max_connections: int = 1000,
+    max_per_host: int = 100,
+    crawl_delay: float = 0.02,
+    host_burst: int = 5,
+    host_delays: dict[str, float] | None = None,
+    parse_workers: int = 0,
+    parser: str = "html.parser",
+    frontier_memory_mb: int = 64,
+    lossy_bloom_capacity: int = 0,
+    order: str = "bfs",
+    checkpoint_dir: str | None = None,
+    resume: bool = False,
+    checkpoint_every: int = 500,
+    http_cache: str | None = None,
+    near_dup_distance: int | None = None,
+    output_dir: str | None = None,
+    keep_pages: bool = True,
+    stats: bool = False,
+    stats_jsonl: str | None = None,
+    progress=None,
 ):
     """
     Concurrent crawling logic with optional progress display.
@@ -188,136 +565,195 @@ def crawl_graph(
       start_url: starting URL
       max_pages: max number of pages to VISIT (including skipped languages)
       target_lang: e.g. "en" or "de"
-      workers: number of parallel fetches
+      workers: number of parallel fetches (threads, or asyncio tasks)
       verbose: whether to print progress to stdout
+      engine: "threads" (requests + ThreadPoolExecutor) or "asyncio"
+        (aiohttp, see crawler.async_core)
+      max_connections / max_per_host: connection pool limits (asyncio only)
+      crawl_delay: per-host politeness, seconds between requests to one
+        host (token bucket refill interval); 0 disables throttling
+      host_burst: requests a host may receive back-to-back before crawl_delay applies
+      host_delays: per-host crawl_delay overrides, e.g. {"www.tum.de": 1.0}
+      parse_workers: processes for HTML parsing / text extraction
+        (0 = parse in the crawling process)
+      parser: BeautifulSoup backend (default html.parser; "lxml", or "auto" = lxml if installed)
+      frontier_memory_mb: queued URLs kept in memory before spilling to disk
+      lossy_bloom_capacity: > 0 replaces the exact seen-check with a Bloom
+        filter sized for that many URLs (smaller, but ~1% of new URLs are
+        never crawled)
+      order: "bfs", or fetch the most important known URL first under the
+        max_pages budget: "opic" (OPIC cash) or "inlinks" (links from
+        fetched pages); see crawler.frontier.Frontier
+      checkpoint_dir: append crawl progress there (see crawler.checkpoint)
+      resume: continue from the checkpoint in checkpoint_dir instead of the seed
+      checkpoint_every: checkpoint after this many finished fetches (or 30s)
+      http_cache: SQLite file for the conditional-request response cache
+        (see crawler.http_cache); recrawls reuse unchanged pages and parses
+      near_dup_distance: collapse pages whose text SimHash is within this
+        many bits of an earlier page onto that page (see crawler.dedup);
+        None disables
+      output_dir: stream pages.jsonl / urls.txt / edges.bin there while
+        crawling (see crawler.output)
+      keep_pages: False returns an empty pages list instead of holding
+        every page text in memory (use with output_dir)
+      stats: time fetch / parse / bookkeeping stages, count skips and
+        per-host latency (see crawler.stats); printed at the end if verbose
+      stats_jsonl: also append a stats snapshot line to this file every
+        few seconds (implies stats)
+      progress: callable(state) run on the crawl's bookkeeping thread about
+        twice a second with the live CrawlState (for progress reporting;
+        state.stop() ends the crawl early). Must not block.
 
     Returns:
-      pages: list of dicts {id, url, text}
-      edges_url: list of (source_url, target_url)
-      url_to_id: dict url -> int
-      visited: set of visited URLs
+      pages: list of dicts {id, url, text} (empty if keep_pages=False)
+      edges: EdgeBuffer of (source_id, target_id); .to_numpy() for arrays
+      url_to_id: URLTable, read-only url -> id mapping; .url_of(id) reverses it
+      visited: FingerprintSet of visited URLs (supports len() and `url in visited`)
+    The result unpacks as that 4-tuple; its .stats is the CrawlStats (None
+    unless stats were enabled).
     """
-    start_url = normalize_url(start_url)
-    parsed_start = urlparse(start_url)
-    base_domain = get_base_domain(parsed_start.netloc.lower())
-
-    if verbose:
-        print(f"Crawling base domain: {base_domain}")
-        if target_lang:
-            print(f"Restricting to language: {target_lang}")
-
-    visited: set[str] = set()
-    pages: list[dict] = []      # {"id", "url", "text"}
-    edges_url: list[tuple] = [] # (source_url, target_url)
-    queue = deque([start_url])
+    frontier = Frontier(memory_budget=frontier_memory_mb << 20, lossy_bloom_capacity=lossy_bloom_capacity, order=order)
+    politeness = HostPoliteness(crawl_delay, burst=host_burst, host_delays=host_delays)
+    parse_pool = ParsePool(parse_workers, parser=parser, target_lang=target_lang)
+    checkpoint = CrawlCheckpoint(checkpoint_dir, every=checkpoint_every) if checkpoint_dir else None
+    cache = HTTPCache(http_cache) if http_cache else None
+    output = CrawlOutput(output_dir) if output_dir else None
+    crawl_stats = CrawlStats(stats_jsonl) if stats or stats_jsonl else None
 
-    url_to_id: dict[str, int] = {}
-    next_id = 0
-
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-    })
-
-    def print_progress():
-        if not verbose:
-            return
-        visited_count = len(visited)
-        indexed_count = len(pages)
-        # Overwrite the same line
-        print(
-            f"\rProgress: visited={visited_count}/{max_pages} | "
-            f"indexed(lang-ok)={indexed_count}",
-            end="",
-            flush=True,
+    try:
+        if engine == "asyncio":
+            from crawler.async_core import crawl_graph_asyncio
+
+            with parse_pool:
+                return crawl_graph_asyncio(
+                    start_url,
+                    max_pages=max_pages,
+                    target_lang=target_lang,
+                    workers=workers,
+                    verbose=verbose,
+                    max_connections=max_connections,
+                    max_per_host=max_per_host,
+                    politeness=politeness,
+                    parse_pool=parse_pool,
+                    frontier=frontier,
+                    checkpoint=checkpoint,
+                    resume=resume,
+                    cache=cache,
+                    near_dup_distance=near_dup_distance,
+                    output=output,
+                    keep_pages=keep_pages,
+                    stats=crawl_stats,
+                    progress=progress,
+                )
+        if engine != "threads":
+            parse_pool.close()
+            frontier.close()
+            raise ValueError(f"Unknown crawl engine {engine!r} (expected 'threads' or 'asyncio')")
+
+        state = CrawlState(
+            start_url, max_pages, target_lang, verbose,
+            frontier=frontier, checkpoint=checkpoint, resume=resume,
+            near_dup_distance=near_dup_distance,
+            output=output, keep_pages=keep_pages, stats=crawl_stats,
+            progress=progress,
         )
+        return _crawl_threads(state, workers, politeness, parse_pool, cache)
+    finally:
+        if cache is not None:
+            if verbose:
+                print(cache.report())
+            cache.close()
+
+
+def _crawl_threads(
+    state: CrawlState,
+    workers: int,
+    politeness: HostPoliteness,
+    parse_pool: ParsePool,
+    cache: HTTPCache | None,
+    exchange=None,
+):
+    """
+    Threaded engine: requests in a ThreadPoolExecutor, bookkeeping on this thread.
 
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        while queue and len(visited) < max_pages:
-            # Build a batch of URLs to fetch in parallel
-            batch: list[str] = []
-            while queue and len(batch) < workers and (len(visited) + len(batch)) < max_pages:
-                url = normalize_url(queue.popleft())
-                if url in visited:
+    `exchange` (crawler.distributed) connects a partition to its peers:
+    poll() takes in URLs they sent while this one is busy, wait() blocks
+    for more once the local frontier is exhausted (False = crawl over).
+    """
+    session = make_session(workers)
+
+    # Continuously fed pipeline: a new fetch starts as soon as a worker is
+    # free, there is no batch barrier. URLs whose host is not due yet wait
+    # in a delay queue (heap by start time) while other hosts proceed.
+    # Fetched HTML goes to the parse pool; this thread only does bookkeeping.
+    in_flight = {}                              # fetch future -> url
+    parsing = {}                                # parse future -> url
+    delayed: list[tuple[float, int, str]] = []  # (ready_at, seq, url)
+    seq = itertools.count()
+    max_pending = workers * 4                   # cap on in_flight + delayed + parsing
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, parse_pool:
+        while True:
+            now = time.monotonic()
+
+            # 1) start delayed fetches whose host slot has come up
+            while delayed and delayed[0][0] <= now and len(in_flight) < workers:
+                _, _, url = heapq.heappop(delayed)
+                in_flight[executor.submit(fetch_url, session, url, cache=cache)] = url
+
+            # 2) feed free workers from the frontier
+            while (
+                len(in_flight) < workers
+                and len(in_flight) + len(delayed) + len(parsing) < max_pending
+            ):
+                url = state.next_url()
+                if url is None:
+                    break
+                wait_s = politeness.reserve(url, now)
+                if wait_s > 0.0:
+                    heapq.heappush(delayed, (now + wait_s, next(seq), url))
+                else:
+                    in_flight[executor.submit(fetch_url, session, url, cache=cache)] = url
+
+            if not in_flight and not delayed and not parsing:
+                if exchange is not None and exchange.wait(state):
                     continue
-                visited.add(url)
-                batch.append(url)
-
-            if not batch:
                 break
 
-            future_to_url = {
-                executor.submit(fetch_url, session, url): url for url in batch
-            }
-
-            for future in as_completed(future_to_url):
-                url, resp = future.result()
-
-                if resp is None:
-                    continue
-
-                content_type = resp.headers.get("Content-Type", "")
-                if resp.status_code != 200 or "text/html" not in content_type:
-                    continue
-
-                # Optional: skip giant pages (> 2 MB)
-                if len(resp.content) > 2_000_000:
-                    continue
-
-                html = resp.text
-                soup = BeautifulSoup(html, "html.parser")
-
-                #  language filter 
-                page_lang = detect_page_language(soup)
-
-                if target_lang:
-                    target_lang_norm = target_lang.lower()
-                    page_lang_norm = page_lang.lower() if page_lang else None
-
-                    if page_lang_norm and not page_lang_norm.startswith(target_lang_norm):
-                        # visited but not indexed or expanded
-                        continue
-
-                #  assign ID 
-                if url not in url_to_id:
-                    url_to_id[url] = next_id
-                    next_id += 1
-                page_id = url_to_id[url]
-
-                #  store page text 
-                page_text = extract_text_from_soup(soup)
-                pages.append({"id": page_id, "url": url, "text": page_text})
-
-                #  parse links 
-                for a in soup.find_all("a", href=True):
-                    href = a["href"]
-                    target = urljoin(url, href)
-                    target = normalize_url(target)
-
-                    if not is_same_domain(target, base_domain):
-                        continue
-                    if target.startswith("mailto:") or target.startswith("javascript:"):
-                        continue
-
-                    if target not in url_to_id:
-                        url_to_id[target] = next_id
-                        next_id += 1
-
-                    edges_url.append((url, target))
-
-                    if target not in visited:
-                        queue.append(target)
-
-            # print batch-level progress
-            print_progress()
-            # small politeness delay
-            time.sleep(0.1)
-
-    if verbose:
-        print()  # move to next line after \r output
-
-    return pages, edges_url, url_to_id, visited
+            # 3) block until a fetch or parse finishes, or the next delayed slot is due
+            timeout = max(0.0, delayed[0][0] - time.monotonic()) if delayed else None
+            if not in_flight and not parsing:
+                time.sleep(timeout)
+                continue
+
+            done, _ = wait([*in_flight, *parsing], timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in in_flight:
+                    in_flight.pop(future)
+                    url, fetched = future.result()
+                    if state.stats is not None:
+                        state.stats.record_fetch(url, fetched)
+                    if fetched.cached is not None:
+                        # unchanged since the last crawl: reuse its parse if we have one
+                        parsed = cache.reuse_parse(fetched.cached, state.target_lang)
+                        if parsed is not None:
+                            if state.stats is not None:
+                                state.stats.count("parse_reused")
+                            state.add_parsed(url, parsed)
+                            state.mark_done(url)
+                            continue
+                    if fetched.html is not None:
+                        parsing[parse_pool.submit(url, fetched.html)] = url
+                    else:
+                        state.mark_done(url)
+
+            # parse results (inline parses are already complete)
+            for future in [f for f in parsing if f.done()]:
+                _record_parsed(state, parsing.pop(future), future, cache)
+
+            if done:
+                state.print_progress()
+            if exchange is not None:
+                exchange.poll(state)
+
+    return state.result()
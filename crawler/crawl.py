@@ -1,10 +1,18 @@
 # crawl.py
 import csv
-import json
 import argparse
+import sys
 from pathlib import Path
 
-from core import crawl_graph
+# Make project root importable so crawler.* modules resolve the same way
+# whether this runs as a script or is imported from api/
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from crawler.core import crawl_graph  # noqa: E402
+from crawler.distributed import crawl_distributed  # noqa: E402
+from crawler.output import write_pages_json  # noqa: E402
 
 
 def main():
@@ -34,58 +42,201 @@ def main():
         "--workers",
         type=int,
         default=5,
-        help="Number of concurrent workers (threads) for crawling.",
+        help="Number of concurrent workers (threads, or asyncio tasks) for crawling.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Crawl engine: requests + threads, or aiohttp + asyncio (default: threads).",
+    )
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=100,
+        help="asyncio engine: max open connections per host (default: 100).",
+    )
+    parser.add_argument(
+        "--crawl-delay",
+        type=float,
+        default=0.02,
+        help="Per-host politeness: seconds between requests to one host (default: 0.02, 0 = off).",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Processes for HTML parsing (default: 0 = parse in the crawler process).",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=["auto", "lxml", "html.parser"],
+        default="html.parser",
+        help="BeautifulSoup backend (default: html.parser; auto = lxml if installed). "
+             "lxml is faster but may extract different text from malformed HTML.",
+    )
+
+    parser.add_argument(
+        "--frontier-memory-mb",
+        type=int,
+        default=64,
+        help="Memory for queued URLs before the frontier spills to disk (default: 64).",
+    )
+    parser.add_argument(
+        "--lossy-bloom-capacity",
+        type=int,
+        default=0,
+        help="LOSSY: replace the exact seen-check with a Bloom filter sized for N URLs; "
+        "~1%% of new URLs are never crawled (default: 0 = exact).",
+    )
+
+    parser.add_argument(
+        "--order",
+        choices=["bfs", "opic", "inlinks"],
+        default="bfs",
+        help="Crawl order: BFS, or most important URL first by OPIC cash / in-link count (default: bfs).",
+    )
+
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        default=None,
+        help="Write periodic crawl checkpoints to this directory (default: off).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the checkpoint in --checkpoint-dir instead of the start URL.",
+    )
+
+    parser.add_argument(
+        "--http-cache",
+        type=str,
+        default=None,
+        help="SQLite response cache for recrawls: conditional requests, 304s reuse stored pages (default: off).",
+    )
+
+    parser.add_argument(
+        "--near-dup-distance",
+        type=int,
+        default=4,
+        help="Collapse pages within N SimHash bits of an earlier page (default: 4, -1 = off).",
+    )
+
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=1,
+        help="Crawl with N processes, each owning a hash partition of URL space (default: 1).",
+    )
+    parser.add_argument(
+        "--partition-by",
+        choices=["host", "url"],
+        default="host",
+        help="Partition by host, or by URL fingerprint to spread a single host (default: host).",
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Time crawl stages and report throughput, skip reasons and slow hosts at the end.",
+    )
+    parser.add_argument(
+        "--stats-jsonl",
+        type=str,
+        default=None,
+        help="Append a stats snapshot line to this file every few seconds (implies --stats).",
     )
 
     args = parser.parse_args()
+    if args.partitions > 1 and (args.resume or args.checkpoint_dir or args.http_cache or args.engine != "threads"):
+        parser.error("--partitions runs the threads engine without checkpoints or HTTP cache")
+    if args.partitions > 1 and args.stats_jsonl:
+        parser.error("--stats-jsonl is single-process only (--stats reports per partition)")
+    if args.resume and not args.checkpoint_dir:
+        parser.error("--resume needs --checkpoint-dir")
 
     repo_root = Path(__file__).resolve().parent
     data_dir = repo_root / "data"
     data_dir.mkdir(parents=True, exist_ok=True)
     output_path = data_dir / args.output
 
-    # ---- call core logic with concurrency + language filter ----
-    pages, edges_url, url_to_id, visited = crawl_graph(
-        args.start_url,
-        max_pages=args.max_pages,
-        target_lang=args.lang,
-        workers=args.workers,
-    )
+    near_dup_distance = args.near_dup_distance if args.near_dup_distance >= 0 else None
+
+    if args.partitions > 1:
+        # ---- N partition processes, merged into global ids ----
+        edges, url_to_id, stats = crawl_distributed(
+            args.start_url,
+            max_pages=args.max_pages,
+            partitions=args.partitions,
+            by=args.partition_by,
+            output_dir=data_dir,
+            target_lang=args.lang,
+            workers=args.workers,
+            crawl_delay=args.crawl_delay,
+            parser=args.parser,
+            order=args.order,
+            near_dup_distance=near_dup_distance,
+            stats=args.stats,
+        )
+        num_visited = stats["visited"]
+    else:
+        # ---- call core logic with concurrency + language filter ----
+        _, edges, url_to_id, visited = crawl_graph(
+            args.start_url,
+            max_pages=args.max_pages,
+            target_lang=args.lang,
+            workers=args.workers,
+            engine=args.engine,
+            max_per_host=args.max_per_host,
+            crawl_delay=args.crawl_delay,
+            parse_workers=args.parse_workers,
+            parser=args.parser,
+            frontier_memory_mb=args.frontier_memory_mb,
+            lossy_bloom_capacity=args.lossy_bloom_capacity,
+            order=args.order,
+            checkpoint_dir=args.checkpoint_dir,
+            resume=args.resume,
+            http_cache=args.http_cache,
+            near_dup_distance=near_dup_distance,
+            # pages.jsonl / urls.txt / edges.bin are written while crawling
+            output_dir=data_dir,
+            keep_pages=False,
+            stats=args.stats,
+            stats_jsonl=args.stats_jsonl,
+        )
+        num_visited = len(visited)
 
     # Paths
     edges_csv_path = output_path  # keep your current CSV
     edges_txt_path = output_path.with_suffix(".txt")  # new CUDA-ready file
 
     # ---- write edges.csv (source URL string + target_id) ----
-    with edges_csv_path.open("w", newline="", encoding="utf8") as f_csv, \
-        edges_txt_path.open("w", encoding="utf8") as f_txt:
-        
+    # edges are already (src_id, target_id); a page's out-links are
+    # contiguous, so each source URL is decoded once
+    with edges_csv_path.open("w", newline="", encoding="utf8") as f_csv:
         writer = csv.writer(f_csv)
         writer.writerow(["source", "target_id"])
 
-        for src_url, tgt_url in edges_url:
-            src_id = url_to_id[src_url]
-            tgt_id = url_to_id[tgt_url]
-
-            # CSV version (for debugging)
+        last_src, src_url = -1, ""
+        for src_id, tgt_id in edges:
+            if src_id != last_src:
+                last_src, src_url = src_id, url_to_id.url_of(src_id)
             writer.writerow([src_url, tgt_id])
 
-            # TXT version (for CUDA)
-            # Format: "src_id target_id"
-            f_txt.write(f"{src_id} {tgt_id}\n")
-
+    # ---- write edges.txt (CUDA format: "src_id target_id") ----
+    edges.write_txt(edges_txt_path)
 
-    # ---- write pages.json next to CSV ----
+    # ---- pages.json next to CSV, converted from the streamed pages.jsonl ----
     pages_path = data_dir / "pages.json"
-    with pages_path.open("w", encoding="utf8") as jf:
-        json.dump(pages, jf, ensure_ascii=False, indent=2)
+    num_pages = write_pages_json(data_dir / "pages.jsonl", pages_path)
 
     print("\nDone.")
-    print(f"Pages visited: {len(visited)}")
+    print(f"Pages visited: {num_visited}")
     print(f"Unique pages: {len(url_to_id)}")
-    print(f"Edges collected: {len(edges_url)}")
+    print(f"Edges collected: {len(edges)}")
     print(f"Saved edges to {output_path}")
-    print(f"Saved pages to {pages_path}")
+    print(f"Saved {num_pages} pages to {pages_path} (streamed: {data_dir / 'pages.jsonl'})")
 
 
 if __name__ == "__main__":
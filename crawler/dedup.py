@@ -0,0 +1,103 @@
+# dedup.py
+"""
+Near-duplicate page detection for the crawler (SimHash + LSH).
+
+Mirrors, print views, language-switcher and query-string variants of a
+page carry (almost) the same text under different URLs. Each indexed page
+gets a 64-bit SimHash of its word 3-gram shingles; pages within
+`max_distance` bits of an earlier page are collapsed onto it.
+
+LSH: the 64 bits are cut into max_distance + 1 bands. Two hashes that
+differ in at most max_distance bits agree on at least one band exactly
+(pigeonhole), so only pages sharing a band value are compared.
+"""
+import re
+from functools import lru_cache
+from hashlib import blake2b
+
+import numpy as np
+
+MIN_WORDS = 20  # shorter texts are too small for a stable SimHash
+SHINGLE = 3
+
+_WORD = re.compile(r"\w+")
+_BITS = np.arange(64, dtype=np.uint64)
+
+
+@lru_cache(maxsize=1 << 16)
+def _word_hash(word: str) -> int:
+    return int.from_bytes(blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, vectorized (uint64 arithmetic wraps)."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def simhash(text: str | None, shingle: int = SHINGLE) -> int | None:
+    """64-bit SimHash of text's word shingles; None for texts under MIN_WORDS words."""
+    if not text:
+        return None
+    words = _WORD.findall(text.lower())
+    if len(words) < max(MIN_WORDS, shingle):
+        return None
+
+    h = np.fromiter((_word_hash(w) for w in words), dtype=np.uint64, count=len(words))
+    # shingle hash = mix of the word hashes at positions i .. i+shingle-1
+    n = len(h) - shingle + 1
+    s = h[:n].copy()
+    for k in range(1, shingle):
+        s = _mix(s ^ (h[k:k + n] + np.uint64(k)))
+
+    # per-bit majority vote over all shingles
+    ones = ((s[:, None] >> _BITS) & np.uint64(1)).sum(axis=0)
+    bits = (2 * ones > n).astype(np.uint64)
+    return int((bits << _BITS).sum())
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """
+    SimHash LSH table: page ids bucketed by each band of their hash.
+    check_and_add(h, page_id) returns the id of an earlier page within
+    max_distance bits, or registers page_id as a new canonical page.
+    """
+
+    def __init__(self, max_distance: int = 4):
+        self.max_distance = max_distance
+        n_bands = max_distance + 1
+        edges = [round(64 * i / n_bands) for i in range(n_bands + 1)]
+        self._bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._bands]
+        self._hashes: dict[int, int] = {}     # canonical page id -> simhash
+        self.collapsed = 0
+
+    def find(self, h: int) -> int | None:
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for page_id in table.get((h >> shift) & mask, ()):
+                if hamming(h, self._hashes[page_id]) <= self.max_distance:
+                    return page_id
+        return None
+
+    def add(self, h: int, page_id: int):
+        self._hashes[page_id] = h
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((h >> shift) & mask, []).append(page_id)
+
+    def check_and_add(self, h: int, page_id: int) -> int | None:
+        canonical = self.find(h)
+        if canonical is None:
+            self.add(h, page_id)
+        else:
+            self.collapsed += 1
+        return canonical
+
+    def __len__(self) -> int:
+        return len(self._hashes)
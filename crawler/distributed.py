@@ -0,0 +1,330 @@
+# distributed.py
+"""
+Partitioned multi-process crawl.
+
+URL space is split into N partitions by hash (of the host, or of the whole
+URL). Each partition is crawled by its own process with its own
+CrawlState, frontier and threaded engine, so N GILs parse and N connection
+pools fetch. A page's links to URLs of other partitions are still recorded
+as local edges; the URLs themselves are batched and sent to their owner.
+
+Batches go through the coordinator (the calling process), which forwards
+them and detects termination: the crawl is over once every partition has
+reported idle after receiving every batch forwarded to it. (Batches and
+idle reports share one queue per sender, so a partition's batches are
+always forwarded before its idle report is seen.)
+
+Each partition streams its output to <output_dir>/part-<i>/ (see
+crawler.output). merge_partitions() then assigns global ids and writes
+one pages.jsonl / urls.txt plus a merged EdgeBuffer.
+
+Per-partition limits: max_pages is split evenly across partitions, and
+near-duplicates are only detected within a partition.
+"""
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from crawler.frontier import FingerprintSet, Frontier, fingerprint
+from crawler.output import CrawlOutput, read_edges
+from crawler.urltable import EdgeBuffer, URLTable
+
+PARTITION_BY = ("host", "url")
+
+
+def partition_of(url: str, n: int, by: str = "host", fp: int | None = None) -> int:
+    """Partition owning url: hash of its host (keeps per-host politeness in one process) or of the URL."""
+    if by == "host":
+        return fingerprint(urlparse(url).netloc.lower()) % n
+    return (fingerprint(url) if fp is None else fp) % n
+
+
+#Worker side
+
+class LinkExchange:
+    """
+    One partition's end of the exchange: router for CrawlState (owns /
+    send) and hook for the threaded engine (poll / wait).
+    """
+
+    def __init__(self, index: int, n: int, by: str, inbox, coordinator, batch_size: int = 256, interval: float = 0.2):
+        self.index = index
+        self.n = n
+        self.by = by
+        self.inbox = inbox
+        self.coordinator = coordinator
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self._host_part: dict[str, int] = {}
+        self._sent = FingerprintSet()           # never send the same URL twice
+        self._out: list[list[str]] = [[] for _ in range(n)]
+        self._last_flush = time.monotonic()
+        self.received = 0                       # batches taken from the inbox
+        self.urls_sent = 0
+
+    #  router
+
+    def owns(self, url: str, fp: int) -> bool:
+        if self.by == "host":
+            host = urlparse(url).netloc.lower()
+            part = self._host_part.get(host)
+            if part is None:
+                part = self._host_part[host] = partition_of(url, self.n, "host")
+            return part == self.index
+        return fp % self.n == self.index
+
+    def send(self, url: str, fp: int):
+        if not self._sent.add(fp):
+            return
+        dest = partition_of(url, self.n, self.by, fp)
+        batch = self._out[dest]
+        batch.append(url)
+        if len(batch) >= self.batch_size:
+            self._flush_one(dest)
+
+    def _flush_one(self, dest: int):
+        batch = self._out[dest]
+        if batch:
+            self.coordinator.put(("urls", dest, batch))
+            self.urls_sent += len(batch)
+            self._out[dest] = []
+
+    def flush(self):
+        for dest in range(self.n):
+            self._flush_one(dest)
+        self._last_flush = time.monotonic()
+
+    #  engine hooks
+
+    def _take(self, state, msg) -> bool:
+        if msg[0] == "stop":
+            return False
+        self.received += 1
+        for url in msg[1]:
+            state._push(url)
+        return True
+
+    def poll(self, state):
+        """Busy: flush old batches, take in whatever peers sent meanwhile."""
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+        while True:
+            try:
+                msg = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+            self._take(state, msg)
+
+    def wait(self, state) -> bool:
+        """Local frontier is exhausted: report idle and block for URLs or stop."""
+        self.flush()
+        self.coordinator.put(("idle", self.index, self.received))
+        return self._take(state, self.inbox.get())
+
+
+def _partition_main(index, n, by, start_url, max_pages, options, part_dir, inbox, coordinator):
+    # imported here: the worker is started with the spawn method
+    from crawler.core import CrawlState, _crawl_threads
+    from crawler.parsing import ParsePool
+    from crawler.politeness import HostPoliteness
+    from crawler.stats import CrawlStats
+
+    try:
+        exchange = LinkExchange(index, n, by, inbox, coordinator)
+        frontier = Frontier(order=options.get("order", "bfs"))
+        state = CrawlState(
+            start_url, max_pages, options.get("target_lang"), verbose=False,
+            frontier=frontier,
+            near_dup_distance=options.get("near_dup_distance"),
+            output=CrawlOutput(part_dir), keep_pages=False,
+            router=exchange,
+            stats=CrawlStats() if options.get("stats") else None,
+        )
+        politeness = HostPoliteness(options.get("crawl_delay", 0.02), burst=options.get("host_burst", 5))
+        parse_pool = ParsePool(0, parser=options.get("parser", "html.parser"), target_lang=options.get("target_lang"))
+        _, edges, url_to_id, visited = _crawl_threads(
+            state, options.get("workers", 5), politeness, parse_pool, None, exchange=exchange,
+        )
+        coordinator.put(("done", index, {
+            "visited": len(visited),
+            "indexed": state.indexed,
+            "urls": len(url_to_id),
+            "edges": len(edges),
+            "urls_sent": exchange.urls_sent,
+            **({"stats": state.stats.snapshot()} if state.stats is not None else {}),
+        }))
+    except BaseException as e:  # report instead of leaving the coordinator waiting
+        coordinator.put(("error", index, repr(e)))
+        raise
+
+
+#Coordinator
+
+def crawl_distributed(
+    start_url: str,
+    max_pages: int = 100,
+    partitions: int = 4,
+    by: str = "host",
+    output_dir: str = "partitions",
+    target_lang: str | None = None,
+    workers: int = 5,
+    verbose: bool = True,
+    **options,
+):
+    """
+    Crawl with `partitions` local processes, then merge.
+
+    Args:
+      partitions: number of worker processes / hash partitions
+      by: "host" (all URLs of a host in one process; use with many hosts)
+        or "url" (URL fingerprint; spreads a single host over all processes)
+      output_dir: part-<i>/ directories and the merged pages.jsonl / urls.txt
+      workers: fetch threads per partition
+      options: crawl_delay, host_burst, parser, order, near_dup_distance,
+        stats (as for crawl_graph; each partition's snapshot goes into its
+        entry of stats["partitions"])
+
+    Returns:
+      edges: merged EdgeBuffer over global ids
+      url_to_id: global URLTable
+      stats: per-partition counters plus merged totals
+    """
+    if by not in PARTITION_BY:
+        raise ValueError(f"Unknown partitioning {by!r} (expected 'host' or 'url')")
+
+    ctx = mp.get_context("spawn")
+    coordinator = ctx.Queue()
+    inboxes = [ctx.Queue() for _ in range(partitions)]
+    budgets = [max_pages // partitions + (i < max_pages % partitions) for i in range(partitions)]
+    part_dirs = [os.path.join(output_dir, f"part-{i}") for i in range(partitions)]
+    options = {**options, "target_lang": target_lang, "workers": workers}
+
+    procs = [
+        ctx.Process(
+            target=_partition_main,
+            args=(i, partitions, by, start_url, budgets[i], options, part_dirs[i], inboxes[i], coordinator),
+            daemon=True,
+        )
+        for i in range(partitions)
+    ]
+    t0 = time.perf_counter()
+    for p in procs:
+        p.start()
+
+    forwarded = [0] * partitions       # batches sent to each partition
+    idle: set[int] = set()             # partitions idle with nothing pending
+    results: dict[int, dict] = {}
+    batches = urls_exchanged = 0
+    try:
+        while len(results) < partitions:
+            try:
+                msg = coordinator.get(timeout=1.0)
+            except queue.Empty:
+                dead = [i for i, p in enumerate(procs) if not p.is_alive() and i not in results]
+                if dead:
+                    raise RuntimeError(f"crawl partition(s) {dead} exited unexpectedly")
+                continue
+
+            kind, i = msg[0], msg[1]
+            if kind == "urls":
+                inboxes[i].put(("urls", msg[2]))
+                forwarded[i] += 1
+                idle.discard(i)
+                batches += 1
+                urls_exchanged += len(msg[2])
+            elif kind == "idle":
+                if msg[2] == forwarded[i]:
+                    idle.add(i)
+                if len(idle) == partitions:
+                    for inbox in inboxes:
+                        inbox.put(("stop",))
+                    idle.clear()
+            elif kind == "done":
+                results[i] = msg[2]
+            elif kind == "error":
+                raise RuntimeError(f"crawl partition {i} failed: {msg[2]}")
+
+            if verbose and kind == "urls" and batches % 50 == 0:
+                print(f"\r[distributed] {batches} batches / {urls_exchanged} URLs exchanged", end="", flush=True)
+    finally:
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+    crawl_seconds = time.perf_counter() - t0
+    edges, url_to_id, merged = merge_partitions(output_dir, part_dirs)
+    stats = {
+        "partitions": [results[i] for i in range(partitions)],
+        "visited": sum(r["visited"] for r in results.values()),
+        "batches": batches,
+        "urls_exchanged": urls_exchanged,
+        "crawl_seconds": crawl_seconds,
+        **merged,
+    }
+    if verbose:
+        print()
+        for i in range(partitions):
+            r = results[i]
+            print(
+                f"[distributed] part {i}: visited={r['visited']} indexed={r['indexed']} "
+                f"edges={r['edges']} sent={r['urls_sent']} URLs"
+                + (f" | {r['stats']['pages_per_s']:.1f} pages/s" if "stats" in r else "")
+            )
+        print(
+            f"[distributed] {stats['visited']} visited in {crawl_seconds:.1f}s, "
+            f"{urls_exchanged} URLs in {batches} batches | merged: {stats['pages']} pages, "
+            f"{stats['urls']} URLs, {stats['edges']} edges"
+        )
+    return edges, url_to_id, stats
+
+
+#Merge
+
+def merge_partitions(output_dir: str, part_dirs: list[str]):
+    """
+    Global ids over all partitions' URL tables (first partition first), then
+    edges remapped through each partition's near-duplicate aliases and its
+    local -> global id table. Writes output_dir/pages.jsonl and urls.txt.
+    """
+    url_to_id = URLTable()
+    local_to_global = []
+    for part_dir in part_dirs:
+        with open(os.path.join(part_dir, "urls.txt"), encoding="utf-8") as f:
+            local_to_global.append(
+                np.array([url_to_id.intern(line.rstrip("\n")) for line in f], dtype=np.int32)
+            )
+
+    src_parts, dst_parts = [], []
+    for part_dir, to_global in zip(part_dirs, local_to_global):
+        src, dst = read_edges(os.path.join(part_dir, "edges.bin"))
+        remap = np.arange(len(to_global), dtype=np.int32)
+        dup, canon = read_edges(os.path.join(part_dir, "aliases.bin"))
+        remap[dup] = canon
+        new_src, new_dst = remap[src], remap[dst]
+        keep = (new_src != new_dst) | (src == dst)
+        src_parts.append(to_global[new_src[keep]])
+        dst_parts.append(to_global[new_dst[keep]])
+    edges = EdgeBuffer.from_arrays(
+        np.concatenate(src_parts) if src_parts else [], np.concatenate(dst_parts) if dst_parts else [],
+    )
+
+    pages = 0
+    with open(os.path.join(output_dir, "pages.jsonl"), "w", encoding="utf-8") as out:
+        for part_dir, to_global in zip(part_dirs, local_to_global):
+            with open(os.path.join(part_dir, "pages.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    page = json.loads(line)
+                    page["id"] = int(to_global[page["id"]])
+                    out.write(json.dumps(page, ensure_ascii=False) + "\n")
+                    pages += 1
+    with open(os.path.join(output_dir, "urls.txt"), "w", encoding="utf-8") as f:
+        f.writelines(u + "\n" for u in url_to_id.urls())
+
+    return edges, url_to_id, {"pages": pages, "urls": len(url_to_id), "edges": len(edges)}
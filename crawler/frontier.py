@@ -0,0 +1,466 @@
+# frontier.py
+"""
+Compact crawl frontier: what has been seen, what has been visited, what is
+queued, without keeping a Python str per URL in a set.
+
+  - URLs are hashed to 64-bit fingerprints (blake2b); visited / seen checks
+    work on fingerprints in an open-addressing table (8 bytes per slot)
+  - optional lossy mode: a Bloom filter replaces the exact "seen" table
+    (~1.2 bytes per URL at 1% false positives); every false positive is a
+    new URL that is never enqueued
+  - FIFO queue that never holds a URL twice and spills to disk past a
+    memory budget
+  - or, for budgeted crawls, a priority queue ordered by an online
+    importance estimate (OPIC cash or in-link count) from the partial graph
+
+Fingerprint collisions are possible in principle (~n^2 / 2^65); at 10^8
+URLs that is about one expected collision, i.e. one skipped page.
+"""
+import heapq
+import itertools
+import math
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from collections import deque
+from hashlib import blake2b
+
+import numpy as np
+
+
+def fingerprint(url: str) -> int:
+    """64-bit fingerprint of a (normalized) URL; never 0 (0 marks empty slots)."""
+    fp = int.from_bytes(blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+    return fp or 1
+
+
+#Exact fingerprint set
+
+def place_fingerprints(keys: np.ndarray, size: int) -> np.ndarray:
+    """
+    Vectorized linear-probing insert of distinct uint64 keys into an empty
+    table of `size` (power of two) slots; returns each key's slot. Each
+    round every pending key tries its current slot, one key per free slot
+    wins and the rest probe onwards.
+    """
+    mask = np.uint64(size - 1)
+    taken = np.zeros(size, dtype=bool)
+    slots = keys & mask
+    result = np.empty(len(keys), dtype=np.int64)
+    pending = np.arange(len(keys))
+    while len(pending):
+        free = ~taken[slots]
+        _, first = np.unique(slots, return_index=True)
+        win = np.zeros(len(pending), dtype=bool)
+        win[first] = True
+        win &= free
+        taken[slots[win]] = True
+        result[pending[win]] = slots[win]
+        pending, slots = pending[~win], (slots[~win] + np.uint64(1)) & mask
+    return result
+
+
+class FingerprintSet:
+    """
+    Open-addressing hash set of 64-bit fingerprints in a flat array('Q')
+    with linear probing, grown x2 at 50% load (vectorized rehash, see
+    place_fingerprints).
+    Fingerprints are already uniformly distributed, so their low bits are
+    the slot. array('Q') is used over a NumPy array for the table because
+    single-element access from Python is several times cheaper.
+
+    Accepts URLs or fingerprints: `url in s`, `s.add(url)`.
+    """
+
+    MAX_LOAD = 0.5
+
+    def __init__(self, capacity: int = 1024):
+        size = 1 << max(4, math.ceil(math.log2(max(1, capacity) / self.MAX_LOAD)))
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    @staticmethod
+    def _fp(key) -> int:
+        return fingerprint(key) if isinstance(key, str) else (int(key) or 1)
+
+    def _slot(self, fp: int) -> tuple[int, bool]:
+        """(slot index, found) for fp."""
+        table = self._table
+        mask = self._mask
+        i = fp & mask
+        while True:
+            v = table[i]
+            if v == fp:
+                return i, True
+            if v == 0:
+                return i, False
+            i = (i + 1) & mask
+
+    def add(self, key) -> bool:
+        """Insert; True if it was not present before."""
+        fp = self._fp(key)
+        i, found = self._slot(fp)
+        if found:
+            return False
+        self._table[i] = fp
+        self._count += 1
+        if self._count > self.MAX_LOAD * len(self._table):
+            self._grow()
+        return True
+
+    def __contains__(self, key) -> bool:
+        return self._slot(self._fp(key))[1]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self):
+        old = np.frombuffer(self._table, dtype=np.uint64)
+        keys = old[old != 0]
+        size = len(self._table) * 2
+        table = np.zeros(size, dtype=np.uint64)
+        table[place_fingerprints(keys, size)] = keys
+        self._table = array("Q", table.tobytes())
+        self._mask = size - 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._table) * self._table.itemsize
+
+
+#Bloom filter
+
+class BloomFilter:
+    """
+    Bloom filter over 64-bit fingerprints, sized for `capacity` items at
+    `error_rate` false positives. The k bit positions come from double
+    hashing of the fingerprint's two 32-bit halves.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.n_bits = bits
+        self.k = max(1, round(bits / capacity * math.log(2)))
+        self._bits = bytearray((bits + 7) // 8)
+        self._count = 0
+
+    def add(self, key) -> bool:
+        """Insert; True if it was (definitely) not present before."""
+        fp = fingerprint(key) if isinstance(key, str) else int(key)
+        bits, n_bits = self._bits, self.n_bits
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        new = False
+        for j in range(self.k):
+            p = (h1 + j * h2) % n_bits
+            byte, bit = p >> 3, 1 << (p & 7)
+            if not bits[byte] & bit:
+                bits[byte] |= bit
+                new = True
+        self._count += new
+        return new
+
+    def __contains__(self, key) -> bool:
+        fp = fingerprint(key) if isinstance(key, str) else int(key)
+        bits, n_bits = self._bits, self.n_bits
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        for j in range(self.k):
+            p = (h1 + j * h2) % n_bits
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+#Disk-spilling FIFO queue
+
+class SpillQueue:
+    """
+    FIFO of URL strings with a memory budget. The in-memory head holds up
+    to `memory_budget` bytes of URLs; once it is full, new URLs collect in a
+    tail buffer that is written out in segments of `segment_size` lines.
+    When the head runs dry the oldest segment is read back, so FIFO order is
+    kept across memory and disk.
+    """
+
+    def __init__(self, memory_budget: int = 64 << 20, segment_size: int = 50_000, spill_dir: str | None = None):
+        self.memory_budget = memory_budget
+        self.segment_size = segment_size
+        self._spill_parent = spill_dir
+
+        self._head: deque[str] = deque()
+        self._head_bytes = 0
+        self._tail: list[str] = []
+        self._segments: deque[str] = deque()    # paths, oldest first
+        self._dir: str | None = None
+        self._seg_counter = 0
+        self._len = 0
+
+        self.spilled = 0                        # URLs ever written to disk
+
+    @staticmethod
+    def _size(url: str) -> int:
+        return sys.getsizeof(url) + 8           # str object + deque slot
+
+    def __len__(self) -> int:
+        return self._len
+
+    def push(self, url: str):
+        self._len += 1
+        if not self._tail and not self._segments and self._head_bytes < self.memory_budget:
+            self._head.append(url)
+            self._head_bytes += self._size(url)
+            return
+        self._tail.append(url)
+        if len(self._tail) >= self.segment_size:
+            self._flush_tail()
+
+    def pop(self) -> str | None:
+        if not self._head:
+            self._refill()
+            if not self._head:
+                return None
+        url = self._head.popleft()
+        self._head_bytes -= self._size(url)
+        self._len -= 1
+        return url
+
+    def _flush_tail(self):
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="frontier-", dir=self._spill_parent)
+        path = os.path.join(self._dir, f"seg{self._seg_counter:06d}.txt")
+        self._seg_counter += 1
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self._tail))
+            f.write("\n")
+        self.spilled += len(self._tail)
+        self._segments.append(path)
+        self._tail = []
+
+    def _refill(self):
+        if self._segments:
+            path = self._segments.popleft()
+            with open(path, encoding="utf-8") as f:
+                urls = f.read().splitlines()
+            os.remove(path)
+        else:
+            urls, self._tail = self._tail, []
+        self._head.extend(urls)
+        self._head_bytes += sum(self._size(u) for u in urls)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held in memory (head + tail buffer)."""
+        return self._head_bytes + sum(self._size(u) for u in self._tail)
+
+    def close(self):
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self._segments.clear()
+
+
+#Priority queue (budgeted crawls)
+
+class ScoreQueue:
+    """
+    Max-priority queue of URLs whose scores only grow (add()). Scores live
+    in a dict fp -> [score, url]; the heap holds (-score, seq, fp) entries
+    and an increase just pushes a new entry, stale ones are skipped on pop.
+    Ties pop in insertion order, so with equal scores this is BFS.
+
+    Everything is in memory (no spilling): budgeted crawls are the ones
+    where the queue stays small enough to prioritize.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, int]] = []
+        self._queued: dict[int, list] = {}
+        self._seq = itertools.count()
+        self.spilled = 0
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def push(self, url: str, fp: int | None = None, score: float = 0.0):
+        fp = fingerprint(url) if fp is None else fp
+        self._queued[fp] = [score, url]
+        heapq.heappush(self._heap, (-score, next(self._seq), fp))
+
+    def add(self, fp: int, amount: float):
+        """Raise a queued URL's score; no-op for URLs not in the queue."""
+        entry = self._queued.get(fp)
+        if entry is None:
+            return
+        entry[0] += amount
+        heapq.heappush(self._heap, (-entry[0], next(self._seq), fp))
+        if len(self._heap) > 4 * len(self._queued) + 1024:
+            self._compact()
+
+    def pop(self) -> tuple[str, float] | None:
+        """(url, score) of the highest-scored URL, or None if empty."""
+        heap, queued = self._heap, self._queued
+        while heap:
+            neg, _, fp = heapq.heappop(heap)
+            entry = queued.get(fp)
+            if entry is not None and entry[0] == -neg:
+                del queued[fp]
+                return entry[1], entry[0]
+        return None
+
+    def _compact(self):
+        self._heap = [(-score, next(self._seq), fp) for fp, (score, _) in self._queued.items()]
+        heapq.heapify(self._heap)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate: heap tuples + dict entries + URL strings."""
+        return (
+            len(self._heap) * 100
+            + len(self._queued) * 150
+            + sum(sys.getsizeof(url) for _, url in self._queued.values())
+        )
+
+    def close(self):
+        self._heap.clear()
+        self._queued.clear()
+
+
+#Frontier
+
+ORDERS = ("bfs", "opic", "inlinks")
+
+class Frontier:
+    """
+    Deduplicating crawl frontier.
+
+      push(url)  enqueue url unless it was ever pushed before
+      pop()      next URL in FIFO order, recorded as visited
+
+    order="opic" / "inlinks" pops the highest-priority URL instead (see
+    credit()): OPIC gives every fetched page's cash to its out-links in
+    equal shares, "inlinks" counts links from fetched pages.
+
+    `visited` is a FingerprintSet (supports len() and `url in visited`).
+    With lossy_bloom_capacity > 0 the seen-check is a Bloom filter instead
+    of a second exact table. This is lossy, not a speedup: much smaller,
+    but ~bloom_error of new URLs are wrongly treated as seen and never
+    crawled. Leave it at 0 unless the exact table does not fit in memory.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = 64 << 20,
+        lossy_bloom_capacity: int = 0,
+        bloom_error: float = 0.01,
+        spill_dir: str | None = None,
+        order: str = "bfs",
+    ):
+        if order not in ORDERS:
+            raise ValueError(f"Unknown crawl order {order!r} (expected one of {', '.join(ORDERS)})")
+        self.order = order
+        self.visited = FingerprintSet()
+        self.seen = BloomFilter(lossy_bloom_capacity, bloom_error) if lossy_bloom_capacity > 0 else FingerprintSet()
+        if order == "bfs":
+            self.queue = SpillQueue(memory_budget, spill_dir=spill_dir)
+        else:
+            self.queue = ScoreQueue()
+            self._cash: dict[int, float] = {}   # OPIC: cash of fetched, not yet expanded URLs
+
+    @property
+    def prioritized(self) -> bool:
+        return self.order != "bfs"
+
+    def push(self, url: str, fp: int | None = None, score: float = 0.0) -> bool:
+        """Enqueue url unless seen before; pass fp if already computed."""
+        if fp is None:
+            fp = fingerprint(url)
+        if not self.seen.add(fp):
+            return False
+        if self.order == "bfs":
+            self.queue.push(url)
+        else:
+            self.queue.push(url, fp, score)
+        return True
+
+    def pop(self) -> str | None:
+        if self.order == "bfs":
+            url = self.queue.pop()
+        else:
+            item = self.queue.pop()
+            url = None
+            if item is not None:
+                url, score = item
+                if self.order == "opic":
+                    self._cash[fingerprint(url)] = score
+        if url is not None:
+            self.visited.add(url)
+        return url
+
+    def credit(self, source_fp: int, target_fps: list[int]):
+        """
+        A fetched page links to target_fps (already pushed): raise their
+        priority. No-op in BFS order. Targets that were fetched already
+        just drop their share.
+        """
+        if self.order == "bfs" or not target_fps:
+            return
+        if self.order == "opic":
+            share = self._cash.pop(source_fp, 0.0) / len(target_fps)
+        else:
+            share = 1.0
+        if share > 0.0:
+            for fp in target_fps:
+                self.queue.add(fp, share)
+
+    def discard(self, source_fp: int):
+        """source was fetched but not expanded (rejected, failed): its cash is spent."""
+        if self.order == "opic":
+            self._cash.pop(source_fp, None)
+
+    def restore(self, pushed, done):
+        """
+        Rebuild from a checkpoint: `pushed` = every URL ever enqueued (in
+        order), `done` = fingerprints of finished URLs. Pushed URLs that
+        are not done go back on the queue in their original order.
+        """
+        for fp in done:
+            self.visited.add(fp)
+        for url in pushed:
+            fp = fingerprint(url)
+            self.seen.add(fp)
+            if fp not in self.visited:
+                # priorities are not checkpointed; they rebuild from new links
+                if self.order == "bfs":
+                    self.queue.push(url)
+                else:
+                    self.queue.push(url, fp)
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def memory_report(self) -> dict:
+        seen = len(self.seen)
+        total = self.visited.nbytes + self.seen.nbytes + self.queue.nbytes
+        return {
+            "seen_urls": seen,
+            "visited_urls": len(self.visited),
+            "queued_urls": len(self.queue),
+            "spilled_urls": self.queue.spilled,
+            "visited_bytes": self.visited.nbytes,
+            "seen_bytes": self.seen.nbytes,
+            "queue_bytes": self.queue.nbytes,
+            "total_bytes": total,
+            "bytes_per_url": total / seen if seen else 0.0,
+        }
+
+    def close(self):
+        self.queue.close()
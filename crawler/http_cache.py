@@ -0,0 +1,202 @@
+# http_cache.py
+"""
+Persistent HTTP response cache for recrawls (one SQLite file).
+
+Per normalized URL it keeps the last HTML body (zlib), its ETag /
+Last-Modified validators, and the language / text / links extracted from
+it. A recrawl sends If-None-Match / If-Modified-Since; on 304 the cached
+body is used, and if the page was parsed before, the parse is reused too.
+
+Only responses with a validator are cached; without one the server
+cannot answer 304, so storing the body would not save anything.
+"""
+import codecs
+import json
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+
+from crawler.parsing import ParsedPage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    content_type  TEXT NOT NULL,
+    body          BLOB NOT NULL,   -- zlib
+    body_len      INTEGER NOT NULL,
+    parsed        BLOB             -- zlib(JSON {lang, text, links}) or NULL
+)
+"""
+
+
+def charset_of(content_type: str, default: str = "utf-8") -> str:
+    """
+    Codec name from a Content-Type's charset parameter (default if missing,
+    unknown or not a text encoding: codecs.lookup also knows zlib, base64, ...).
+    """
+    for part in content_type.split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            try:
+                info = codecs.lookup(value.strip('"'))
+            except LookupError:
+                break
+            if info._is_text_encoding:
+                return info.name
+            break
+    return default
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    content_type: str
+    body: bytes
+    parsed: dict | None
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(charset_of(self.content_type), errors="replace")
+
+
+class HTTPCache:
+    """
+    Thread-safe (one connection behind a lock; the crawl's SQLite work is
+    tiny next to the network). Counters in `stats` cover the current crawl.
+    """
+
+    COMMIT_EVERY = 200
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {
+            "requests": 0,           # fetches that went through the cache
+            "conditional": 0,        # of those, sent with validators
+            "hits": 0,               # answered 304 -> cached body
+            "parse_reused": 0,       # hits that also skipped parsing
+            "stored": 0,             # new / changed bodies written
+            "bytes_saved": 0,        # body bytes not downloaded thanks to 304s
+            "bytes_downloaded": 0,   # body bytes of 200 HTML responses
+        }
+
+    def _write(self, sql: str, args: tuple):
+        with self._lock:
+            self._db.execute(sql, args)
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                self._db.commit()
+                self._pending = 0
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    #  request side
+
+    def conditional_headers(self, url: str) -> dict:
+        with self._lock:
+            self.stats["requests"] += 1
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        if headers:
+            self._count("conditional")
+        return headers
+
+    def not_modified(self, url: str) -> CacheEntry | None:
+        """Server answered 304: return the cached entry (None if it vanished)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_type, body, body_len, parsed FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        content_type, body, body_len, parsed = row
+        self._count("hits")
+        self._count("bytes_saved", body_len)
+        return CacheEntry(
+            url,
+            content_type,
+            zlib.decompress(body),
+            json.loads(zlib.decompress(parsed)) if parsed is not None else None,
+        )
+
+    def store(self, url: str, headers, content_type: str, body: bytes):
+        """Record a 200 HTML response; drops the entry if it has no validators."""
+        self._count("bytes_downloaded", len(body))
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._write("DELETE FROM responses WHERE url = ?", (url,))
+            return
+        self._count("stored")
+        self._write(
+            "INSERT OR REPLACE INTO responses "
+            "(url, etag, last_modified, content_type, body, body_len, parsed) "
+            "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+            (url, etag, last_modified, content_type, zlib.compress(body, 1), len(body)),
+        )
+
+    #  parse reuse
+
+    def store_parsed(self, url: str, parsed: ParsedPage):
+        """Remember a page's parse next to its body (no-op for uncached URLs)."""
+        blob = json.dumps({"lang": parsed.lang, "text": parsed.text, "links": parsed.links})
+        self._write(
+            "UPDATE responses SET parsed = ? WHERE url = ?",
+            (zlib.compress(blob.encode("utf-8"), 1), url),
+        )
+
+    def reuse_parse(self, entry: CacheEntry, target_lang: str | None) -> ParsedPage | None:
+        """
+        The stored parse of an unchanged page, under the current language
+        filter; None if the page has to be parsed again (e.g. it was rejected
+        by a different filter last time, so no text was extracted).
+        """
+        p = entry.parsed
+        if p is None:
+            return None
+        lang = p["lang"]
+        if target_lang and lang and not lang.startswith(target_lang.lower()):
+            result = ParsedPage(lang, None, [])
+        elif p["text"] is None:
+            return None
+        else:
+            result = ParsedPage(lang, p["text"], p["links"])
+        self._count("parse_reused")
+        return result
+
+    #  reporting
+
+    def report(self) -> str:
+        s = self.stats
+        rate = s["hits"] / s["requests"] if s["requests"] else 0.0
+        reval = s["hits"] / s["conditional"] if s["conditional"] else 0.0
+        return (
+            f"[cache] {s['hits']}/{s['requests']} requests answered 304 ({rate:.0%}; "
+            f"{reval:.0%} of revalidations), "
+            f"{s['parse_reused']} parses reused, "
+            f"saved {s['bytes_saved'] / 2**20:.1f} MiB, "
+            f"downloaded {s['bytes_downloaded'] / 2**20:.1f} MiB"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
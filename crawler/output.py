@@ -0,0 +1,180 @@
+# output.py
+"""
+Streaming crawl output: pages and edges are written while the crawl runs,
+so the crawler does not have to hold every page text until the end and
+later stages (index building, PageRank) can tail the files.
+
+Layout of an output directory:
+
+  pages.jsonl    indexed pages {id, url, text}, one per line
+  urls.txt       URL table, line i = URL of id i
+  edges.bin      int32 (src_id, dst_id) pairs
+  aliases.bin    int32 (near-duplicate id, canonical id) pairs
+  done.json      written last: final counts; its presence means the crawl finished
+
+Writes go out in batches of whole lines / whole pairs, so a reader only
+ever has to skip an incomplete tail (see tail_pages / read_edges).
+Edges are as discovered: an edge may point at a page that later turns out
+to be a near-duplicate; map dst through aliases.bin to get the final graph.
+"""
+import json
+import os
+import time
+from array import array
+
+import numpy as np
+
+OUTPUT_FILES = ("pages.jsonl", "urls.txt", "edges.bin", "aliases.bin")
+
+
+class CrawlOutput:
+    """
+    Incremental writer for one CrawlState. CrawlState hands over pages with
+    write_page() and calls flush(state) when due(); URLs, edges and aliases
+    are picked up from the state at flush time.
+    """
+
+    def __init__(self, directory, every: int = 100, interval: float = 1.0):
+        self.directory = os.fspath(directory)
+        self.every = every            # flush after this many new pages
+        self.interval = interval      # ... or after this many seconds
+
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            os.remove(self._path("done.json"))
+        except FileNotFoundError:
+            pass
+        self._files = {name: open(self._path(name), "wb") for name in OUTPUT_FILES}
+
+        self._pages: list[str] = []
+        self.pages_written = 0
+        self._urls_written = 0
+        self._edges_written = 0
+        self._aliases_written = 0
+        self._last_flush = time.monotonic()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def write_page(self, page: dict):
+        self._pages.append(json.dumps(page, ensure_ascii=False) + "\n")
+
+    def due(self) -> bool:
+        return (
+            len(self._pages) >= self.every
+            or (self._pages and time.monotonic() - self._last_flush >= self.interval)
+        )
+
+    def flush(self, state):
+        """Append everything new in state since the last flush."""
+        files = self._files
+
+        # URLs before edges, so every id a reader sees in edges.bin resolves
+        urls = state.url_to_id
+        if len(urls) > self._urls_written:
+            files["urls.txt"].write(
+                "".join(u + "\n" for u in urls.urls(self._urls_written)).encode("utf-8")
+            )
+            self._urls_written = len(urls)
+
+        if self._pages:
+            files["pages.jsonl"].write("".join(self._pages).encode("utf-8"))
+            self.pages_written += len(self._pages)
+            self._pages = []
+
+        edges = state.edges
+        if len(edges) > self._edges_written:
+            start = self._edges_written
+            pairs = array("i", bytes(8 * (len(edges) - start)))
+            pairs[0::2] = edges.src[start:]
+            pairs[1::2] = edges.dst[start:]
+            files["edges.bin"].write(pairs.tobytes())
+            self._edges_written = len(edges)
+
+        if len(state.aliases) > self._aliases_written:
+            new = list(state.aliases.items())[self._aliases_written:]
+            files["aliases.bin"].write(array("i", [i for pair in new for i in pair]).tobytes())
+            self._aliases_written = len(state.aliases)
+
+        for f in files.values():
+            f.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self, state):
+        """Final flush, then done.json."""
+        if not self._files:
+            return
+        self.flush(state)
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        with open(self._path("done.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "pages": self.pages_written,
+                    "urls": self._urls_written,
+                    "edges": self._edges_written,
+                    "aliases": self._aliases_written,
+                },
+                f,
+            )
+
+
+#Readers
+
+def tail_pages(path, follow: bool = False, poll: float = 0.5):
+    """
+    Yield pages from a pages.jsonl as they appear. With follow=True keep
+    waiting for new lines until done.json shows up next to the file.
+    Only whole lines are yielded; an unterminated last line (still being
+    written) is dropped unless done.json says the crawl finished.
+    """
+    done_path = os.path.join(os.path.dirname(os.fspath(path)), "done.json")
+    with open(path, "rb") as f:
+        partial = b""
+        while True:
+            chunk = f.readline()
+            if chunk:
+                partial += chunk
+                if partial.endswith(b"\n"):
+                    yield json.loads(partial)
+                    partial = b""
+                continue
+            if not follow or os.path.exists(done_path):
+                # done.json is written after the last flush: one more read catches up
+                finished = os.path.exists(done_path)
+                lines = (partial + f.read()).split(b"\n")
+                tail = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+                if finished and tail.strip():
+                    yield json.loads(tail)
+                return
+            time.sleep(poll)
+
+
+def read_edges(path) -> tuple[np.ndarray, np.ndarray]:
+    """(src, dst) int32 arrays from an edges.bin / aliases.bin (a torn last pair is ignored)."""
+    data = np.fromfile(path, dtype=np.int32)
+    data = data[: len(data) // 2 * 2]
+    return data[0::2], data[1::2]
+
+
+def write_pages_json(jsonl_path, json_path) -> int:
+    """
+    Convert pages.jsonl into the pages.json list that api/main.py and
+    backend/data/parse_pagerank.py read, one line at a time.
+    """
+    n = 0
+    with open(jsonl_path, encoding="utf-8") as src, open(json_path, "w", encoding="utf-8") as dst:
+        dst.write("[")
+        for line in src:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            dst.write(",\n" if n else "\n")
+            dst.write(line)
+            n += 1
+        dst.write("\n]\n")
+    return n
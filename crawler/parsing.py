@@ -0,0 +1,304 @@
+# parsing.py
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from html.parser import HTMLParser
+from time import perf_counter
+from typing import NamedTuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from crawler.dedup import simhash
+
+
+#Language detection
+
+def normalize_lang(lang: str | None) -> str | None:
+    """'en-US', 'DE-de', 'en, fr' -> 'en', 'de', 'en'."""
+    if not lang:
+        return None
+    lang = lang.strip().lower()
+    lang = lang.split(",")[0]  # in case of "en, fr"
+    lang = lang.split("-")[0]
+    return lang or None
+
+
+def detect_page_language(soup: BeautifulSoup) -> str | None:
+    """
+    Try to detect page language from <html lang="..."> or meta tags.
+    Returns a short language code like 'en', 'de', or None if unknown.
+    """
+    lang = None
+
+    # <html lang="en-US">, <html lang="de">
+    if soup.html and soup.html.has_attr("lang"):
+        lang = soup.html["lang"]
+
+    # <meta http-equiv="content-language" content="en">
+    if not lang:
+        meta = soup.find("meta", attrs={"http-equiv": re.compile("content-language", re.I)})
+        if meta and meta.get("content"):
+            lang = meta["content"]
+
+    # <meta name="language" content="en">
+    if not lang:
+        meta = soup.find("meta", attrs={"name": re.compile("language", re.I)})
+        if meta and meta.get("content"):
+            lang = meta["content"]
+
+    return normalize_lang(lang)
+
+
+#Text extraction (reuse soup)
+
+NON_CONTENT_TAGS = [
+    "script", "style", "noscript", "svg", "img",
+    "picture", "video", "audio", "canvas",
+    "form", "button",
+]
+
+BOILERPLATE_SELECTORS = [
+    "header",
+    "footer",
+    "nav",
+    "aside",
+    ".navbar",
+    ".nav",
+    ".navigation",
+    ".site-header",
+    ".site-footer",
+    ".footer",
+    "#header",
+    "#footer",
+    "#nav",
+    "#navbar",
+    ".cookie",
+    ".cookie-banner",
+    "#cookie-banner",
+    ".banner",
+]
+
+def extract_text_from_soup(soup: BeautifulSoup) -> str:
+    """
+    Extract main visible text from HTML, trying to skip header/nav/footer.
+    Uses an existing BeautifulSoup object (no double parsing).
+    """
+    # 1) Remove obviously non-content tags
+    for tag in soup(NON_CONTENT_TAGS):
+        tag.decompose()
+
+    # 2) Remove typical boilerplate containers
+    for selector in BOILERPLATE_SELECTORS:
+        for el in soup.select(selector):
+            el.decompose()
+
+    # 3) Find main-like content region
+    main = soup.find("main")
+    if not main:
+        for cand in [
+            "article",
+            "#main",
+            ".main",
+            ".main-content",
+            "#content",
+            ".content",
+            ".page-content",
+            ".layout__content",
+        ]:
+            main = soup.select_one(cand)
+            if main:
+                break
+
+    root = main or soup.body or soup
+    text = root.get_text(" ", strip=True)
+
+    # Normalize whitespace
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+#Link-only fast path (no DOM)
+
+_SKIP_TAGS = set(NON_CONTENT_TAGS)
+_SKIP_TAGS.update(sel for sel in BOILERPLATE_SELECTORS if sel[0] not in ".#")
+_SKIP_CLASSES = {sel[1:] for sel in BOILERPLATE_SELECTORS if sel[0] == "."}
+_SKIP_IDS = {sel[1:] for sel in BOILERPLATE_SELECTORS if sel[0] == "#"}
+_CONTENT_LANGUAGE = re.compile("content-language", re.I)
+_LANGUAGE = re.compile("language", re.I)
+
+
+class LinkScanner(HTMLParser):
+    """
+    Single pass over the tokenizer events, no tree: collects <html lang>,
+    the language meta tags and <a href> values.
+
+    Links inside the elements extract_text_from_soup() strips (nav, header,
+    footer, script, form, ...) are skipped, so the result matches collecting
+    hrefs from the cleaned soup.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html_lang: str | None = None
+        self.meta_http_equiv: str | None = None
+        self.meta_name: str | None = None
+        self.links: list[str] = []
+        # subtree being skipped: its tag and how many of that tag are open
+        self._skip_tag: str | None = None
+        self._skip_depth = 0
+
+    def _is_skipped(self, tag: str, attrs: dict) -> bool:
+        if tag in _SKIP_TAGS:
+            return True
+        if attrs.get("id") in _SKIP_IDS:
+            return True
+        classes = attrs.get("class")
+        return bool(classes) and not _SKIP_CLASSES.isdisjoint(classes.split())
+
+    def _start(self, tag: str, attrs: list, opens: bool):
+        attrs = dict(attrs)
+
+        if tag == "html":
+            if self.html_lang is None and "lang" in attrs:
+                self.html_lang = attrs["lang"] or ""
+        elif tag == "meta" and attrs.get("content"):
+            if self.meta_http_equiv is None and _CONTENT_LANGUAGE.search(attrs.get("http-equiv") or ""):
+                self.meta_http_equiv = attrs["content"]
+            if self.meta_name is None and _LANGUAGE.search(attrs.get("name") or ""):
+                self.meta_name = attrs["content"]
+
+        if self._skip_tag is not None:
+            if opens and tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag == "a" and "href" in attrs:
+            self.links.append(attrs["href"] or "")
+        # img is a void element, nothing to skip below it
+        if opens and tag != "img" and self._is_skipped(tag, attrs):
+            self._skip_tag, self._skip_depth = tag, 1
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, opens=True)
+
+    def handle_startendtag(self, tag, attrs):
+        # <nav/>: self-closing, opens no subtree
+        self._start(tag, attrs, opens=False)
+
+    def handle_endtag(self, tag):
+        if tag == self._skip_tag:
+            self._skip_depth -= 1
+            if self._skip_depth == 0:
+                self._skip_tag = None
+
+    @property
+    def lang(self) -> str | None:
+        """Same precedence as detect_page_language()."""
+        return normalize_lang(self.html_lang or self.meta_http_equiv or self.meta_name)
+
+
+def scan_page(html: str) -> tuple[str | None, list[str]]:
+    """Return (language, raw hrefs) of an HTML page without building a DOM."""
+    scanner = LinkScanner()
+    try:
+        scanner.feed(html)
+        scanner.close()
+    except Exception:
+        # keep whatever was collected before the tokenizer gave up
+        pass
+    return scanner.lang, scanner.links
+
+
+#Parse stage: language + text + links of one page
+
+class ParsedPage(NamedTuple):
+    lang: str | None
+    text: str | None     # None: rejected by the language filter
+    links: list[str]     # absolute hrefs, not yet normalized or filtered
+    simhash: int | None = None   # near-duplicate fingerprint of text (crawler.dedup)
+    timings: tuple[float, float] | None = None   # seconds: (scan, text extraction)
+
+
+def available_parser(parser: str = "html.parser") -> str:
+    """
+    Resolve a BeautifulSoup parser backend. html.parser is the default;
+    "auto" opts in to lxml (C, several times faster, but its tree can differ
+    on malformed HTML) when installed and falls back to html.parser.
+    """
+    if parser != "auto":
+        return parser
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+def parse_page(
+    url: str,
+    html: str,
+    target_lang: str | None = None,
+    parser: str = "html.parser",
+) -> ParsedPage:
+    """
+    CPU-heavy part of handling a page, kept free of crawl state so it can run
+    in a worker process: detect language, collect links, extract text.
+
+    Language and links come from the streaming LinkScanner; the
+    BeautifulSoup DOM is only built for pages whose text gets indexed.
+    """
+    t0 = perf_counter()
+
+    #  language filter + links (single pass, no tree) 
+    page_lang, hrefs = scan_page(html)
+
+    if target_lang:
+        if page_lang and not page_lang.startswith(target_lang.lower()):
+            # visited but not indexed or expanded
+            return ParsedPage(page_lang, None, [], timings=(perf_counter() - t0, 0.0))
+
+    links = [urljoin(url, href) for href in hrefs]
+    t1 = perf_counter()
+
+    #  page text 
+    page_text = extract_text_from_soup(BeautifulSoup(html, parser))
+    fingerprint = simhash(page_text)
+
+    return ParsedPage(page_lang, page_text, links, fingerprint, (t1 - t0, perf_counter() - t1))
+
+
+class ParsePool:
+    """
+    Runs parse_page either inline (workers=0) or in a process pool, so
+    BeautifulSoup work scales with cores instead of running under the
+    crawler's GIL. submit() always returns a Future; inline results are
+    already completed.
+    """
+
+    def __init__(self, workers: int = 0, parser: str = "html.parser", target_lang: str | None = None):
+        self.workers = workers
+        self.parser = available_parser(parser)
+        self.target_lang = target_lang
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+    def submit(self, url: str, html: str) -> Future:
+        if self.executor is not None:
+            return self.executor.submit(parse_page, url, html, self.target_lang, self.parser)
+
+        future: Future = Future()
+        try:
+            future.set_result(parse_page(url, html, self.target_lang, self.parser))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,55 @@
+# politeness.py
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class HostPoliteness:
+    """
+    Per-host token buckets (GCRA-style reservations).
+
+    Each host refills one token every `crawl_delay` seconds, up to `burst`
+    tokens. reserve(url) takes a token and returns how long the caller must
+    wait before starting the request. A negative balance reserves a future
+    slot, so concurrent callers for one host are spaced out instead of all
+    firing when the bucket refills.
+
+    Hosts in `host_delays` use their own delay (e.g. from robots.txt
+    Crawl-delay) instead of the default. A delay of 0 disables throttling.
+    Thread-safe; also fine to use from a single asyncio loop.
+    """
+
+    def __init__(
+        self,
+        crawl_delay: float = 0.0,
+        burst: int = 1,
+        host_delays: dict[str, float] | None = None,
+    ):
+        self.crawl_delay = max(0.0, crawl_delay)
+        self.burst = max(1, burst)
+        self.host_delays = {h.lower(): d for h, d in (host_delays or {}).items()}
+
+        # host -> (tokens, last refill time)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def delay_for(self, host: str) -> float:
+        return self.host_delays.get(host, self.crawl_delay)
+
+    def reserve(self, url: str, now: float | None = None) -> float:
+        """Take one request slot for url's host; return seconds to wait (>= 0)."""
+        host = urlparse(url).netloc.lower()
+        delay = self.delay_for(host)
+        if delay <= 0.0:
+            return 0.0
+
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            tokens, last = self._buckets.get(host, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) / delay)
+            tokens -= 1.0
+            self._buckets[host] = (tokens, now)
+
+        return 0.0 if tokens >= 0.0 else -tokens * delay
@@ -0,0 +1,168 @@
+# stats.py
+"""
+Crawl instrumentation: where the time goes, how fast pages and bytes come
+in, why pages were skipped, and which hosts are slow.
+
+Stages (seconds summed over all pages; fetch stages overlap across
+workers, so they add up to more than the wall time):
+
+  dns, connect  name resolution / new TCP+TLS connections (asyncio engine
+                only; the threaded engine cannot see inside requests)
+  ttfb          request start -> response headers (includes dns, connect)
+  transfer      reading and decoding the body
+  scan          language + link scan (parse workers)
+  extract       BeautifulSoup text extraction + SimHash (parse workers)
+  links         CrawlState bookkeeping: ids, near-duplicates, link expansion
+
+Everything is recorded on the crawl's bookkeeping thread / event loop, so
+there is no locking. With stats disabled CrawlState.stats is None and
+none of this runs.
+"""
+import json
+import time
+from array import array
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+STAGES = ("dns", "connect", "ttfb", "transfer", "scan", "extract", "links")
+
+
+class CrawlStats:
+    """
+    Counters and timers for one crawl. With `stream`, a snapshot() line is
+    appended to that JSONL file every `interval` seconds and at the end.
+    """
+
+    def __init__(self, stream=None, interval: float = 5.0):
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.stage_count = dict.fromkeys(STAGES, 0)
+        self.counts: Counter = Counter()
+        self.bytes = 0
+        self._host_seconds: dict[str, array] = {}
+
+        self.interval = interval
+        self._stream = open(stream, "w", encoding="utf-8") if stream else None
+        self._last_emit = self.started
+
+    #  recording
+
+    def add(self, stage: str, seconds: float):
+        self.stage_seconds[stage] += seconds
+        self.stage_count[stage] += 1
+
+    def count(self, key: str, n: int = 1):
+        self.counts[key] += n
+
+    def record_fetch(self, url: str, fetched):
+        """A FetchResult from fetch_url / fetch_url_async."""
+        self.counts["fetched"] += 1
+        if fetched.cached is not None:
+            self.counts["not_modified"] += 1
+        if fetched.skip is not None:
+            self.counts["skip:" + fetched.skip] += 1
+        self.bytes += fetched.nbytes
+        self.add("ttfb", fetched.ttfb)
+        if fetched.transfer:
+            self.add("transfer", fetched.transfer)
+
+        host = urlsplit(url).netloc
+        samples = self._host_seconds.get(host)
+        if samples is None:
+            samples = self._host_seconds[host] = array("f")
+        samples.append(fetched.ttfb + fetched.transfer)
+
+    def record_parse(self, parsed):
+        """A ParsedPage from parse_page (parses reused from the HTTP cache carry no timings)."""
+        if parsed.timings is None:
+            return
+        scan, extract = parsed.timings
+        self.add("scan", scan)
+        if extract:
+            self.add("extract", extract)
+
+    #  reporting
+
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def host_latency(self, top: int = 10) -> dict[str, dict]:
+        """Per-host fetch latency (ttfb + transfer) percentiles, slowest p90 first."""
+        rows = {}
+        for host, samples in self._host_seconds.items():
+            a = np.frombuffer(samples, dtype=np.float32)
+            p50, p90, p99 = np.percentile(a, (50, 90, 99))
+            rows[host] = {"n": len(a), "p50": float(p50), "p90": float(p90), "p99": float(p99)}
+        slowest = sorted(rows, key=lambda h: rows[h]["p90"], reverse=True)[:top]
+        return {h: rows[h] for h in slowest}
+
+    def snapshot(self) -> dict:
+        elapsed = self.elapsed()
+        fetched = self.counts["fetched"]
+        return {
+            "elapsed": round(elapsed, 3),
+            "fetched": fetched,
+            "indexed": self.counts["indexed"],
+            "pages_per_s": round(fetched / elapsed, 2) if elapsed else 0.0,
+            "bytes": self.bytes,
+            "bytes_per_s": round(self.bytes / elapsed, 1) if elapsed else 0.0,
+            "counts": dict(self.counts),
+            "stages": {
+                name: {
+                    "seconds": round(self.stage_seconds[name], 4),
+                    "count": self.stage_count[name],
+                    "mean_ms": round(1000 * self.stage_seconds[name] / self.stage_count[name], 3),
+                }
+                for name in STAGES
+                if self.stage_count[name]
+            },
+            "hosts": self.host_latency(),
+        }
+
+    def maybe_emit(self):
+        if self._stream is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_emit >= self.interval:
+            self._emit()
+            self._last_emit = now
+
+    def _emit(self):
+        self._stream.write(json.dumps(self.snapshot()) + "\n")
+        self._stream.flush()
+
+    def close(self):
+        """Crawl finished: freeze the clock, write the final snapshot."""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        if self._stream is not None:
+            self._emit()
+            self._stream.close()
+            self._stream = None
+
+    def report(self) -> str:
+        s = self.snapshot()
+        skips = ", ".join(
+            f"{k[5:]}={v}" for k, v in sorted(s["counts"].items()) if k.startswith("skip:")
+        ) or "none"
+        other = ", ".join(
+            f"{k}={v}" for k, v in sorted(s["counts"].items())
+            if not k.startswith("skip:") and k not in ("fetched", "indexed")
+        )
+        lines = [
+            f"[stats] {s['fetched']} fetched, {s['indexed']} indexed in {s['elapsed']:.1f}s | "
+            f"{s['pages_per_s']:.1f} pages/s, {s['bytes_per_s'] / 1024:.0f} KiB/s",
+            f"[stats] skipped: {skips}" + (f" | {other}" if other else ""),
+            "[stats] stages: " + ", ".join(
+                f"{name} {v['seconds']:.2f}s ({v['mean_ms']:.2f} ms avg)" for name, v in s["stages"].items()
+            ),
+        ]
+        for host, h in list(s["hosts"].items())[:5]:
+            lines.append(
+                f"[stats] {host}: n={h['n']} p50={1000 * h['p50']:.0f}ms "
+                f"p90={1000 * h['p90']:.0f}ms p99={1000 * h['p99']:.0f}ms"
+            )
+        return "\n".join(lines)
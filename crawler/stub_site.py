@@ -0,0 +1,264 @@
+# stub_site.py
+"""
+Local stub HTTP server serving a synthetic, deterministic website.
+Used to benchmark and exercise the crawl engines without touching the network.
+
+  - pages /p/0 .. /p/{n-1}; "/" serves page 0
+  - each page links to `links_per_page` other pages; targets are skewed
+    towards low page numbers so the link graph has hubs, like a real site
+  - optional per-response latency (fixed, plus a slow fraction of pages)
+  - a few pages are in a second language, a few links point off-site or
+    to non-HTML resources
+  - optional ETag / If-None-Match support (304s) for recrawl tests;
+    touch() changes a fraction of pages between crawls
+  - optional print views (/p/N/print): the same text under another URL and
+    template, for near-duplicate detection
+
+Usage:
+  python stub_site.py --pages 1000 --port 8900 --latency 0.02
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "graph node edge rank page link crawl index search query vector matrix "
+    "random walk damping factor teleport web site host domain anchor text "
+    "token score cosine sparse dense kernel thread process memory cache"
+).split()
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # clients dropping keep-alive connections is normal during crawls
+        pass
+
+
+class StubSite:
+    """
+    Synthetic site served from a background thread.
+
+        with StubSite(pages=500, latency=0.01) as site:
+            crawl_graph(site.url, ...)
+    """
+
+    def __init__(
+        self,
+        pages: int = 500,
+        links_per_page: int = 10,
+        latency: float = 0.0,
+        slow_fraction: float = 0.0,
+        slow_latency: float = 0.5,
+        other_lang_fraction: float = 0.05,
+        words_per_page: int = 200,
+        port: int = 0,
+        seed: int = 0,
+        etags: bool = False,
+        print_views: bool = False,
+    ):
+        self.n_pages = pages
+        self.links_per_page = links_per_page
+        self.latency = latency
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self.other_lang_fraction = other_lang_fraction
+        self.words_per_page = words_per_page
+        self.port = port
+        self.seed = seed
+        self.etags = etags
+        self.print_views = print_views
+        self.revision: dict[int, int] = {}   # page -> edit count (see touch)
+
+        self._server: _QuietServer | None = None
+        self._thread: threading.Thread | None = None
+        self.requests_served = 0
+        self.bytes_served = 0
+        self.not_modified_served = 0
+
+    #  site content (deterministic per page)
+
+    def _rng(self, page: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + page)
+
+    def links_of(self, page: int) -> list[int]:
+        rng = self._rng(page)
+        # u^2 skews targets towards low page ids (hubs)
+        return [int(rng.random() ** 2 * self.n_pages) for _ in range(self.links_per_page)]
+
+    def lang_of(self, page: int) -> str:
+        return "de" if self._rng(page).random() < self.other_lang_fraction else "en"
+
+    def delay_of(self, page: int) -> float:
+        rng = self._rng(page)
+        rng.random()  # decorrelate from lang_of
+        if rng.random() < self.slow_fraction:
+            return self.slow_latency
+        return self.latency
+
+    def touch(self, fraction: float, seed: int = 1):
+        """Edit a random fraction of pages (new text and ETag) to simulate site changes."""
+        rng = random.Random(seed)
+        for page in range(self.n_pages):
+            if rng.random() < fraction:
+                self.revision[page] = self.revision.get(page, 0) + 1
+
+    def etag_of(self, page: int) -> str:
+        return f'"p{page}-r{self.revision.get(page, 0)}"'
+
+    def _body_text(self, page: int) -> str:
+        rng = self._rng(page)
+        body = " ".join(rng.choice(WORDS) for _ in range(self.words_per_page))
+        if self.revision.get(page):
+            body += f" revision {self.revision[page]}"
+        return body
+
+    def render(self, page: int) -> bytes:
+        links = "\n".join(
+            f'<li><a href="/p/{t}">page {t}</a></li>' for t in self.links_of(page)
+        )
+        if self.print_views:
+            links += f'\n<li><a href="/p/{page}/print">print</a></li>'
+        body = self._body_text(page)
+        html = (
+            f'<!DOCTYPE html><html lang="{self.lang_of(page)}"><head>'
+            f"<title>Page {page}</title></head><body>"
+            f'<nav><a href="/">home</a> <a href="/p/{(page + 1) % self.n_pages}">next</a></nav>'
+            f"<main><h1>Page {page}</h1><p>{body}</p><ul>{links}</ul>"
+            f'<a href="/files/report{page}.pdf">pdf</a> '
+            f'<a href="https://elsewhere.example.com/x{page}">external</a>'
+            f"</main><footer>stub site</footer></body></html>"
+        )
+        return html.encode("utf-8")
+
+    def render_print(self, page: int) -> bytes:
+        """Printer-friendly copy of a page: same content, no site chrome."""
+        links = "\n".join(
+            f'<li><a href="/p/{t}">page {t}</a></li>' for t in self.links_of(page)
+        )
+        html = (
+            f'<!DOCTYPE html><html lang="{self.lang_of(page)}"><head>'
+            f"<title>Page {page}</title></head><body>"
+            f"<h1>Page {page}</h1><p>{self._body_text(page)}</p><ul>{links}</ul>"
+            f"</body></html>"
+        )
+        return html.encode("utf-8")
+
+    #  server
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, content_type: str, body: bytes, etag: str | None = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+                    site.bytes_served += len(body)
+
+            def do_GET(self):
+                site.requests_served += 1
+                path = self.path.split("?", 1)[0].split("#", 1)[0]
+                render = site.render
+                if site.print_views and path.endswith("/print"):
+                    path, render = path[:-len("/print")], site.render_print
+                if path in ("", "/"):
+                    page = 0
+                elif path.startswith("/p/") and path[3:].isdigit():
+                    page = int(path[3:])
+                elif path.startswith("/files/"):
+                    self._send(200, "application/pdf", b"%PDF-1.4 stub")
+                    return
+                else:
+                    self._send(404, "text/plain", b"not found")
+                    return
+
+                if page >= site.n_pages:
+                    self._send(404, "text/plain", b"not found")
+                    return
+
+                delay = site.delay_of(page)
+                if delay > 0:
+                    time.sleep(delay)
+
+                etag = site.etag_of(page) if site.etags else None
+                if etag and self.headers.get("If-None-Match") == etag:
+                    site.not_modified_served += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self._send(200, "text/html; charset=utf-8", render(page), etag)
+
+            do_HEAD = do_GET
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}/"
+
+    def start(self):
+        self._server = _QuietServer(("127.0.0.1", self.port), self._handler())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic site for crawler tests")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--links", type=int, default=10, help="Links per page (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response (default: 0)")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Fraction of slow pages")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="Seconds for slow pages")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    site = StubSite(
+        pages=args.pages,
+        links_per_page=args.links,
+        latency=args.latency,
+        slow_fraction=args.slow_fraction,
+        slow_latency=args.slow_latency,
+        port=args.port,
+    ).start()
+    print(f"Serving {args.pages} pages at {site.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
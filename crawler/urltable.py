@@ -0,0 +1,222 @@
+# urltable.py
+"""
+Interned URL ids and array-backed edge storage for crawls.
+
+URLTable replaces the crawler's dict[str, int]: URLs get dense ids at
+discovery time, are stored front-coded (prefix-compressed) in one byte
+buffer, and are found again by 64-bit fingerprint. EdgeBuffer keeps edges
+as two growable int32 arrays instead of a list of (url, url) tuples.
+"""
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+from crawler.frontier import fingerprint, place_fingerprints
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    """Length of the common prefix of a and b (binary search on C-level slice compares)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class URLTable(Mapping):
+    """
+    Append-only URL -> id table, ids 0..n-1 in insertion order.
+
+    Storage: URLs are front-coded in blocks of BLOCK entries. The first
+    entry of a block is stored whole, every other entry as (length of the
+    prefix shared with the previous URL, remaining suffix). id -> URL
+    decodes at most BLOCK - 1 entries. URL -> id goes through an
+    open-addressing fingerprint -> id table.
+
+    Behaves like the old read-only dict: `table[url]`, `url in table`,
+    len(), items(). url_of(id) is the reverse lookup.
+    """
+
+    BLOCK = 16
+    MAX_LOAD = 0.5
+
+    def __init__(self):
+        self._data = bytearray()              # suffix bytes, back to back
+        self._offsets = array("Q", [0])       # suffix i = data[offsets[i]:offsets[i + 1]]
+        self._prefix = array("H")             # bytes shared with the previous URL
+        self._last = b""
+
+        size = 1024
+        self._keys = array("Q", bytes(8 * size))
+        self._ids = array("i", bytes(4 * size))
+        self._mask = size - 1
+
+    #  fingerprint -> id
+
+    def _slot(self, fp: int) -> tuple[int, bool]:
+        keys, mask = self._keys, self._mask
+        i = fp & mask
+        while True:
+            v = keys[i]
+            if v == fp:
+                return i, True
+            if v == 0:
+                return i, False
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old_keys = np.frombuffer(self._keys, dtype=np.uint64)
+        used = old_keys != 0
+        keys = old_keys[used]
+        ids = np.frombuffer(self._ids, dtype=np.int32)[used]
+
+        size = len(self._keys) * 2
+        new_keys = np.zeros(size, dtype=np.uint64)
+        new_ids = np.zeros(size, dtype=np.int32)
+        slots = place_fingerprints(keys, size)
+        new_keys[slots] = keys
+        new_ids[slots] = ids
+
+        self._keys = array("Q", new_keys.tobytes())
+        self._ids = array("i", new_ids.tobytes())
+        self._mask = size - 1
+
+    #  insert / lookup
+
+    def intern(self, url: str, fp: int | None = None) -> int:
+        """Id of url, assigning the next id if it is new. Pass fp if already computed."""
+        if fp is None:
+            fp = fingerprint(url)
+        i, found = self._slot(fp)
+        if found:
+            return self._ids[i]
+
+        new_id = len(self._prefix)
+        self._keys[i] = fp
+        self._ids[i] = new_id
+
+        raw = url.encode("utf-8")
+        shared = 0 if new_id % self.BLOCK == 0 else min(_common_prefix(self._last, raw), 0xFFFF)
+        self._prefix.append(shared)
+        self._data += raw[shared:]
+        self._offsets.append(len(self._data))
+        self._last = raw
+
+        if new_id + 1 > self.MAX_LOAD * len(self._keys):
+            self._grow()
+        return new_id
+
+    def get_id(self, url: str, fp: int | None = None) -> int | None:
+        i, found = self._slot(fingerprint(url) if fp is None else fp)
+        return self._ids[i] if found else None
+
+    def url_of(self, url_id: int) -> str:
+        """Reverse lookup id -> URL."""
+        if not 0 <= url_id < len(self._prefix):
+            raise IndexError(url_id)
+        start = url_id - url_id % self.BLOCK
+        data, offsets, prefix = self._data, self._offsets, self._prefix
+        raw = bytes(data[offsets[start]:offsets[start + 1]])
+        for j in range(start + 1, url_id + 1):
+            raw = raw[:prefix[j]] + data[offsets[j]:offsets[j + 1]]
+        return raw.decode("utf-8")
+
+    def urls(self, start: int = 0):
+        """URLs with id >= start, in id order (sequential decode, no per-id block walk)."""
+        data, offsets, prefix = self._data, self._offsets, self._prefix
+        if start >= len(prefix):
+            return
+        raw = self.url_of(start).encode("utf-8")
+        yield raw.decode("utf-8")
+        for j in range(start + 1, len(prefix)):
+            raw = raw[:prefix[j]] + data[offsets[j]:offsets[j + 1]]
+            yield raw.decode("utf-8")
+
+    #  Mapping interface (url -> id)
+
+    def __getitem__(self, url: str) -> int:
+        url_id = self.get_id(url)
+        if url_id is None:
+            raise KeyError(url)
+        return url_id
+
+    def __contains__(self, url) -> bool:
+        return isinstance(url, str) and self.get_id(url) is not None
+
+    def __iter__(self):
+        return self.urls()
+
+    def __len__(self) -> int:
+        return len(self._prefix)
+
+    def items(self):
+        return ((url, i) for i, url in enumerate(self.urls()))
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self._offsets, self._prefix, self._keys, self._ids)
+        return len(self._data) + sum(len(a) * a.itemsize for a in arrays)
+
+
+class EdgeBuffer:
+    """
+    Growable (src_id, dst_id) edge list in two array('i') buffers.
+    Iterates as (src, dst) tuples; to_numpy() is zero-copy (drop the views
+    before appending again, an array with live views cannot grow).
+    """
+
+    def __init__(self):
+        self.src = array("i")
+        self.dst = array("i")
+
+    @classmethod
+    def from_arrays(cls, src, dst) -> "EdgeBuffer":
+        buf = cls()
+        buf.src = array("i", np.asarray(src, dtype=np.int32).tobytes())
+        buf.dst = array("i", np.asarray(dst, dtype=np.int32).tobytes())
+        return buf
+
+    def append(self, src: int, dst: int):
+        self.src.append(src)
+        self.dst.append(dst)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def __bool__(self) -> bool:
+        return len(self.src) > 0
+
+    def __iter__(self):
+        return zip(self.src, self.dst)
+
+    def to_numpy(self) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            np.frombuffer(self.src, dtype=np.int32),
+            np.frombuffer(self.dst, dtype=np.int32),
+        )
+
+    def unique(self) -> tuple[np.ndarray, np.ndarray]:
+        """Distinct edges, in order of first occurrence."""
+        src, dst = self.to_numpy()
+        if not len(src):
+            return src.copy(), dst.copy()
+        keys = (src.astype(np.int64) << 32) | dst.astype(np.int64)
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        return src[first], dst[first]
+
+    def write_txt(self, path, unique: bool = False) -> int:
+        """Write 'src dst' lines (the CUDA binary's input format); returns edge count."""
+        src, dst = self.unique() if unique else self.to_numpy()
+        with open(path, "w", encoding="utf-8") as f:
+            if len(src):
+                np.savetxt(f, np.column_stack((src, dst)), fmt="%d %d")
+        return len(src)
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self.src) + len(self.dst)) * self.src.itemsize
@@ -45,15 +45,18 @@ export interface SearchResult {
 
 export interface SearchResponse {
   query: string;
+  corpus: string;
   count: number;
   results: SearchResult[];
 }
 
-export async function searchTum(query: string, topK = 10): Promise<SearchResponse> {
+// corpus: a name from /api/corpora (the server's default corpus if omitted)
+export async function searchTum(query: string, topK = 10, corpus?: string): Promise<SearchResponse> {
   const url = `${API_BASE}/api/search?` +
     new URLSearchParams({
       query,
       top_k: String(topK),
+      ...(corpus ? { corpus } : {}),
     }).toString();
 
   const res = await fetch(url, {
@@ -72,6 +75,43 @@ export async function searchTum(query: string, topK = 10): Promise<SearchRespons
 }
 
 
+//  Autocomplete 
+
+export interface Suggestion {
+  term: string;
+  completion: string;
+  df: number;
+  score: number;
+}
+
+export interface SuggestResponse {
+  query: string;
+  suggestions: Suggestion[];
+}
+
+export async function suggestTerms(query: string, limit = 8, corpus?: string): Promise<SuggestResponse> {
+  const url = `${API_BASE}/api/suggest?` +
+    new URLSearchParams({
+      query,
+      limit: String(limit),
+      ...(corpus ? { corpus } : {}),
+    }).toString();
+
+  const res = await fetch(url, {
+    method: "GET",
+    cache: "no-store",
+    headers: {
+      "ngrok-skip-browser-warning": "true",   
+    },
+  });
+
+  if (!res.ok) {
+    throw new Error(`Suggest API error: ${res.status}`);
+  }
+
+  return res.json();
+}
+
 //  URL PageRank demo 
 
 export interface UrlPage {
@@ -128,3 +168,70 @@ export async function pagerankFromUrl(
 
   return res.json();
 }
+
+export interface UrlPagerankProgress {
+  visited: number;
+  max_pages: number;
+  indexed: number;
+  page_count: number;
+  edge_count: number;
+  pages: UrlPage[];   // provisional ranks of the graph crawled so far
+}
+
+// Same as pagerankFromUrl, but reports crawl progress while it runs
+// (Server-Sent Events from /api/pagerank/url/stream).
+export async function pagerankFromUrlStream(
+  url: string,
+  onProgress: (progress: UrlPagerankProgress) => void,
+  maxPages = 30,
+  topK = 20,
+  signal?: AbortSignal
+): Promise<UrlPagerankResponse> {
+  const res = await fetch(`${API_BASE}/api/pagerank/url/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json","ngrok-skip-browser-warning": "true" },
+    body: JSON.stringify({
+      url,
+      max_pages: maxPages,
+      top_k: topK,
+    }),
+    cache: "no-store",
+    signal,
+  });
+
+  if (!res.ok || !res.body) {
+    throw new Error(`URL PageRank API error: ${res.status}`);
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    // events are separated by a blank line
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;   // keepalive comment
+
+      const payload = JSON.parse(data);
+      if (event === "progress") onProgress(payload);
+      else if (event === "result") return payload;
+      else if (event === "error") {
+        throw new Error(`URL PageRank API error ${payload.status}: ${payload.detail}`);
+      }
+    }
+  }
+
+  throw new Error("URL PageRank stream ended without a result");
+}
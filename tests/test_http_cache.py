@@ -0,0 +1,18 @@
+import codecs
+
+import pytest
+
+from crawler.http_cache import charset_of
+
+
+@pytest.mark.parametrize("charset", ["zlib", "base64", "hex", "rot13", "no-such-codec", '"'])
+def test_non_text_or_garbage_charset_decodes_as_utf8(charset):
+    name = charset_of(f"text/html; charset={charset}")
+    assert name == "utf-8"
+    decoder = codecs.getincrementaldecoder(name)(errors="replace")
+    assert decoder.decode("Grüße".encode("utf-8"), final=True) == "Grüße"
+
+
+def test_text_charset_is_kept():
+    assert charset_of('text/html; charset="ISO-8859-1"') == "iso8859-1"
+    assert charset_of("text/html") == "utf-8"